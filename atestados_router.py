@@ -6,6 +6,7 @@ from typing import List, Optional
 
 from fastapi import APIRouter, File, Form, HTTPException, UploadFile
 from app_paths import DATA_DIR
+import local_store
 
 router = APIRouter(prefix="/api/atestados", tags=["atestados"])
 
@@ -19,16 +20,24 @@ def _ensure_storage() -> None:
 
 
 def _load_atestados() -> List[dict]:
+    if local_store.handles("atestados"):
+        stored = local_store.load("atestados")
+        if stored is not None:
+            return stored
     if not ATESTADOS_FILE.exists():
         return []
     try:
-        return json.loads(ATESTADOS_FILE.read_text(encoding="utf-8"))
+        atestados = json.loads(ATESTADOS_FILE.read_text(encoding="utf-8"))
     except json.JSONDecodeError:
         return []
+    local_store.seed("atestados", atestados)
+    return atestados
 
 
 def _persist_atestados(atestados: List[dict]) -> None:
     ATESTADOS_FILE.write_text(json.dumps(atestados, ensure_ascii=False, indent=2), encoding="utf-8")
+    if local_store.handles("atestados"):
+        local_store.save("atestados", atestados, "Atualiza atestados")
 
 
 def _normalize_cpf(value: Optional[str]) -> str:
@@ -48,7 +57,7 @@ def _calculate_final_date(start_date: str, dias: int) -> str:
     return final.date().isoformat()
 
 
-async def _save_document(file: UploadFile) -> dict:
+def _save_document(file: UploadFile) -> dict:
     if not file or not file.filename:
         raise HTTPException(status_code=400, detail="Nenhum documento enviado.")
     extension = Path(file.filename).suffix.lstrip(".").lower()
@@ -57,7 +66,7 @@ async def _save_document(file: UploadFile) -> dict:
 
     filename = f"{uuid.uuid4().hex}.{extension}"
     destination = ATESTADO_DIR / filename
-    contents = await file.read()
+    contents = file.file.read()
     destination.write_bytes(contents)
 
     return {
@@ -69,7 +78,7 @@ async def _save_document(file: UploadFile) -> dict:
 
 
 @router.get("/")
-async def list_atestados(q: Optional[str] = None):
+def list_atestados(q: Optional[str] = None):
     entries = _load_atestados()
     if q:
         needle = q.strip().lower()
@@ -83,7 +92,7 @@ async def list_atestados(q: Optional[str] = None):
 
 
 @router.get("/{atestado_id}")
-async def get_atestado_detail(atestado_id: str):
+def get_atestado_detail(atestado_id: str):
     entries = _load_atestados()
     entry = next((item for item in entries if item.get("id") == atestado_id), None)
     if not entry:
@@ -92,7 +101,7 @@ async def get_atestado_detail(atestado_id: str):
 
 
 @router.post("/")
-async def register_atestado(
+def register_atestado(
     funcionario_nome: str = Form(...),
     funcionario_cpf: str = Form(...),
     funcionario_id: Optional[str] = Form(None),
@@ -111,7 +120,7 @@ async def register_atestado(
         raise HTTPException(status_code=400, detail="CPF inválido")
 
     final_date = _calculate_final_date(data_inicio, dias)
-    metadata = await _save_document(documento)
+    metadata = _save_document(documento)
 
     record = {
         "id": uuid.uuid4().hex,
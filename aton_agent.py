@@ -10,9 +10,11 @@ from typing import Any, Dict, List, Optional
 import requests
 from openai import OpenAI
 
+import github_client
+
 DEFAULT_MODEL = "deepseek/deepseek-r1-0528:free"
 OPEN_ROUTER_BASE = "https://openrouter.ai/api/v1"
-CBO_SOURCE_URL = "https://raw.githubusercontent.com/PopularAtacarejo/Candidatos/refs/heads/main/CBO.json"
+CBO_SOURCE_URL = f"{github_client.RAW_URL}/PopularAtacarejo/Candidatos/refs/heads/main/CBO.json"
 DEFAULT_CONFIG_PATH = "configuracoes.json"
 
 SYSTEM_PROMPT = (
@@ -394,8 +396,8 @@ class AtonAgent:
         if token:
             api_headers["Authorization"] = f"token {token}"
         path = relative_path.lstrip("/")
-        url = f"https://api.github.com/repos/{owner}/{repo}/contents/{path}"
-        response = requests.get(url, headers=api_headers, params={"ref": branch}, timeout=10)
+        url = f"{github_client.API_URL}/repos/{owner}/{repo}/contents/{path}"
+        response = github_client.get(url, headers=api_headers, params={"ref": branch}, timeout=10)
         response.raise_for_status()
         payload = response.json()
         content = payload.get("content")
@@ -1,15 +1,18 @@
 from fastapi import FastAPI, UploadFile, Form, File, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, RedirectResponse
+from fastapi.responses import FileResponse, JSONResponse, RedirectResponse
 from fastapi.staticfiles import StaticFiles
+from anyio import to_thread
 import requests
 import json
 from datetime import datetime, timedelta
 import base64
 import os
+import shutil
+import tempfile
 import threading
 import time
-from typing import List, Optional, Dict, Any
+from typing import BinaryIO, List, Optional, Dict, Any, Tuple, Union
 import re
 from cachetools import TTLCache
 import hashlib
@@ -34,6 +37,21 @@ from experiencia_router import router as experiencia_router
 from sync_service import start_startup_sync_thread, enqueue_pending, is_sync_target
 
 from app_paths import APP_DIR, DATA_DIR, RESOURCE_DIR, ensure_data_seed
+import github_client
+import write_behind
+import local_store
+import candidate_index
+import candidate_shards
+import submission_queue
+import resume_index
+import candidate_listing
+import candidate_views
+import dashboard_stats
+import expiry_sweeper
+import repo_health
+import candidate_journal
+import record_export
+import candidate_archive
 
 app = FastAPI()
 BASE_DIR = DATA_DIR
@@ -48,6 +66,7 @@ GITHUB_OWNER = "PopularAtacarejo"
 
 DEFAULT_BACKUP_DIR = os.getenv("BACKUP_DIR") or str(DATA_DIR)
 BACKUP_FILE_NAME = os.getenv("BACKUP_FILE_NAME") or "backup-dados-funcionarios.json"
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", "40"))
 
 BACKUP_STATUS = {
     "last_run": None,
@@ -76,6 +95,8 @@ ENV_ALLOWLIST = {
     "GITHUB_FUNCIONARIOS_PATH",
     "GITHUB_DESLIGADOS_PATH",
     "GITHUB_LIDERES_PATH",
+    "GITHUB_API_URL",
+    "GITHUB_RAW_URL",
     "FUNCIONARIOS_ENCRYPTION_KEY",
     "OPENROUTER_API_KEY",
     "OPENAI_API_KEY",
@@ -203,6 +224,8 @@ def _refresh_env_dependents() -> None:
     if local_backup_override:
         LOCAL_BACKUP_DIR = local_backup_override
 
+    github_client.configure_base_urls()
+
     try:
         import funcionarios_router
         import lideres_router
@@ -276,7 +299,7 @@ def _refresh_env_dependents() -> None:
     profile_store.GITHUB_REPO = GITHUB_REPO
     profile_store.GITHUB_TOKEN = GITHUB_TOKEN
     profile_store.BRANCH = BRANCH
-    profile_store.RAW_BASE = f"https://raw.githubusercontent.com/{GITHUB_OWNER}/{GITHUB_REPO}/{BRANCH}"
+    profile_store.RAW_BASE = f"{github_client.RAW_URL}/{GITHUB_OWNER}/{GITHUB_REPO}/{BRANCH}"
     profile_store.HEADERS = {"Accept": "application/vnd.github.v3+json"}
     if GITHUB_TOKEN:
         profile_store.HEADERS["Authorization"] = f"token {GITHUB_TOKEN}"
@@ -285,6 +308,26 @@ def _refresh_env_dependents() -> None:
     sync_service.GITHUB_REPO = GITHUB_REPO
     sync_service.GITHUB_BRANCH = BRANCH
     sync_service.GITHUB_TOKEN = GITHUB_TOKEN
+
+    write_behind.GITHUB_OWNER = GITHUB_OWNER
+    write_behind.GITHUB_REPO = GITHUB_REPO
+    write_behind.GITHUB_BRANCH = BRANCH
+    write_behind.GITHUB_TOKEN = GITHUB_TOKEN
+
+    local_store.GITHUB_OWNER = GITHUB_OWNER
+    local_store.GITHUB_REPO = GITHUB_REPO
+    local_store.GITHUB_BRANCH = BRANCH
+    local_store.GITHUB_TOKEN = GITHUB_TOKEN
+    local_store.configure("funcionarios", path=funcionarios_router.GITHUB_PATH)
+    local_store.configure("desligados", path=funcionarios_router.GITHUB_DESLIGADOS_PATH)
+    local_store.configure("lideres", path=lideres_router.GITHUB_PATH)
+
+    candidate_shards.GITHUB_OWNER = GITHUB_OWNER
+    candidate_shards.GITHUB_REPO = GITHUB_REPO
+    candidate_shards.GITHUB_BRANCH = BRANCH
+    candidate_shards.GITHUB_TOKEN = GITHUB_TOKEN
+    if candidate_shards.ENABLED:
+        local_store.configure("candidatos", export=candidate_shards.write_all)
     if local_backup_override:
         sync_service.DEFAULT_LOCAL_BASE = Path(local_backup_override)
         sync_service.CANDIDATOS_LOCAL_FALLBACK = sync_service.DEFAULT_LOCAL_BASE / "candidatos.json"
@@ -345,10 +388,10 @@ else:
 
 def get_repo_default_branch() -> str:
     """Busca o branch padrão do repositório no GitHub."""
-    url = f"https://api.github.com/repos/{GITHUB_OWNER}/{GITHUB_REPO}"
+    url = f"{github_client.API_URL}/repos/{GITHUB_OWNER}/{GITHUB_REPO}"
     
     try:
-        response = requests.get(url, headers=headers, timeout=10)
+        response = github_client.get(url, headers=headers, timeout=10)
         print(f"Status ao buscar repositório: {response.status_code}")
         
         if response.status_code == 200:
@@ -404,33 +447,31 @@ def sanitize_filename(name: str) -> str:
     name = re.sub(r'\s+', '_', name)
     return name[:100]
 
-def check_repo_access() -> bool:
-    """Verifica se temos acesso ao repositório"""
-    url = f"https://api.github.com/repos/{GITHUB_OWNER}/{GITHUB_REPO}"
+def _probe_repo_access() -> int:
+    """Consulta o repositório no GitHub e devolve o status HTTP (chamada pelo repo_health)"""
+    url = f"{github_client.API_URL}/repos/{GITHUB_OWNER}/{GITHUB_REPO}"
     
     try:
-        response = requests.get(url, headers=headers, timeout=10)
-        print(f"Verificação de acesso ao repositório: {response.status_code}")
-        
-        if response.status_code == 200:
-            print("Acesso ao repositório confirmado")
-            return True
-        elif response.status_code == 404:
-            print(f"ERRO CRÍTICO: Repositório {GITHUB_OWNER}/{GITHUB_REPO} não existe!")
-            return False
-        elif response.status_code == 403:
-            print(f"ERRO: Token GitHub não tem permissão para acessar o repositório")
-            return False
-        else:
-            print(f"ERRO de acesso ao repositório: {response.status_code} - {response.text}")
-            return False
+        response = github_client.get(url, headers=headers, timeout=10)
     except Exception as e:
         print(f"Erro ao verificar acesso ao repositório: {str(e)}")
-        return False
+        raise
+    
+    if response.status_code == 404:
+        print(f"ERRO CRÍTICO: Repositório {GITHUB_OWNER}/{GITHUB_REPO} não existe!")
+    elif response.status_code == 403:
+        print(f"ERRO: Token GitHub não tem permissão para acessar o repositório")
+    elif response.status_code != 200:
+        print(f"ERRO de acesso ao repositório: {response.status_code} - {response.text}")
+    return response.status_code
+
+def check_repo_access() -> bool:
+    """Verifica agora se temos acesso ao repositório (e atualiza o resultado guardado pelo repo_health)"""
+    return bool(repo_health.refresh().get("acessivel"))
 
 def create_github_file(file_path: str, content: str, message: str) -> bool:
     """Cria um arquivo no GitHub via API"""
-    url = f"https://api.github.com/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{file_path}"
+    url = f"{github_client.API_URL}/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{file_path}"
     
     content_b64 = base64.b64encode(content.encode("utf-8")).decode("utf-8")
     
@@ -441,7 +482,7 @@ def create_github_file(file_path: str, content: str, message: str) -> bool:
     }
     
     try:
-        response = requests.put(url, headers=headers, json=data, timeout=30)
+        response = github_client.put(url, headers=headers, json=data, timeout=30)
         print(f"Tentativa de criar {file_path}: Status {response.status_code}")
         
         if response.status_code in [200, 201]:
@@ -496,9 +537,9 @@ def initialize_repository() -> bool:
     
     for file_info in files_to_check:
         # Verificar se o arquivo já existe
-        url = f"https://api.github.com/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{file_info['path']}"
+        url = f"{github_client.API_URL}/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{file_info['path']}"
         try:
-            response = requests.get(url, headers=headers, timeout=10)
+            response = github_client.get(url, headers=headers, timeout=10)
             if response.status_code == 200:
                 print(f"Arquivo {file_info['path']} já existe")
                 continue
@@ -519,8 +560,37 @@ def initialize_repository() -> bool:
 @app.on_event("startup")
 def _startup_tasks() -> None:
     print("=== Inicializando servidor ===")
-    threading.Thread(target=initialize_repository, daemon=True).start()
+    repo_health.start(_probe_repo_access)
+    threading.Thread(target=github_client.background(initialize_repository), daemon=True).start()
+    _compact_candidate_journal()  # a sincronização inicial lê o candidatos.json local
     start_startup_sync_thread()
+    write_behind.start()
+    local_store.start()
+    submission_queue.start(_process_submission)
+    resume_index.start()
+    candidate_views.start()
+    expiry_sweeper.start(sweep_expired_candidates)
+    threading.Thread(target=github_client.background(_backfill_resume_index), daemon=True).start()
+
+@app.on_event("startup")
+async def _configure_threadpool() -> None:
+    # As rotas são síncronas (def) e rodam no pool de threads do AnyIO; limita o tamanho do pool
+    to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+
+@app.on_event("shutdown")
+def _shutdown_tasks() -> None:
+    if not write_behind.flush_all():
+        print("Aviso: alteracoes pendentes continuam no journal write-behind")
+    if not local_store.flush_all():
+        print("Aviso: alteracoes locais ainda nao exportadas para o GitHub")
+    candidate_views.compact()
+    _compact_candidate_journal()
+
+def _compact_candidate_journal() -> None:
+    try:
+        candidate_journal.compact(_get_local_base_dir())
+    except Exception as exc:
+        print(f"Erro ao compactar o diário local de candidatos: {exc}")
 
 def parse_iso_date(date_str: str) -> Optional[datetime]:
     """Converte string ISO para datetime com tratamento de erros"""
@@ -557,112 +627,190 @@ def is_candidate_expired(candidate: dict) -> bool:
     days_diff = (datetime.now() - candidate_date).days
     return days_diff >= 90
 
-def clean_expired_candidates() -> int:
-    """Remove automaticamente candidaturas expiradas (mais de 90 dias) e seus currículos"""
-    print("Iniciando limpeza de candidaturas expiradas...")
-    
-    cached = fetch_content_from_github("candidatos.json")
-    if isinstance(cached, list):
-        if clean_expired:
-            return [c for c in cached if not is_candidate_expired(c)]
-        return cached
+def _curriculum_path(candidate: dict) -> Optional[str]:
+    """Caminho do currículo no repositório, extraído de `arquivo_url`"""
+    path_match = re.search(f"{BRANCH}/(.+)", candidate.get("arquivo_url") or "")
+    return path_match.group(1) if path_match else None
+
+def _curriculum_references(candidates: List[dict]) -> Dict[str, int]:
+    """Quantas candidaturas apontam para cada currículo do repositório"""
+    references: Dict[str, int] = {}
+    for candidate in candidates:
+        path = _curriculum_path(candidate)
+        if path:
+            references[path] = references.get(path, 0) + 1
+    return references
 
-    url = f"https://api.github.com/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/candidatos.json"
+def _unreferenced_curricula(removed: List[dict], remaining: List[dict]) -> List[str]:
+    """Currículos das candidaturas removidas que nenhuma candidatura restante usa mais"""
+    references = _curriculum_references(remaining)
+    return sorted(path for path in _curriculum_references(removed) if not references.get(path))
+
+def _drop_expired_candidate_shards(report: Dict[str, Any]) -> int:
+    """Limpeza com candidaturas divididas por mês: remove os meses inteiros já vencidos"""
+    started = time.perf_counter()
+    manifest, manifest_sha = candidate_shards.load_manifest()
+    names = candidate_shards.expired_shards(manifest)
+    if not names:
+        report["leitura_ms"] = _elapsed_ms(started)
+        print("Nenhum mês de candidaturas expirado.")
+        return 0
+
+    # um mês vencido que não pôde ser lido não é removido: a limpeza inteira é interrompida
+    expired_candidates = candidate_shards.read_shards(names, strict=True)
+    # os currículos compartilhados só são conferidos com todos os meses restantes lidos
+    remaining_candidates = candidate_shards.read_shards(
+        [name for name in candidate_shards.shards_in_window(manifest) if name not in names], strict=True
+    )
+    deleted_files = _unreferenced_curricula(expired_candidates, remaining_candidates)
+    report["leitura_ms"] = _elapsed_ms(started)
+    report["arquivos"] = len(deleted_files)
+    started = time.perf_counter()
+    report["arquivadas"] = candidate_archive.archive(expired_candidates)
+    report["arquivo_ms"] = _elapsed_ms(started)
+    started = time.perf_counter()
+    committed = candidate_shards.drop_shards(
+        manifest,
+        manifest_sha,
+        names,
+        deleted_files,
+        f"Limpeza automática: Removidos {len(names)} meses de candidaturas ({len(expired_candidates)} expiradas)",
+    )
+    report["commit_ms"] = _elapsed_ms(started)
+    if not committed:
+        print("❌ Erro ao gravar o commit de limpeza dos meses de candidaturas")
+        return 0
+    resume_index.forget(c.get("id") for c in expired_candidates if c.get("id"))
+    candidate_views.forget(c.get("id") for c in expired_candidates if c.get("id"))
+    candidate_listing.invalidate()
+    print(f"✅ Limpeza concluída: meses {', '.join(names)} removidos ({len(expired_candidates)} candidaturas, {len(deleted_files)} arquivos).")
+    return len(expired_candidates)
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 1)
+
+def clean_expired_candidates(report: Optional[Dict[str, Any]] = None) -> int:
+    """Remove automaticamente candidaturas expiradas (mais de 90 dias) e seus currículos
+
+    `report`, se informado, recebe os tempos de leitura e do commit e o número de arquivos removidos.
+    """
+    print("Iniciando limpeza de candidaturas expiradas...")
+    report = {} if report is None else report
+    
+    url = f"{github_client.API_URL}/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/candidatos.json"
     
     try:
-        # Obtém o arquivo atual
-        response = requests.get(url, headers=headers, timeout=10)
-        if response.status_code != 200:
-            print(f"Erro ao buscar candidatos para limpeza: {response.status_code}")
-            return 0
-        
-        # Decodifica o conteúdo
-        content = response.json()["content"]
-        decoded = base64.b64decode(content).decode("utf-8")
-        candidates = json.loads(decoded)
-        sha = response.json()["sha"]
+        if candidate_shards.ENABLED and not local_store.handles("candidatos"):
+            return _drop_expired_candidate_shards(report)
+        started = time.perf_counter()
+        if local_store.handles("candidatos"):
+            candidates = get_existing_candidates()
+            sha = None
+        else:
+            # Obtém o arquivo atual
+            response = github_client.get(url, headers=headers, timeout=10)
+            if response.status_code != 200:
+                print(f"Erro ao buscar candidatos para limpeza: {response.status_code}")
+                return 0
+
+            # Decodifica o conteúdo
+            current = github_client.payload_from_response(url, response)
+            candidates = github_client.load_json(url, current, headers=headers) or []
+            sha = current["sha"]
         
         # Separa candidatos ativos e expirados
         active_candidates = []
         expired_candidates = []
-        deleted_files = []
         
         for candidate in candidates:
             if is_candidate_expired(candidate):
                 expired_candidates.append(candidate)
-                # Extrai o nome do arquivo da URL para exclusão
-                if "arquivo_url" in candidate:
-                    try:
-                        # Pega o nome do arquivo da URL
-                        file_url = candidate["arquivo_url"]
-                        # Extrai o caminho do arquivo (parte após o branch)
-                        path_match = re.search(f"{BRANCH}/(.+)", file_url)
-                        if path_match:
-                            file_path = path_match.group(1)
-                            deleted_files.append(file_path)
-                    except:
-                        print(f"Não foi possível extrair caminho do arquivo para: {candidate.get('nome', 'Unknown')}")
             else:
                 active_candidates.append(candidate)
         
+        # Um currículo só é removido quando nenhuma candidatura ativa ainda o referencia
+        deleted_files = _unreferenced_curricula(expired_candidates, active_candidates)
+        report["leitura_ms"] = _elapsed_ms(started)
+        
         if not expired_candidates:
             print("Nenhuma candidatura expirada encontrada.")
             return 0
         
         print(f"Encontradas {len(expired_candidates)} candidaturas expiradas para remoção.")
         
-        # Remove os arquivos de currículo expirados
-        deleted_count = 0
-        for file_path in deleted_files:
-            if delete_github_file(file_path):
-                deleted_count += 1
-                # Aguarda um pouco para não sobrecarregar a API
-                import time
-                time.sleep(0.5)
-        
-        # Atualiza o arquivo JSON removendo os candidatos expirados
-        updated_content = json.dumps(active_candidates, indent=2, ensure_ascii=False)
-        content_b64 = base64.b64encode(updated_content.encode("utf-8")).decode("utf-8")
-        
-        update_data = {
-            "message": f"Limpeza automática: Removidas {len(expired_candidates)} candidaturas expiradas",
-            "content": content_b64,
-            "sha": sha,
-            "branch": BRANCH
-        }
-        
-        update_response = requests.put(url, headers=headers, json=update_data, timeout=30)
+        # Remove os currículos e atualiza candidatos.json em um único commit
+        message = f"Limpeza automática: Removidas {len(expired_candidates)} candidaturas expiradas"
+        changes = {file_path: None for file_path in deleted_files}
+        report["arquivos"] = len(deleted_files)
+        # Copia as expiradas para o arquivo morto antes de tirá-las do conjunto ativo;
+        # se a gravação falhar, a exceção interrompe a limpeza
+        started = time.perf_counter()
+        report["arquivadas"] = candidate_archive.archive(expired_candidates)
+        report["arquivo_ms"] = _elapsed_ms(started)
+        started = time.perf_counter()
+        if local_store.handles("candidatos"):
+            # Remove só as expiradas, sem substituir a tabela: candidaturas gravadas pelos
+            # workers de envio depois da leitura continuam lá. A réplica exporta candidatos.json depois.
+            local_store.delete_many("candidatos", (c.get("id") for c in expired_candidates if c.get("id")), message)
+            # referências recalculadas sobre o que ficou no banco, incluindo envios novos
+            deleted_files = _unreferenced_curricula(expired_candidates, local_store.load("candidatos") or [])
+            changes = {file_path: None for file_path in deleted_files}
+            report["arquivos"] = len(deleted_files)
+        else:
+            changes["candidatos.json"] = json.dumps(active_candidates, indent=2, ensure_ascii=False)
+
+        committed = not changes or github_client.commit_files(
+            f"{github_client.API_URL}/repos/{GITHUB_OWNER}/{GITHUB_REPO}",
+            headers,
+            BRANCH,
+            changes,
+            message,
+            expected_shas={"candidatos.json": sha} if sha else None,
+        )
+        report["commit_ms"] = _elapsed_ms(started)
         
-        if update_response.status_code in [200, 201]:
-            print(f"✅ Limpeza concluída: {len(expired_candidates)} candidaturas expiradas removidas, {deleted_count} arquivos deletados.")
+        if committed:
+            resume_index.forget(c.get("id") for c in expired_candidates if c.get("id"))
+            candidate_views.forget(c.get("id") for c in expired_candidates if c.get("id"))
+            candidate_listing.invalidate()
+            print(f"✅ Limpeza concluída: {len(expired_candidates)} candidaturas expiradas removidas, {len(deleted_files)} arquivos deletados.")
             return len(expired_candidates)
         else:
-            print(f"❌ Erro ao atualizar candidatos.json: {update_response.status_code} - {update_response.text}")
+            print("❌ Erro ao gravar o commit de limpeza de candidatos.json")
             return 0
             
     except Exception as e:
         print(f"❌ Erro durante limpeza: {str(e)}")
+        report["erro"] = str(e)
         return 0
 
+def sweep_expired_candidates() -> Dict[str, Any]:
+    """Execução agendada da limpeza (thread do `expiry_sweeper`, nunca dentro de uma requisição).
+
+    Com o índice da listagem atualizado, o número de expiradas sai dele sem nenhuma leitura
+    no GitHub; só quando há expiradas (ou o índice está vencido) a limpeza completa roda.
+    """
+    started = time.perf_counter()
+    if candidate_listing.is_fresh():
+        pending = candidate_listing.count_expired(datetime.now() - timedelta(days=90))
+        if not pending:
+            return {"removidas": 0, "indice_ms": _elapsed_ms(started)}
+    report: Dict[str, Any] = {}
+    report["removidas"] = clean_expired_candidates(report)
+    return report
+
 def delete_github_file(file_path: str) -> bool:
     """Deleta um arquivo do GitHub via API"""
-    url = f"https://api.github.com/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{file_path}"
+    url = f"{github_client.API_URL}/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{file_path}"
     
-    # Primeiro obtém o SHA do arquivo
+    # O SHA vem do cache do cliente; só é buscado no GitHub se ainda não for conhecido
     try:
-        response = requests.get(url, headers=headers, timeout=10)
-        if response.status_code == 200:
-            sha = response.json()["sha"]
-            
-            # Agora deleta o arquivo
-            data = {
-                "message": f"Removendo currículo expirado: {file_path}",
-                "sha": sha,
-                "branch": BRANCH
-            }
-            
-            delete_response = requests.delete(url, headers=headers, json=data, timeout=30)
-            
+        data = {
+            "message": f"Removendo currículo expirado: {file_path}",
+            "branch": BRANCH
+        }
+        delete_response = github_client.delete_file(url, headers, data, timeout=30)
+        if delete_response is not None:
             if delete_response.status_code in [200, 204]:
                 print(f"✅ Arquivo {file_path} deletado com sucesso")
                 return True
@@ -676,16 +824,47 @@ def delete_github_file(file_path: str) -> bool:
         print(f"Erro ao deletar {file_path}: {str(e)}")
         return False
 
-def get_existing_candidates(clean_expired: bool = False) -> List[dict]:
-    """Obtém candidatos existentes do arquivo JSON no GitHub"""
-    url = f"https://api.github.com/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/candidatos.json"
+def get_existing_candidates(
+    clean_expired: bool = False,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    strict: bool = False,
+) -> List[dict]:
+    """Obtém candidatos existentes do arquivo JSON no GitHub
+
+    `since`/`until` permitem ler só os arquivos mensais dessa janela quando as
+    candidaturas estão divididas por mês (o resultado ainda pode conter registros
+    fora da janela nos meses das pontas).
+
+    Sem `strict`, uma falha de leitura devolve []; com `strict`, levanta RuntimeError,
+    para os índices não serem reconstruídos a partir de uma lista vazia por engano.
+    """
+    url = f"{github_client.API_URL}/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/candidatos.json"
     
     try:
-        response = requests.get(url, headers=headers, timeout=10)
+        candidates = local_store.load("candidatos") if local_store.handles("candidatos") else None
+        if candidates is None and candidate_shards.ENABLED:
+            # o banco local precisa do conjunto completo para ser preenchido
+            window = None if local_store.handles("candidatos") else since
+            # o banco local nunca é preenchido com meses faltando
+            candidates = candidate_shards.load(
+                since=window, until=None if window is None else until, strict=strict or window is None
+            )
+            if window is None:
+                local_store.seed("candidatos", candidates)
+        if candidates is not None:
+            if clean_expired:
+                return [c for c in candidates if not is_candidate_expired(c)]
+            return candidates
+
+        response = github_client.get(url, headers=headers, timeout=10)
         if response.status_code == 200:
-            content = response.json()["content"]
-            decoded = base64.b64decode(content).decode("utf-8")
-            candidates = json.loads(decoded)
+            payload = github_client.payload_from_response(url, response)
+            candidates = github_client.load_json(url, payload, headers=headers)
+            if candidates is None and github_client.is_truncated(payload):
+                raise RuntimeError("Erro ao baixar candidatos.json do GitHub")
+            candidates = candidates or []
+            local_store.seed("candidatos", candidates, payload.get("sha"))
             
             # Executa limpeza se solicitado
             if clean_expired:
@@ -698,12 +877,34 @@ def get_existing_candidates(clean_expired: bool = False) -> List[dict]:
             # Tentar criar o arquivo se não existir
             print("Arquivo candidatos.json não encontrado, tentando criar...")
             if create_github_file("candidatos.json", "[]", "Criar arquivo de candidatos"):
+                local_store.seed("candidatos", [])
                 return []
+            if strict:
+                raise RuntimeError("Não foi possível criar candidatos.json no GitHub")
+            return []
+        if strict:
+            raise RuntimeError(f"Erro ao buscar candidatos.json no GitHub: {response.status_code}")
         return []
     except Exception as e:
         print(f"Erro ao buscar candidatos: {str(e)}")
+        if strict:
+            raise
         return []
 
+def _refresh_candidate_listing() -> None:
+    """Reconstrói o índice da listagem quando vencido
+
+    Se a leitura falhar, levanta 503 e o índice continua vencido (nunca é marcado como
+    atualizado a partir de uma lista vazia, o que esconderia todas as candidaturas).
+    """
+    if candidate_listing.is_fresh():
+        return
+    try:
+        candidatos = get_existing_candidates(clean_expired=False, strict=True)
+    except Exception as exc:
+        raise HTTPException(status_code=503, detail=f"Não foi possível ler as candidaturas: {exc}")
+    candidate_listing.rebuild(candidatos)
+
 def normalize_vagas_data(vagas_data) -> List[dict]:
     """Normaliza as vagas para garantir o campo 'nome'"""
     normalized = []
@@ -725,7 +926,7 @@ def fetch_content_from_github(path: str):
     data_source_url = _get_data_source_url(path)
     if data_source_url:
         try:
-            response = requests.get(data_source_url, timeout=10)
+            response = github_client.get(data_source_url, timeout=10)
             if response.status_code == 200:
                 return response.json()
             print(f"Erro ao buscar {path} via URL: {response.status_code}")
@@ -736,18 +937,16 @@ def fetch_content_from_github(path: str):
         except Exception as e:
             print(f"Erro inesperado ao buscar {path} via URL: {str(e)}")
 
-    url = f"https://api.github.com/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{path}"
+    url = f"{github_client.API_URL}/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{path}"
 
     try:
-        response = requests.get(url, headers=headers, timeout=10)
-        if response.status_code == 200:
-            payload = response.json()
-            content = payload.get("content")
-            if content:
-                decoded = base64.b64decode(content).decode("utf-8")
-                return json.loads(decoded)
+        payload = github_client.read_file(url, headers=headers)
+        if payload is not None:
+            data = github_client.load_json(url, payload, headers=headers)
+            if data is not None:
+                return data
         else:
-            print(f"Erro ao buscar {path} via API: {response.status_code}")
+            print(f"Erro ao buscar {path} via API")
     except requests.exceptions.RequestException as e:
         print(f"Erro de rede ao buscar {path}: {str(e)}")
     except json.JSONDecodeError as e:
@@ -759,38 +958,61 @@ def fetch_content_from_github(path: str):
 
 def fetch_github_file(path: str) -> Optional[dict]:
     """Busca um arquivo no GitHub e retorna payload completo (content + sha)."""
-    url = f"https://api.github.com/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{path}"
+    url = f"{github_client.API_URL}/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{path}"
     try:
-        response = requests.get(url, headers=headers, timeout=10)
-        if response.status_code == 200:
-            return response.json()
+        return github_client.read_file(url, headers=headers)
     except Exception:
         pass
     return None
 
 def load_github_json(path: str, default: Optional[dict] = None):
+    return load_github_json_versioned(path, default)[0]
+
+def load_github_json_versioned(path: str, default: Optional[dict] = None) -> Tuple[Any, Optional[int]]:
+    """Como `load_github_json`, mas retorna também a versão local lida (None fora do banco local)
+
+    A versão vai para `save_github_json(..., expected_version=)`, que combina a gravação com
+    as de outras requisições feitas depois da leitura.
+    """
+    dataset = local_store.dataset_for(path)
+    if dataset and local_store.handles(dataset):
+        stored, version = local_store.load_versioned(dataset)
+        if stored is not None:
+            return stored, version
+    pending = write_behind.pending_payload(path)
+    if pending is not None:
+        return pending, None
     payload = fetch_content_from_github(path)
     if payload is None:
-        return default if default is not None else {}
-    return payload
-
-def save_github_json(path: str, payload: Any, message: str) -> bool:
-    url = f"https://api.github.com/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{path}"
+        return (default if default is not None else {}), None
+    if dataset:
+        return local_store.seeded(dataset, payload)
+    return payload, None
+
+def save_github_json(path: str, payload: Any, message: str, expected_version: Optional[int] = None) -> bool:
+    dataset = local_store.dataset_for(path)
+    if dataset and local_store.handles(dataset) and isinstance(payload, list):
+        try:
+            local_store.save(dataset, payload, message, expected_version=expected_version)
+        except local_store.ConflictError as exc:
+            raise HTTPException(status_code=409, detail=str(exc))
+        return True
+    if write_behind.handles(path):
+        write_behind.submit(path, payload, message)
+        return True
+    url = f"{github_client.API_URL}/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{path}"
     content = json.dumps(payload, indent=2, ensure_ascii=False)
     content_b64 = base64.b64encode(content.encode("utf-8")).decode("utf-8")
-    sha = None
-    current = fetch_github_file(path)
-    if current and isinstance(current, dict):
-        sha = current.get("sha")
     data = {
         "message": message,
         "content": content_b64,
         "branch": BRANCH
     }
-    if sha:
-        data["sha"] = sha
     try:
-        response = requests.put(url, headers=headers, json=data, timeout=30)
+        if isinstance(payload, list):
+            response = github_client.put_records(url, headers, payload, message, BRANCH, timeout=30)
+        else:
+            response = github_client.put_file(url, headers, data, timeout=30)
         ok = response.status_code in [200, 201]
         if not ok and is_sync_target(path) and isinstance(payload, list):
             enqueue_pending(path, payload, message)
@@ -823,11 +1045,15 @@ def normalize_vaga_id(value: str) -> str:
     return slug.strip("-")
 
 def load_admin_vagas() -> List[dict]:
-    vagas = load_github_json("vagas.json", default=[])
+    return load_admin_vagas_versioned()[0]
+
+def load_admin_vagas_versioned() -> Tuple[List[dict], Optional[int]]:
+    """Vagas normalizadas e a versão local lida, para `save_admin_vagas`"""
+    vagas, version = load_github_json_versioned("vagas.json", default=[])
     if isinstance(vagas, dict):
         vagas = [vagas]
     if not isinstance(vagas, list):
-        return []
+        return [], version
     normalized = []
     for vaga in vagas:
         if not isinstance(vaga, dict):
@@ -835,10 +1061,13 @@ def load_admin_vagas() -> List[dict]:
         if not vaga.get("id") and vaga.get("nome"):
             vaga = {**vaga, "id": normalize_vaga_id(vaga.get("nome"))}
         normalized.append(vaga)
-    return normalized
+    return normalized, version
 
-def save_admin_vagas(vagas: List[dict], message: str) -> bool:
-    return save_github_json("vagas.json", vagas, message)
+def save_admin_vagas(vagas: List[dict], message: str, version: Optional[int] = None) -> bool:
+    saved = save_github_json("vagas.json", vagas, message, expected_version=version)
+    if saved:
+        dashboard_stats.set_vagas(normalize_vagas_data(vagas))
+    return saved
 
 def find_vaga_index(vagas: List[dict], vaga_id: str) -> Optional[int]:
     if not vaga_id:
@@ -859,11 +1088,15 @@ def normalize_empresa_id(value: str, cnpj: str = "") -> str:
     return slug.strip("-")
 
 def load_admin_empresas() -> List[dict]:
-    empresas = load_github_json("empresas.json", default=[])
+    return load_admin_empresas_versioned()[0]
+
+def load_admin_empresas_versioned() -> Tuple[List[dict], Optional[int]]:
+    """Empresas normalizadas e a versão local lida, para `save_admin_empresas`"""
+    empresas, version = load_github_json_versioned("empresas.json", default=[])
     if isinstance(empresas, dict):
         empresas = [empresas]
     if not isinstance(empresas, list):
-        return []
+        return [], version
     normalized = []
     for empresa in empresas:
         if not isinstance(empresa, dict):
@@ -874,9 +1107,9 @@ def load_admin_empresas() -> List[dict]:
         if not empresa.get("id"):
             empresa = {**empresa, "id": normalize_empresa_id(empresa.get("razao_social") or empresa.get("nome_fantasia"), cnpj_digits)}
         normalized.append(empresa)
-    return normalized
+    return normalized, version
 
-def save_admin_empresas(empresas: List[dict], message: str) -> bool:
+def save_admin_empresas(empresas: List[dict], message: str, version: Optional[int] = None) -> bool:
     try:
         (BASE_DIR / "empresas.json").write_text(
             json.dumps(empresas, ensure_ascii=False, indent=2),
@@ -884,7 +1117,7 @@ def save_admin_empresas(empresas: List[dict], message: str) -> bool:
         )
     except Exception:
         pass
-    return save_github_json("empresas.json", empresas, message)
+    return save_github_json("empresas.json", empresas, message, expected_version=version)
 
 def find_empresa_index(empresas: List[dict], empresa_id: str) -> Optional[int]:
     if not empresa_id:
@@ -925,18 +1158,18 @@ def get_vagas_from_github() -> List[dict]:
     """Tenta buscar vagas via API (com token) e depois pela URL RAW"""
     print(f"Buscando vagas no GitHub... BRANCH={BRANCH}")
     
-    # Primeiro tenta via API com token
-    api_data = fetch_content_from_github("vagas.json")
+    # Primeiro tenta via API com token (ou pelo banco local, se ativo)
+    api_data = load_github_json("vagas.json", default=[]) if local_store.handles("vagas") else fetch_content_from_github("vagas.json")
     normalized = normalize_vagas_data(api_data) if api_data else []
     if normalized:
         print(f"Vagas encontradas via API: {len(normalized)}")
         return normalized
 
     # Se falhar, tenta via URL pública
-    raw_url = f"https://raw.githubusercontent.com/{GITHUB_OWNER}/{GITHUB_REPO}/{BRANCH}/vagas.json"
+    raw_url = f"{github_client.RAW_URL}/{GITHUB_OWNER}/{GITHUB_REPO}/{BRANCH}/vagas.json"
     print(f"Tentando buscar vagas via URL RAW: {raw_url}")
     try:
-        response = requests.get(raw_url, timeout=10)
+        response = github_client.get(raw_url, timeout=10)
         print(f"Status da resposta RAW: {response.status_code}")
         
         if response.status_code == 200:
@@ -959,7 +1192,7 @@ def get_vagas_from_github() -> List[dict]:
                 {"nome": "Operador de Caixa"}
             ], indent=2, ensure_ascii=False), "Criar arquivo de vagas"):
                 # Tentar novamente após criar
-                response = requests.get(raw_url, timeout=10)
+                response = github_client.get(raw_url, timeout=10)
                 if response.status_code == 200:
                     data = response.json()
                     return normalize_vagas_data(data)
@@ -976,82 +1209,80 @@ def get_vagas_from_github() -> List[dict]:
 
 def check_duplicate_candidate(cpf: str, vaga: str) -> bool:
     """Verifica se já existe candidatura para o CPF e vaga nos últimos 90 dias"""
-    # Primeiro executa limpeza automática
-    cleaned = clean_expired_candidates()
-    if cleaned > 0:
-        print(f"✅ {cleaned} candidaturas expiradas removidas durante verificação")
-    
-    existing = get_existing_candidates()
-    cpf_clean = re.sub(r'[^\d]', '', cpf)
-    vaga_lower = vaga.lower().strip()
-    
-    for existing_candidate in existing:
-        existing_cpf = re.sub(r'[^\d]', '', existing_candidate.get("cpf", ""))
-        existing_vaga = existing_candidate.get("vaga", "").lower().strip()
-        
-        if existing_cpf == cpf_clean and existing_vaga == vaga_lower:
-            if "enviado_em" in existing_candidate:
-                candidate_date = parse_iso_date(existing_candidate["enviado_em"])
-                if candidate_date:
-                    days_diff = (datetime.now() - candidate_date).days
-                    if days_diff < 90:
-                        return True
-                else:
-                    # Se não conseguir parsear a data, assume como duplicata por segurança
-                    return True
-    
-    return False
+    # Consulta o índice (CPF, vaga) -> última candidatura; reconstrói a partir do
+    # candidatos.json só quando o índice ainda não existe ou está vencido
+    if not candidate_index.is_fresh():
+        try:
+            total = candidate_index.rebuild(
+                get_existing_candidates(since=datetime.now() - timedelta(days=90), strict=True)
+            )
+            print(f"Índice de candidaturas reconstruído: {total} chaves")
+        except Exception as exc:
+            # a leitura falhou: segue com o índice anterior, e a próxima consulta tenta de novo
+            print(f"Aviso: índice de candidaturas mantido sem reconstrução: {exc}")
+
+    enviado_em = candidate_index.lookup(cpf, vaga)
+    if not enviado_em:
+        return False
+
+    candidate_date = parse_iso_date(enviado_em)
+    if candidate_date:
+        days_diff = (datetime.now() - candidate_date).days
+        return days_diff < 90
+    # Se não conseguir parsear a data, assume como duplicata por segurança
+    return True
 
 def save_candidate(candidate: dict) -> dict:
     """Salva candidato no arquivo JSON do GitHub"""
-    url = f"https://api.github.com/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/candidatos.json"
-    
-    # Obtém candidatos existentes
-    existing = get_existing_candidates()
+    url = f"{github_client.API_URL}/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/candidatos.json"
     
-    # Gera ID único
+    # Gera ID único (a fila de envios já define id e data antes da cópia local)
     cpf_clean = re.sub(r'[^\d]', '', candidate["cpf"])
     vaga_lower = candidate["vaga"].lower().strip()
-    candidate_id = hashlib.md5(f"{cpf_clean}_{vaga_lower}_{datetime.now().timestamp()}".encode()).hexdigest()[:12]
+    candidate_id = candidate.get("id") or hashlib.md5(
+        f"{cpf_clean}_{vaga_lower}_{datetime.now().timestamp()}".encode()
+    ).hexdigest()[:12]
     
     # Adiciona metadados
     candidate["id"] = candidate_id
-    candidate["enviado_em"] = datetime.now().isoformat()
+    candidate["enviado_em"] = candidate.get("enviado_em") or datetime.now().isoformat()
     candidate["status"] = "Novo"
     candidate["processado_em"] = datetime.now().isoformat()
-    
-    existing.append(candidate)
-    
-    # Prepara conteúdo para GitHub
-    content = json.dumps(existing, indent=2, ensure_ascii=False)
-    content_b64 = base64.b64encode(content.encode("utf-8")).decode("utf-8")
-    
-    # Obtém SHA do arquivo atual
-    sha = None
-    try:
-        current_response = requests.get(url, headers=headers)
-        if current_response.status_code == 200:
-            sha = current_response.json()["sha"]
-        elif current_response.status_code == 404:
-            print("Arquivo candidatos.json não existe, será criado")
-    except Exception as e:
-        print(f"Erro ao buscar SHA: {str(e)}")
-    
-    # Atualiza arquivo no GitHub
-    data = {
-        "message": f"Candidatura: {candidate['nome']} para {candidate['vaga']}",
-        "content": content_b64,
-        "branch": BRANCH
-    }
-    
-    if sha:
-        data["sha"] = sha
+    message = f"Candidatura: {candidate['nome']} para {candidate['vaga']}"
+
+    if local_store.handles("candidatos"):
+        try:
+            get_existing_candidates()  # garante o banco local preenchido antes do upsert
+            local_store.upsert("candidatos", candidate, message)
+            candidate_index.record(candidate)
+            candidate_listing.upsert(candidate)
+            return {"success": True, "data": {"local": True}}
+        except Exception as e:
+            print(f"Exceção ao salvar candidato no banco local: {str(e)}")
+            return {"success": False, "reason": "exception", "details": str(e)}
     
     try:
-        response = requests.put(url, headers=headers, json=data, timeout=30)
+        if candidate_shards.ENABLED:
+            # Só o arquivo do mês corrente é regravado
+            response = candidate_shards.append(candidate, message)
+        else:
+            # Atualiza arquivo no GitHub (o SHA lido em get_existing_candidates é reaproveitado;
+            # se outra gravação chegar antes, o client faz o merge por id e tenta de novo)
+            existing = get_existing_candidates()
+            existing.append(candidate)
+            response = github_client.put_records(
+                url,
+                headers,
+                existing,
+                message,
+                BRANCH,
+                timeout=30,
+            )
         print(f"Status ao salvar candidato: {response.status_code}")
         
         if response.status_code in [200, 201]:
+            candidate_index.record(candidate)
+            candidate_listing.upsert(candidate)
             return {"success": True, "data": response.json()}
         else:
             print(f"Erro ao salvar candidato: {response.status_code} - {response.text}")
@@ -1060,8 +1291,86 @@ def save_candidate(candidate: dict) -> dict:
         print(f"Exceção ao salvar candidato: {str(e)}")
         return {"success": False, "reason": "exception", "details": str(e)}
 
+CURRICULO_MAX_BYTES = 5 * 1024 * 1024
+# múltiplo de 3 para que cada bloco vire base64 sem padding intermediário
+UPLOAD_CHUNK_SIZE = 48 * 1024
+UPLOAD_SPOOL_BYTES = 1024 * 1024
+_OLE_SIGNATURE = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+_ZIP_SIGNATURE = b"PK\x03\x04"
+CURRICULO_SIGNATURES = {
+    "pdf": (b"%PDF-",),
+    # .doc e .docx são frequentemente renomeados entre si; aceita os dois formatos
+    "doc": (_OLE_SIGNATURE, _ZIP_SIGNATURE),
+    "docx": (_ZIP_SIGNATURE, _OLE_SIGNATURE),
+}
+
+def _signature_matches(head: bytes, ext: str) -> bool:
+    return any(head.startswith(signature) for signature in CURRICULO_SIGNATURES.get(ext, ()))
+
+def spool_curriculum(file: UploadFile) -> Tuple[BinaryIO, int, str]:
+    """Copia o upload em blocos para um arquivo temporário, validando tamanho e tipo durante a leitura.
+
+    Retorna o arquivo temporário (posicionado no início), o tamanho em bytes e o SHA-256.
+    """
+    filename = file.filename or ""
+    ext = filename.lower().split(".")[-1] if "." in filename else ""
+    spool = tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_BYTES)
+    digest = hashlib.sha256()
+    size = 0
+    head = b""
+    try:
+        while True:
+            chunk = file.file.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > CURRICULO_MAX_BYTES:
+                raise ValueError("Arquivo muito grande. Máximo 5MB.")
+            if len(head) < 8:
+                head += chunk[:8 - len(head)]
+                if len(head) == 8 and not _signature_matches(head, ext):
+                    raise ValueError("O conteúdo do arquivo não corresponde a um PDF, DOC ou DOCX válido.")
+            digest.update(chunk)
+            spool.write(chunk)
+        if size == 0:
+            raise ValueError("Arquivo vazio.")
+        if len(head) < 8 and not _signature_matches(head, ext):
+            raise ValueError("O conteúdo do arquivo não corresponde a um PDF, DOC ou DOCX válido.")
+    except Exception:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool, size, digest.hexdigest()
+
+def _base64_file(source: BinaryIO) -> str:
+    source.seek(0)
+    parts = []
+    while True:
+        chunk = source.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        parts.append(base64.b64encode(chunk).decode("ascii"))
+    return "".join(parts)
+
 def save_curriculum_to_github(file: UploadFile, candidate_name: str, cpf: str, vaga: str) -> str:
     """Salva arquivo do currículo na pasta curriculos do GitHub"""
+    spool, _, _ = spool_curriculum(file)
+    with spool:
+        return upload_curriculum(spool, file.filename, candidate_name, cpf, vaga)
+
+def upload_curriculum(
+    source: BinaryIO,
+    original_filename: str,
+    candidate_name: str,
+    cpf: str,
+    vaga: str,
+    sha256: Optional[str] = None,
+) -> str:
+    """Envia o currículo (arquivo já validado) para a pasta curriculos do GitHub e retorna a URL raw
+
+    Com `sha256`, o arquivo é gravado como `curriculos/<sha256>.<ext>`: currículos idênticos
+    (ex.: o mesmo PDF para várias vagas) são enviados e armazenados uma única vez.
+    """
     cpf_clean = re.sub(r'[^\d]', '', cpf)[:11]
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     
@@ -1070,7 +1379,7 @@ def save_curriculum_to_github(file: UploadFile, candidate_name: str, cpf: str, v
     safe_vaga = sanitize_filename(vaga)
     
     # Mantém extensão original
-    original_filename = file.filename
+    original_filename = original_filename or ""
     if "." in original_filename:
         ext = original_filename.split(".")[-1].lower()
         if ext not in ["pdf", "doc", "docx"]:
@@ -1078,22 +1387,23 @@ def save_curriculum_to_github(file: UploadFile, candidate_name: str, cpf: str, v
     else:
         ext = "pdf"
     
-    # Nome do arquivo: CPF_Nome_Vaga_Data.Extensão
-    filename = f"{cpf_clean}_{safe_name}_{safe_vaga}_{timestamp}.{ext}"
-    filename = filename.replace(" ", "_")
-    
-    # Lê conteúdo do arquivo
-    file_content = file.file.read()
-    
-    # Verifica tamanho (máximo 5MB)
-    if len(file_content) > 5 * 1024 * 1024:
-        raise ValueError("Arquivo muito grande. Máximo 5MB.")
-    
-    content_b64 = base64.b64encode(file_content).decode("utf-8")
+    if sha256:
+        # Nome do arquivo pelo conteúdo: Hash.Extensão
+        filename = f"{sha256}.{ext}"
+    else:
+        # Nome do arquivo: CPF_Nome_Vaga_Data.Extensão
+        filename = f"{cpf_clean}_{safe_name}_{safe_vaga}_{timestamp}.{ext}"
+        filename = filename.replace(" ", "_")
     
     # URL para upload na pasta curriculos
     file_path = f"curriculos/{filename}"
-    url = f"https://api.github.com/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{file_path}"
+    url = f"{github_client.API_URL}/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{file_path}"
+    raw_url = f"{github_client.RAW_URL}/{GITHUB_OWNER}/{GITHUB_REPO}/{BRANCH}/{file_path}"
+    if sha256 and github_client.known_sha(url):
+        print(f"Currículo já armazenado: {raw_url}")
+        return raw_url
+    
+    content_b64 = _base64_file(source)
     
     data = {
         "message": f"Currículo: {candidate_name} - {vaga}",
@@ -1102,13 +1412,17 @@ def save_curriculum_to_github(file: UploadFile, candidate_name: str, cpf: str, v
     }
     
     try:
-        response = requests.put(url, headers=headers, json=data, timeout=30)
+        response = github_client.put(url, headers=headers, json=data, timeout=30)
         print(f"Status ao salvar currículo: {response.status_code}")
         
         if response.status_code in [200, 201]:
-            raw_url = f"https://raw.githubusercontent.com/{GITHUB_OWNER}/{GITHUB_REPO}/{BRANCH}/{file_path}"
+            github_client.remember_file(url, (response.json().get("content") or {}).get("sha"))
             print(f"Currículo salvo com sucesso: {raw_url}")
             return raw_url
+        elif sha256 and response.status_code == 422 and "sha" in response.text:
+            # O arquivo já existe (o GitHub exige o sha para sobrescrever): mesmo conteúdo, nada a enviar
+            print(f"Currículo já armazenado: {raw_url}")
+            return raw_url
         elif response.status_code == 404:
             # Pasta não existe, tentar criar
             print("Pasta curriculos não existe, criando...")
@@ -1116,9 +1430,8 @@ def save_curriculum_to_github(file: UploadFile, candidate_name: str, cpf: str, v
                                   "# Pasta de Currículos\n\nEsta pasta armazena os currículos enviados pelos candidatos.",
                                   "Criar pasta curriculos"):
                 # Tentar novamente após criar a pasta
-                response = requests.put(url, headers=headers, json=data, timeout=30)
+                response = github_client.put(url, headers=headers, json=data, timeout=30)
                 if response.status_code in [200, 201]:
-                    raw_url = f"https://raw.githubusercontent.com/{GITHUB_OWNER}/{GITHUB_REPO}/{BRANCH}/{file_path}"
                     print(f"Currículo salvo após criar pasta: {raw_url}")
                     return raw_url
                 else:
@@ -1138,46 +1451,32 @@ def _get_local_dated_dir(kind: str, when: Optional[datetime]) -> Path:
     when = when or datetime.now()
     return _get_local_base_dir() / kind / f"{when.year}" / f"{when.month:02d}"
 
-def _upsert_local_index(index_path: Path, entry: dict) -> None:
-    existing = []
-    index_path.parent.mkdir(parents=True, exist_ok=True)
-    if index_path.exists():
-        try:
-            existing = json.loads(index_path.read_text(encoding="utf-8"))
-        except Exception:
-            existing = []
-    if isinstance(existing, list):
-        entry_id = entry.get("id")
-        if entry_id:
-            replaced = False
-            for i, item in enumerate(existing):
-                if isinstance(item, dict) and item.get("id") == entry_id:
-                    existing[i] = entry
-                    replaced = True
-                    break
-            if not replaced:
-                existing.append(entry)
-        else:
-            existing.append(entry)
+def save_curriculum_locally(
+    file: Union[UploadFile, BinaryIO],
+    filename: str,
+    when: Optional[datetime],
+    content_hash: Optional[str] = None,
+) -> Path:
+    if content_hash:
+        # Guardado pelo conteúdo: o mesmo arquivo é copiado uma única vez
+        base_dir = _get_local_base_dir() / "curriculos" / "sha256"
     else:
-        existing = [entry]
-    index_path.write_text(json.dumps(existing, indent=2, ensure_ascii=False), encoding="utf-8")
-
-def save_curriculum_locally(file: UploadFile, filename: str, when: Optional[datetime]) -> Path:
-    base_dir = _get_local_dated_dir("curriculos", when)
+        base_dir = _get_local_dated_dir("curriculos", when)
     base_dir.mkdir(parents=True, exist_ok=True)
     safe_filename = sanitize_filename(filename)
     if not safe_filename:
         safe_filename = "curriculo"
     file_path = base_dir / safe_filename
+    if content_hash and file_path.exists():
+        return file_path
+    source = file.file if isinstance(file, UploadFile) else file
     # Reposiciona o ponteiro do arquivo para garantir leitura completa
     try:
-        file.file.seek(0)
+        source.seek(0)
     except Exception:
         pass
-    content = file.file.read()
     with open(file_path, "wb") as out_file:
-        out_file.write(content)
+        shutil.copyfileobj(source, out_file, UPLOAD_CHUNK_SIZE)
     return file_path
 
 def save_candidate_locally(candidate: dict, local_file_path: Optional[Path]) -> Path:
@@ -1192,7 +1491,8 @@ def save_candidate_locally(candidate: dict, local_file_path: Optional[Path]) ->
     if local_file_path:
         payload["arquivo_local"] = str(local_file_path)
     file_path.write_text(json.dumps(payload, indent=2, ensure_ascii=False), encoding="utf-8")
-    _upsert_local_index(_get_local_base_dir() / "candidatos.json", payload)
+    # Acréscimo no diário local; o candidatos.json só é regravado na compactação
+    candidate_journal.append(_get_local_base_dir(), payload)
     return file_path
 
 # ==================== MIDDLEWARE CORS ====================
@@ -1334,11 +1634,11 @@ def backup_scheduler_loop():
 
 @app.on_event("startup")
 async def start_backup_scheduler():
-    thread = threading.Thread(target=backup_scheduler_loop, daemon=True)
+    thread = threading.Thread(target=github_client.background(backup_scheduler_loop), daemon=True)
     thread.start()
 
 @app.get("/api/backup/status")
-async def get_backup_status():
+def get_backup_status():
     status = {
         **BACKUP_STATUS,
         "backup_dir": DEFAULT_BACKUP_DIR,
@@ -1350,15 +1650,15 @@ async def get_backup_status():
     return {"ok": True, "status": status}
 
 @app.post("/api/backup/run")
-async def run_backup_now():
+def run_backup_now():
     if BACKUP_PROGRESS.get("status") == "running":
         raise HTTPException(status_code=409, detail="Já existe um processo de backup/restore em execução.")
-    thread = threading.Thread(target=run_backup_task, daemon=True)
+    thread = threading.Thread(target=github_client.background(run_backup_task), daemon=True)
     thread.start()
     return {"ok": True, "message": "Backup iniciado."}
 
 @app.get("/api/backup/progress")
-async def get_backup_progress():
+def get_backup_progress():
     return {"ok": True, "progress": BACKUP_PROGRESS}
 
 RESTORE_FILES = {
@@ -1396,15 +1696,15 @@ def run_restore_task(payload: dict):
     _update_progress("completed", "restore", total_steps, total_steps, "Restauração concluída.")
 
 @app.post("/api/backup/restore")
-async def restore_backup(file: UploadFile = File(...)):
+def restore_backup(file: UploadFile = File(...)):
     if BACKUP_PROGRESS.get("status") == "running":
         raise HTTPException(status_code=409, detail="Já existe um processo de backup/restore em execução.")
     try:
-        content = await file.read()
+        content = file.file.read()
         payload = json.loads(content.decode("utf-8"))
     except Exception as exc:
         raise HTTPException(status_code=400, detail=f"Arquivo de backup inválido: {exc}")
-    thread = threading.Thread(target=run_restore_task, args=(payload,), daemon=True)
+    thread = threading.Thread(target=github_client.background(run_restore_task), args=(payload,), daemon=True)
     thread.start()
     return {"ok": True, "message": "Restauração iniciada."}
 app.include_router(lideres_router)
@@ -1422,39 +1722,41 @@ for mount, folder, base_dir in [
 # ==================== ENDPOINTS ====================
 
 @app.get("/funcionarios-ativos.json")
-async def serve_funcionarios_ativos():
+def serve_funcionarios_ativos():
     data_path = BASE_DIR / "funcionarios-ativos.json"
     if not data_path.exists():
         raise HTTPException(status_code=404, detail="Arquivo de funcionários ativos não encontrado.")
     return FileResponse(data_path, media_type="application/json")
 
 @app.get("/")
-async def root():
+def root():
     dashboard = RESOURCE_BASE / "dashboard.html"
     if dashboard.exists():
         return RedirectResponse(url="/dashboard.html")
     return {"message": "API de Candidaturas - Popular Atacarejo", "status": "online"}
 
 @app.get("/{page_name}.html")
-async def serve_html(page_name: str):
+def serve_html(page_name: str):
     page_path = RESOURCE_BASE / f"{page_name}.html"
     if not page_path.exists():
         raise HTTPException(status_code=404, detail="Pagina nao encontrada.")
     return FileResponse(str(page_path))
 
 @app.get("/health")
-async def health():
-    repo_accessible = check_repo_access()
+def health():
+    # Resultado da última verificação em segundo plano; nenhuma chamada ao GitHub aqui
+    repo = repo_health.status()
     return {
         "ok": True, 
         "timestamp": datetime.now().isoformat(), 
         "service": "candidaturas-api",
-        "github_repo_accessible": repo_accessible,
+        "github_repo_accessible": repo["acessivel"],
+        "github_repo_checked_at": repo["verificado_em"],
         "branch": BRANCH
     }
 
 @app.get("/api/feriados")
-async def api_feriados(year: Optional[int] = None):
+def api_feriados(year: Optional[int] = None):
     try:
         target_year = year or datetime.now().year
         payload = get_feriados(target_year)
@@ -1465,7 +1767,7 @@ async def api_feriados(year: Optional[int] = None):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/feriados/refresh")
-async def api_feriados_refresh(year: Optional[int] = None):
+def api_feriados_refresh(year: Optional[int] = None):
     try:
         target_year = year or datetime.now().year
         payload = refresh_feriados(target_year)
@@ -1476,26 +1778,34 @@ async def api_feriados_refresh(year: Optional[int] = None):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/wakeup")
-async def wakeup():
+def wakeup():
     return {"ok": True, "message": "Servidor ativo", "timestamp": datetime.now().isoformat()}
 
 @app.get("/status")
-async def status():
-    # Executa limpeza automática ao verificar status
-    cleaned = clean_expired_candidates()
-    status_msg = "online"
-    if cleaned > 0:
-        status_msg = f"online (limpeza: {cleaned} expirados removidos)"
+def status():
+    # A limpeza roda no agendamento do expiry_sweeper; aqui só o resultado da última execução
+    sweep = expiry_sweeper.stats()
+    cleaned = (sweep.get("ultima_execucao") or {}).get("removidas", 0)
     
     return {
-        "status": status_msg, 
+        "status": "online", 
         "timestamp": datetime.now().isoformat(), 
         "branch": BRANCH,
-        "limpeza_executada": cleaned
+        "limpeza_executada": cleaned,
+        "limpeza": sweep,
+        "github_repo": repo_health.status(),
+        "write_behind": write_behind.stats(),
+        "local_store": local_store.stats(),
+        "envios": submission_queue.stats(),
+        "curriculos_indice": resume_index.stats(),
+        "visualizacoes": candidate_views.stats(),
+        "backup_local": candidate_journal.stats(),
+        "arquivo_morto": candidate_archive.stats(),
+        "github_rate_limit": github_client.rate_limit_status()
     }
 
 @app.get("/api/vagas")
-async def get_vagas():
+def get_vagas():
     """Retorna vagas do arquivo JSON no GitHub"""
     try:
         # Verifica cache primeiro
@@ -1542,7 +1852,7 @@ async def get_vagas():
         ]
 
 @app.get("/api/admin/vagas")
-async def admin_list_vagas(status: Optional[str] = None, search: Optional[str] = None):
+def admin_list_vagas(status: Optional[str] = None, search: Optional[str] = None):
     """Lista vagas com filtros para o painel admin"""
     try:
         vagas = load_admin_vagas()
@@ -1563,14 +1873,14 @@ async def admin_list_vagas(status: Optional[str] = None, search: Optional[str] =
         return {"ok": False, "message": str(e)}
 
 @app.post("/api/admin/vagas")
-async def admin_create_vaga(payload: dict):
+def admin_create_vaga(payload: dict):
     if not GITHUB_TOKEN:
         raise HTTPException(status_code=500, detail="Token do GitHub nÃ£o configurado.")
     nome = (payload.get("nome") or "").strip()
     if not nome:
         raise HTTPException(status_code=400, detail="Nome da vaga e obrigatorio.")
 
-    vagas = load_admin_vagas()
+    vagas, version = load_admin_vagas_versioned()
     vaga_id = normalize_vaga_id(payload.get("id") or nome)
     if any((v.get("id") or "").lower() == vaga_id.lower() for v in vagas):
         raise HTTPException(status_code=409, detail="Ja existe uma vaga com este id.")
@@ -1596,12 +1906,12 @@ async def admin_create_vaga(payload: dict):
     nova = {k: v for k, v in nova.items() if v is not None}
     vagas.append(nova)
 
-    if not save_admin_vagas(vagas, f"Criar vaga {vaga_id}"):
+    if not save_admin_vagas(vagas, f"Criar vaga {vaga_id}", version):
         raise HTTPException(status_code=500, detail="Erro ao salvar vagas no GitHub.")
     return {"ok": True, "message": "Vaga criada com sucesso", "vaga": nova}
 
 @app.get("/api/admin/vagas/{vaga_id}")
-async def admin_get_vaga(vaga_id: str):
+def admin_get_vaga(vaga_id: str):
     vagas = load_admin_vagas()
     idx = find_vaga_index(vagas, vaga_id)
     if idx is None:
@@ -1609,10 +1919,10 @@ async def admin_get_vaga(vaga_id: str):
     return {"ok": True, "vaga": vagas[idx]}
 
 @app.put("/api/admin/vagas/{vaga_id}")
-async def admin_update_vaga(vaga_id: str, payload: dict):
+def admin_update_vaga(vaga_id: str, payload: dict):
     if not GITHUB_TOKEN:
         raise HTTPException(status_code=500, detail="Token do GitHub nÃ£o configurado.")
-    vagas = load_admin_vagas()
+    vagas, version = load_admin_vagas_versioned()
     idx = find_vaga_index(vagas, vaga_id)
     if idx is None:
         raise HTTPException(status_code=404, detail="Vaga nao encontrada.")
@@ -1629,20 +1939,20 @@ async def admin_update_vaga(vaga_id: str, payload: dict):
     vaga["updated_at"] = datetime.now().isoformat()
     vagas[idx] = vaga
 
-    if not save_admin_vagas(vagas, f"Atualizar vaga {vaga_id}"):
+    if not save_admin_vagas(vagas, f"Atualizar vaga {vaga_id}", version):
         raise HTTPException(status_code=500, detail="Erro ao salvar vagas no GitHub.")
     return {"ok": True, "message": "Vaga atualizada com sucesso", "vaga": vaga}
 
 @app.delete("/api/admin/vagas/{vaga_id}")
-async def admin_delete_vaga(vaga_id: str):
+def admin_delete_vaga(vaga_id: str):
     if not GITHUB_TOKEN:
         raise HTTPException(status_code=500, detail="Token do GitHub nÃ£o configurado.")
-    vagas = load_admin_vagas()
+    vagas, version = load_admin_vagas_versioned()
     idx = find_vaga_index(vagas, vaga_id)
     if idx is None:
         raise HTTPException(status_code=404, detail="Vaga nao encontrada.")
     vaga = vagas.pop(idx)
-    if not save_admin_vagas(vagas, f"Excluir vaga {vaga_id}"):
+    if not save_admin_vagas(vagas, f"Excluir vaga {vaga_id}", version):
         raise HTTPException(status_code=500, detail="Erro ao salvar vagas no GitHub.")
     return {"ok": True, "message": "Vaga excluida com sucesso", "vaga": vaga}
 
@@ -1650,7 +1960,7 @@ async def admin_delete_vaga(vaga_id: str):
 
 
 @app.get("/api/empresas")
-async def list_empresas_public(search: Optional[str] = None):
+def list_empresas_public(search: Optional[str] = None):
     try:
         empresas = load_admin_empresas()
         search_filter = (search or "").strip().lower()
@@ -1672,7 +1982,7 @@ async def list_empresas_public(search: Optional[str] = None):
         return {"ok": False, "message": str(exc)}
 
 @app.get("/api/admin/lideres")
-async def admin_list_lideres():
+def admin_list_lideres():
     try:
         lideres, _ = _load_lideres_admin()
         sorted_list = sorted(lideres, key=lambda l: l.get("nome", ""))
@@ -1681,7 +1991,7 @@ async def admin_list_lideres():
         return {"ok": False, "message": str(exc)}
 
 @app.get("/api/admin/empresas")
-async def admin_list_empresas(search: Optional[str] = None):
+def admin_list_empresas(search: Optional[str] = None):
     try:
         empresas = load_admin_empresas()
         search_filter = (search or "").strip().lower()
@@ -1703,14 +2013,14 @@ async def admin_list_empresas(search: Optional[str] = None):
         return {"ok": False, "message": str(exc)}
 
 @app.post("/api/admin/empresas")
-async def admin_create_empresa(payload: dict):
+def admin_create_empresa(payload: dict):
     if not GITHUB_TOKEN:
         raise HTTPException(status_code=500, detail="Token do GitHub nao configurado.")
     cnpj_digits = re.sub(r"\D", "", payload.get("cnpj", ""))
     if len(cnpj_digits) != 14:
         raise HTTPException(status_code=400, detail="CNPJ invalido.")
 
-    empresas = load_admin_empresas()
+    empresas, version = load_admin_empresas_versioned()
     if any(re.sub(r"\D", "", (e.get("cnpj") or "")) == cnpj_digits for e in empresas):
         raise HTTPException(status_code=409, detail="Empresa ja cadastrada com este CNPJ.")
 
@@ -1722,15 +2032,15 @@ async def admin_create_empresa(payload: dict):
     nova.setdefault("salvo_em", now_iso)
 
     empresas.append(nova)
-    if not save_admin_empresas(empresas, f"Criar empresa {empresa_id}"):
+    if not save_admin_empresas(empresas, f"Criar empresa {empresa_id}", version):
         raise HTTPException(status_code=500, detail="Erro ao salvar empresas no GitHub.")
     return {"ok": True, "message": "Empresa criada com sucesso", "empresa": nova}
 
 @app.put("/api/admin/empresas/{empresa_id}")
-async def admin_update_empresa(empresa_id: str, payload: dict):
+def admin_update_empresa(empresa_id: str, payload: dict):
     if not GITHUB_TOKEN:
         raise HTTPException(status_code=500, detail="Token do GitHub nao configurado.")
-    empresas = load_admin_empresas()
+    empresas, version = load_admin_empresas_versioned()
     idx = find_empresa_index(empresas, empresa_id)
     if idx is None:
         raise HTTPException(status_code=404, detail="Empresa nao encontrada.")
@@ -1754,32 +2064,35 @@ async def admin_update_empresa(empresa_id: str, payload: dict):
 
     empresa["atualizado_em"] = datetime.now().isoformat()
     empresas[idx] = empresa
-    if not save_admin_empresas(empresas, f"Atualizar empresa {empresa.get('id') or empresa_id}"):
+    if not save_admin_empresas(empresas, f"Atualizar empresa {empresa.get('id') or empresa_id}", version):
         raise HTTPException(status_code=500, detail="Erro ao salvar empresas no GitHub.")
     return {"ok": True, "message": "Empresa atualizada com sucesso", "empresa": empresa}
 
 @app.delete("/api/admin/empresas/{empresa_id}")
-async def admin_delete_empresa(empresa_id: str):
+def admin_delete_empresa(empresa_id: str):
     if not GITHUB_TOKEN:
         raise HTTPException(status_code=500, detail="Token do GitHub nao configurado.")
-    empresas = load_admin_empresas()
+    empresas, version = load_admin_empresas_versioned()
     idx = find_empresa_index(empresas, empresa_id)
     if idx is None:
         raise HTTPException(status_code=404, detail="Empresa nao encontrada.")
     empresa = empresas.pop(idx)
-    if not save_admin_empresas(empresas, f"Excluir empresa {empresa.get('id') or empresa_id}"):
+    if not save_admin_empresas(empresas, f"Excluir empresa {empresa.get('id') or empresa_id}", version):
         raise HTTPException(status_code=500, detail="Erro ao salvar empresas no GitHub.")
     return {"ok": True, "message": "Empresa excluida com sucesso", "empresa": empresa}
 
 @app.post("/api/cleanup")
-async def manual_cleanup():
-    """Endpoint manual para limpeza de candidaturas expiradas"""
+def manual_cleanup():
+    """Endpoint manual para limpeza de candidaturas expiradas: antecipa a execução agendada"""
     try:
-        cleaned = clean_expired_candidates()
+        if not expiry_sweeper.trigger():
+            expiry_sweeper.start(sweep_expired_candidates)
+            expiry_sweeper.trigger()
+        sweep = expiry_sweeper.stats()
         return {
             "ok": True,
-            "message": f"✅ Limpeza executada: {cleaned} candidaturas expiradas removidas",
-            "removed_count": cleaned
+            "message": "✅ Limpeza agendada; o resultado aparece em /status",
+            "ultima_execucao": sweep.get("ultima_execucao"),
         }
     except Exception as e:
         return {
@@ -1788,7 +2101,7 @@ async def manual_cleanup():
         }
 
 @app.get("/api/candidatos/ativos")
-async def get_candidatos_ativos():
+def get_candidatos_ativos():
     """Retorna apenas candidaturas ativas (menos de 90 dias)"""
     try:
         candidates = get_existing_candidates(clean_expired=True)
@@ -1805,38 +2118,72 @@ async def get_candidatos_ativos():
             "error": str(e)
         }
 
-@app.get("/api/admin/candidatos")
-async def admin_list_candidatos(status: Optional[str] = None, search: Optional[str] = None, expirados: Optional[bool] = False):
-    """Lista candidaturas para o painel admin"""
-    try:
-        candidatos = get_existing_candidates(clean_expired=False)
-
-        if not expirados:
-            candidatos = [c for c in candidatos if not is_candidate_expired(c)]
+def _candidate_period(
+    desde: Optional[str], ate: Optional[str], expirados: Optional[bool]
+) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """Período de envio (início, fim exclusivo) dos filtros `desde`/`ate`; sem `expirados`, no máximo 90 dias"""
+    since = parse_iso_date(desde or "")
+    until = parse_iso_date(ate or "")
+    if until and len(ate or "") <= 10:
+        until += timedelta(days=1)
+    if since:
+        since = since.replace(tzinfo=None)
+    if until:
+        until = until.replace(tzinfo=None)
+    if not expirados:
+        active_since = datetime.now() - timedelta(days=90)
+        since = max(since, active_since) if since else active_since
+    return since, until
 
-        status_filter = (status or "").strip().lower()
-        if status_filter:
-            candidatos = [c for c in candidatos if (c.get("status") or "").lower() == status_filter]
+@app.get("/api/admin/candidatos")
+def admin_list_candidatos(
+    status: Optional[str] = None,
+    search: Optional[str] = None,
+    expirados: Optional[bool] = False,
+    desde: Optional[str] = None,
+    ate: Optional[str] = None,
+    vaga: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+):
+    """Lista candidaturas para o painel admin, das mais recentes para as mais antigas
 
-        search_filter = (search or "").strip().lower()
-        if search_filter:
-            search_digits = re.sub(r"\D", "", search_filter)
-            def matches(candidate: dict) -> bool:
-                nome = (candidate.get("nome") or "").lower()
-                email = (candidate.get("email") or "").lower()
-                cpf_digits = re.sub(r"\D", "", candidate.get("cpf") or "")
-                return (search_filter in nome) or (search_filter in email) or (search_digits and search_digits in cpf_digits)
-            candidatos = [c for c in candidatos if matches(c)]
-
-        candidatos.sort(
-            key=lambda c: (parse_iso_date(c.get("enviado_em") or "") or datetime.min),
-            reverse=True
+    `desde`/`ate` (AAAA-MM-DD) restringem o período de envio; sem `expirados`, a
+    janela começa 90 dias atrás. Com `limit`, devolve uma página e `next_cursor`,
+    que é passado em `cursor` para buscar a seguinte.
+    """
+    try:
+        since, until = _candidate_period(desde, ate, expirados)
+        if limit is not None:
+            limit = max(1, min(limit, 1000))
+
+        # o índice mantém o conjunto completo ordenado; filtros e páginas saem dele
+        _refresh_candidate_listing()
+
+        def matches(candidate: dict) -> bool:
+            return expirados or not is_candidate_expired(candidate)
+
+        # com busca, a ordem passa a ser por relevância (nome, email ou CPF; sem acentos)
+        search_filter = (search or "").strip()
+        scores = candidate_listing.search(search_filter) if search_filter else None
+
+        candidatos, next_cursor = candidate_listing.page(
+            limit=limit,
+            cursor=cursor,
+            status=(status or "").strip() or None,
+            vaga=(vaga or "").strip() or None,
+            since=since,
+            until=until,
+            include_undated=not (desde or ate),
+            predicate=matches,
+            scores=scores,
         )
 
         return {
             "ok": True,
             "count": len(candidatos),
-            "candidatos": candidatos
+            "candidatos": candidate_views.decorate(candidatos),
+            "next_cursor": next_cursor
         }
     except Exception as e:
         return {
@@ -1844,18 +2191,115 @@ async def admin_list_candidatos(status: Optional[str] = None, search: Optional[s
             "error": str(e)
         }
 
+CANDIDATE_EXPORT_COLUMNS = [
+    "id", "nome", "cpf", "email", "telefone", "cep", "cidade", "bairro", "rua",
+    "transporte", "vaga", "status", "enviado_em", "arquivo_url",
+]
+
+@app.get("/api/admin/candidatos/exportar")
+def admin_export_candidatos(
+    formato: str = "csv",
+    colunas: Optional[str] = None,
+    separador: str = ";",
+    status: Optional[str] = None,
+    vaga: Optional[str] = None,
+    expirados: Optional[bool] = False,
+    desde: Optional[str] = None,
+    ate: Optional[str] = None,
+):
+    """Exporta as candidaturas (mais recentes primeiro) em CSV ou NDJSON, enviadas aos poucos
+
+    Aceita os mesmos filtros da listagem; `colunas` ("nome,cpf,vaga") escolhe os campos.
+    As linhas são lidas do índice da listagem em lotes, sem montar a lista inteira.
+    """
+    since, until = _candidate_period(desde, ate, expirados)
+    _refresh_candidate_listing()
+
+    def matches(candidate: dict) -> bool:
+        return expirados or not is_candidate_expired(candidate)
+
+    def rows():
+        cursor = None
+        while True:
+            batch, cursor = candidate_listing.page(
+                limit=500,
+                cursor=cursor,
+                status=(status or "").strip() or None,
+                vaga=(vaga or "").strip() or None,
+                since=since,
+                until=until,
+                include_undated=not (desde or ate),
+                predicate=matches,
+            )
+            yield from batch
+            if not cursor:
+                return
+
+    return record_export.streaming_response(
+        rows(),
+        formato,
+        record_export.parse_columns(colunas),
+        CANDIDATE_EXPORT_COLUMNS,
+        "candidatos",
+        separador,
+    )
+
+@app.get("/api/admin/candidatos/arquivo")
+def admin_archived_candidatos(cpf: str):
+    """Candidaturas expiradas do CPF guardadas no arquivo morto (para auditoria)"""
+    if not re.sub(r"\D", "", cpf or ""):
+        raise HTTPException(status_code=400, detail="Informe o CPF")
+    try:
+        candidatos = candidate_archive.lookup_cpf(cpf)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao consultar o arquivo morto: {str(e)}")
+    return {"ok": True, "count": len(candidatos), "candidatos": candidatos}
+
+@app.get("/api/admin/candidatos/busca")
+def admin_search_candidatos(q: str, limit: int = 50, expirados: Optional[bool] = False):
+    """Busca candidaturas pelo texto do currículo (ex.: "empilhadeira", "caixa experiência")"""
+    since = None if expirados else datetime.now() - timedelta(days=90)
+    limit = max(1, min(limit, 500))
+    started = time.perf_counter()
+    results = resume_index.search(q, since=since, limit=limit)
+    if not results:
+        return {"ok": True, "count": 0, "tempo_ms": _elapsed_ms(started), "candidatos": []}
+
+    # os registros saem do índice da listagem, sem reler as candidaturas a cada busca
+    _refresh_candidate_listing()
+    found = []
+    for candidate_id, score in results:
+        candidate = candidate_listing.get(candidate_id)
+        if candidate is None or (not expirados and is_candidate_expired(candidate)):
+            continue
+        found.append({**candidate, "relevancia": score})
+    return {"ok": True, "count": len(found), "tempo_ms": _elapsed_ms(started), "candidatos": found}
+
+@app.post("/api/admin/candidatos/indice")
+def admin_rebuild_candidate_index():
+    """Reconstrói o índice (CPF, vaga) usado na verificação de candidaturas duplicadas"""
+    started = time.perf_counter()
+    try:
+        candidatos = get_existing_candidates(since=datetime.now() - timedelta(days=90), strict=True)
+    except Exception as exc:
+        raise HTTPException(status_code=503, detail=f"Não foi possível ler as candidaturas: {exc}")
+    total = candidate_index.rebuild(candidatos)
+    return {"ok": True, "chaves": total, "tempo_ms": round((time.perf_counter() - started) * 1000, 1)}
+
 @app.delete("/api/admin/candidatos/{candidate_id}")
-async def admin_delete_candidato(candidate_id: str):
-    url = f"https://api.github.com/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/candidatos.json"
+def admin_delete_candidato(candidate_id: str):
+    url = f"{github_client.API_URL}/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/candidatos.json"
     try:
-        response = requests.get(url, headers=headers, timeout=10)
-        if response.status_code != 200:
-            raise HTTPException(status_code=404, detail="Arquivo candidatos.json não encontrado.")
-        payload = response.json()
-        content = payload.get("content") or ""
-        sha = payload.get("sha")
-        decoded = base64.b64decode(content).decode("utf-8")
-        candidatos = json.loads(decoded)
+        if local_store.handles("candidatos") or candidate_shards.ENABLED:
+            candidatos = get_existing_candidates()
+            sha = None
+        else:
+            response = github_client.get(url, headers=headers, timeout=10)
+            if response.status_code != 200:
+                raise HTTPException(status_code=404, detail="Arquivo candidatos.json não encontrado.")
+            payload = github_client.payload_from_response(url, response)
+            sha = payload.get("sha")
+            candidatos = github_client.load_json(url, payload, headers=headers)
         if not isinstance(candidatos, list):
             raise HTTPException(status_code=500, detail="Formato inválido em candidatos.json.")
 
@@ -1863,26 +2307,37 @@ async def admin_delete_candidato(candidate_id: str):
         if not target:
             raise HTTPException(status_code=404, detail="Candidatura não encontrada.")
 
-        candidatos = [c for c in candidatos if str(c.get("id")) != str(candidate_id)]
+        message = f"Excluir candidatura: {target.get('nome', 'candidato')} ({candidate_id})"
+        if local_store.handles("candidatos"):
+            local_store.delete("candidatos", candidate_id, message)
+        elif candidate_shards.ENABLED:
+            update_response = candidate_shards.remove(candidate_id, message, hint=target)
+            if not update_response:
+                status_code = update_response.status_code if update_response is not None else 404
+                raise HTTPException(status_code=500, detail=f"Erro ao atualizar candidaturas do mês: {status_code}")
+        else:
+            candidatos = [c for c in candidatos if str(c.get("id")) != str(candidate_id)]
+            update_response = github_client.put_records(
+                url,
+                headers,
+                candidatos,
+                message,
+                BRANCH,
+                sha=sha,
+                timeout=30,
+            )
+            if update_response.status_code not in [200, 201]:
+                raise HTTPException(status_code=500, detail=f"Erro ao atualizar candidatos.json: {update_response.status_code}")
 
-        updated_content = json.dumps(candidatos, indent=2, ensure_ascii=False)
-        content_b64 = base64.b64encode(updated_content.encode("utf-8")).decode("utf-8")
-        update_data = {
-            "message": f"Excluir candidatura: {target.get('nome', 'candidato')} ({candidate_id})",
-            "content": content_b64,
-            "sha": sha,
-            "branch": BRANCH
-        }
-        update_response = requests.put(url, headers=headers, json=update_data, timeout=30)
-        if update_response.status_code not in [200, 201]:
-            raise HTTPException(status_code=500, detail=f"Erro ao atualizar candidatos.json: {update_response.status_code}")
+        candidate_index.invalidate()
+        candidate_listing.remove(candidate_id)
+        candidate_views.forget([candidate_id])
+        resume_index.forget([candidate_id])
 
-        if target.get("arquivo_url"):
+        remaining = [c for c in candidatos if str(c.get("id")) != str(candidate_id)]
+        for file_path in _unreferenced_curricula([target], remaining):
             try:
-                file_url = target.get("arquivo_url", "")
-                path_match = re.search(f"{BRANCH}/(.+)", file_url)
-                if path_match:
-                    delete_github_file(path_match.group(1))
+                delete_github_file(file_path)
             except Exception:
                 pass
 
@@ -1893,90 +2348,35 @@ async def admin_delete_candidato(candidate_id: str):
         raise HTTPException(status_code=500, detail=f"Erro ao excluir candidatura: {exc}")
 
 @app.post("/api/admin/candidatos/{candidate_id}/visualizar")
-async def admin_visualizar_candidato(candidate_id: str, payload: dict):
-    if not GITHUB_TOKEN:
-        raise HTTPException(status_code=500, detail="Token do GitHub não configurado.")
-
+def admin_visualizar_candidato(candidate_id: str, payload: dict):
     viewer = (payload.get("visualizador") or "").strip() or "Usuario"
-    candidatos = load_github_json("candidatos.json", default=[])
-    if not isinstance(candidatos, list):
-        raise HTTPException(status_code=500, detail="Formato inválido em candidatos.json.")
-
-    target = next((c for c in candidatos if str(c.get("id")) == str(candidate_id)), None)
+    _refresh_candidate_listing()
+    target = candidate_listing.get(candidate_id)
     if not target:
         raise HTTPException(status_code=404, detail="Candidatura não encontrada.")
 
-    timestamp = datetime.utcnow().isoformat()
-    target["ultimo_visualizador"] = viewer
-    target["ultimo_visualizado_em"] = timestamp
-    history = target.get("view_history")
-    if not isinstance(history, list):
-        history = []
-    history.append({"viewer": viewer, "timestamp": timestamp})
-    target["view_history"] = history[-50:]
-
-    ok = save_github_json("candidatos.json", candidatos, f"Registrar visualização {candidate_id}")
-    if not ok:
-        raise HTTPException(status_code=500, detail="Erro ao registrar visualização.")
-
-    return {"ok": True, "candidato": target}
+    # A visualização vai para o log local; candidatos.json não é regravado
+    views = candidate_views.record(candidate_id, viewer)
+    return {"ok": True, "candidato": {**target, **views}}
 
 @app.get("/api/admin/dashboard")
-async def admin_dashboard():
+def admin_dashboard():
     """Retorna estatÃ­sticas e listas para o painel do dashboard"""
     try:
-        candidatos = get_existing_candidates(clean_expired=False)
-        vagas = get_vagas_from_github()
-
-        now = datetime.now()
-        status_map: Dict[str, int] = {}
-        vaga_map: Dict[str, int] = {}
-        city_map: Dict[str, int] = {}
-        expired_count = 0
-        recent_candidates = []
-
-        for candidato in candidatos:
-            status = (candidato.get("status") or "Novo").strip()
-            status_map[status] = status_map.get(status, 0) + 1
-
-            vaga = (candidato.get("vaga") or "NÃ£o informada").strip()
-            vaga_map[vaga] = vaga_map.get(vaga, 0) + 1
-
-            cidade = (candidato.get("cidade") or "NÃ£o informada").strip()
-            city_map[cidade] = city_map.get(cidade, 0) + 1
-
-            enviado_em = parse_iso_date(candidato.get("enviado_em") or "")
-            if enviado_em:
-                if (now - enviado_em).days >= 90:
-                    expired_count += 1
-                if (now - enviado_em).days <= 7:
-                    recent_candidates.append((enviado_em, candidato))
-
-        recent_candidates.sort(key=lambda item: item[0], reverse=True)
-        candidatos_recentes = [c for _, c in recent_candidates[:10]]
-
-        vagas_recentes = []
-        for vaga in vagas:
-            inserido_em = parse_iso_date(vaga.get("inserido_em") or "")
-            vagas_recentes.append((inserido_em or datetime.min, vaga))
-        vagas_recentes.sort(key=lambda item: item[0], reverse=True)
-        vagas_recentes = [v for _, v in vagas_recentes[:5]]
-
-        total_vagas = len(vagas)
-        vagas_ativas = len([v for v in vagas if (v.get("status") or "ativa").lower() == "ativa"])
-        vagas_inativas = total_vagas - vagas_ativas
-
+        # os agregados acompanham o índice da listagem; só é preciso ler tudo quando ele vence
+        _refresh_candidate_listing()
+        vagas_info = dashboard_stats.vagas_summary()
+        if vagas_info is None:
+            vagas_info = dashboard_stats.set_vagas(get_vagas_from_github())
+
+        snapshot = dashboard_stats.snapshot(recent_limit=10)
+        candidatos_recentes = snapshot.pop("candidatos_recentes")
+        vagas_recentes = vagas_info["vagas_recentes"]
         stats = {
-            "total_vagas": total_vagas,
-            "vagas_ativas": vagas_ativas,
-            "vagas_inativas": vagas_inativas,
-            "total_candidatos": len(candidatos),
-            "candidatos_ativos": max(0, len(candidatos) - expired_count),
-            "candidatos_expirados": expired_count,
-            "candidatos_7_dias": len(candidatos_recentes),
-            "candidatos_por_status": status_map,
-            "candidatos_por_vaga": vaga_map,
-            "candidatos_por_cidade": city_map
+            "total_vagas": vagas_info["total_vagas"],
+            "vagas_ativas": vagas_info["vagas_ativas"],
+            "vagas_inativas": vagas_info["vagas_inativas"],
+            **snapshot
         }
 
         return {
@@ -1992,7 +2392,7 @@ async def admin_dashboard():
         }
 
 @app.post("/api/admin/consulta-cpf")
-async def admin_consulta_cpf(payload: dict):
+def admin_consulta_cpf(payload: dict):
     cpf_raw = (payload.get("cpf") or "").strip()
     cpf_digits = re.sub(r"[^\d]", "", cpf_raw)
     if not cpf_digits or len(cpf_digits) != 11 or not validate_cpf(cpf_digits):
@@ -2019,7 +2419,7 @@ async def admin_consulta_cpf(payload: dict):
     }
 
 @app.post("/api/enviar")
-async def enviar_curriculo(
+def enviar_curriculo(
     nome: str = Form(...),
     cpf: str = Form(...),
     telefone: str = Form(...),
@@ -2041,11 +2441,11 @@ async def enviar_curriculo(
             detail="❌ Token do GitHub não configurado. Configure a variável de ambiente GITHUB_TOKEN."
         )
     
-    # Verificar acesso ao repositório
-    if not check_repo_access():
+    # Usa a última verificação do repo_health em vez de consultar o GitHub a cada envio
+    if repo_health.is_unavailable():
         raise HTTPException(
-            status_code=500,
-            detail="❌ Não é possível acessar o repositório do GitHub. Verifique as permissões do token."
+            status_code=503,
+            detail="❌ Repositório de candidaturas inacessível no momento. Tente novamente mais tarde."
         )
     
     # Validações básicas
@@ -2075,64 +2475,38 @@ async def enviar_curriculo(
                 detail="⚠️ Já existe uma candidatura registrada para esta vaga com o mesmo CPF. Aguarde 90 dias antes de reenviar."
             )
         
-        # Salva arquivo na pasta curriculos do GitHub
-        arquivo_url = save_curriculum_to_github(arquivo, nome, cpf, vaga)
+        # Lê o upload em blocos, validando tamanho e tipo antes de aceitar o envio
+        spool, tamanho, sha256 = spool_curriculum(arquivo)
         
-        # Prepara dados do candidato
-        candidato = {
-            "nome": nome.strip(),
-            "cpf": cpf,
-            "telefone": telefone,
-            "email": email.lower().strip(),
-            "cep": cep,
-            "cidade": cidade,
-            "bairro": bairro,
-            "rua": rua,
-            "transporte": transporte,
-            "vaga": vaga,
-            "arquivo_url": arquivo_url,
-            "arquivo_nome": arquivo.filename,
-            "tamanho_arquivo": arquivo.size
-        }
-        
-        # Salva dados no GitHub
-        result = save_candidate(candidato)
-        
-        if result["success"]:
-            # Backup local obrigatorio: falha local invalida o envio
-            try:
-                local_filename = None
-                if arquivo_url:
-                    try:
-                        local_filename = os.path.basename(urllib.parse.urlparse(arquivo_url).path)
-                    except Exception:
-                        local_filename = None
-                if not local_filename:
-                    local_filename = arquivo.filename or "curriculo"
-                local_file_path = save_curriculum_locally(
-                    arquivo,
-                    local_filename,
-                    parse_iso_date(candidato.get("enviado_em")) or datetime.now()
-                )
-                save_candidate_locally(candidato, local_file_path)
-            except Exception as e:
-                print(f"Erro ao salvar localmente: {str(e)}")
-                raise HTTPException(
-                    status_code=500,
-                    detail="❌ Erro ao salvar candidatura localmente. Tente novamente em alguns instantes."
-                )
-            return {
+        # Grava o envio na fila local; o GitHub é atualizado em segundo plano
+        with spool:
+            protocolo = submission_queue.enqueue(
+                {
+                    "nome": nome.strip(),
+                    "cpf": cpf,
+                    "telefone": telefone,
+                    "email": email.lower().strip(),
+                    "cep": cep,
+                    "cidade": cidade,
+                    "bairro": bairro,
+                    "rua": rua,
+                    "transporte": transporte,
+                    "vaga": vaga,
+                    "tamanho_arquivo": tamanho,
+                    "arquivo_sha256": sha256,
+                },
+                arquivo.filename,
+                spool,
+            )
+        return JSONResponse(
+            status_code=202,
+            content={
                 "ok": True,
-                "message": "✅ Sua candidatura foi enviada com sucesso! Agradecemos seu interesse e entraremos em contato caso seu perfil seja selecionado.",
-                "id": candidato.get("id"),
-                "arquivo_url": arquivo_url
+                "message": "✅ Sua candidatura foi recebida com sucesso! Agradecemos seu interesse e entraremos em contato caso seu perfil seja selecionado.",
+                "protocolo": protocolo,
+                "status_url": f"/api/enviar/{protocolo}"
             }
-        else:
-            # Se chegou aqui, é um erro no GitHub que não é duplicidade
-            raise HTTPException(
-                status_code=500,
-                detail="❌ Erro ao salvar candidatura. Tente novamente em alguns instantes."
-            )
+        )
                 
     except HTTPException as he:
         # Re-lançar as HTTPExceptions que já foram levantadas
@@ -2147,6 +2521,111 @@ async def enviar_curriculo(
             detail="❌ Erro ao salvar candidatura. Tente novamente em alguns instantes."
         )
 
+@app.get("/api/enviar/{protocolo}")
+def status_envio(protocolo: str):
+    """Situação de um envio recebido por /api/enviar"""
+    envio = submission_queue.get(protocolo)
+    if envio is None:
+        raise HTTPException(status_code=404, detail="Envio não encontrado")
+    return envio
+
+def _process_submission(job: dict) -> dict:
+    """Processa um envio da fila: cópia local, depois currículo e candidatura no GitHub.
+
+    A cópia local (currículo e candidatura) é gravada antes de qualquer chamada ao GitHub,
+    então uma indisponibilidade longa não perde o envio. As etapas concluídas ficam em
+    `job["state"]`, e uma nova tentativa não reenvia o currículo nem grava a candidatura duas vezes.
+    """
+    with open(job["file_path"], "rb") as handle:
+        return _process_submission_file(job, handle)
+
+def _process_submission_file(job: dict, handle: BinaryIO) -> dict:
+    data = job["data"]
+    state = job["state"]
+    candidato = state.get("candidato")
+    if candidato is None:
+        if check_duplicate_candidate(data["cpf"], data["vaga"]):
+            raise submission_queue.PermanentError(
+                "Já existe uma candidatura registrada para esta vaga com o mesmo CPF.",
+                submission_queue.DUPLICADO,
+            )
+        local = state.get("local")
+        if local is None:
+            # id e data definidos aqui para a cópia local e o GitHub terem o mesmo registro
+            cpf_clean = re.sub(r"\D", "", data["cpf"])
+            enviado_em = datetime.now()
+            local_candidate = {
+                **data,
+                "id": hashlib.md5(f"{cpf_clean}_{data['vaga'].lower().strip()}_{enviado_em.timestamp()}".encode()).hexdigest()[:12],
+                "enviado_em": enviado_em.isoformat(),
+                "arquivo_nome": job["filename"],
+            }
+            sha = data.get("arquivo_sha256")
+            ext = (job["filename"] or "").rsplit(".", 1)[-1].lower()
+            local_file_path = save_curriculum_locally(
+                handle,
+                f"{sha}.{ext if ext in ('pdf', 'doc', 'docx') else 'pdf'}" if sha else job["filename"] or "curriculo",
+                enviado_em,
+                content_hash=sha,
+            )
+            save_candidate_locally(local_candidate, local_file_path)
+            local = {"id": local_candidate["id"], "enviado_em": local_candidate["enviado_em"], "arquivo_local": str(local_file_path)}
+            state["local"] = local
+            submission_queue.save_state(job["id"], state)
+        arquivo_url = state.get("arquivo_url")
+        if not arquivo_url:
+            arquivo_url = upload_curriculum(
+                handle, job["filename"], data["nome"], data["cpf"], data["vaga"], sha256=data.get("arquivo_sha256")
+            )
+            state["arquivo_url"] = arquivo_url
+            submission_queue.save_state(job["id"], state)
+        
+        candidato = dict(data)
+        candidato.update({
+            "id": local["id"],
+            "enviado_em": local["enviado_em"],
+            "arquivo_url": arquivo_url,
+            "arquivo_nome": job["filename"]
+        })
+        result = save_candidate(candidato)
+        if not result["success"]:
+            raise RuntimeError(result.get("details") or "Erro ao salvar candidatura no GitHub")
+        state["candidato"] = candidato
+        submission_queue.save_state(job["id"], state)
+    
+    local = state.get("local")
+    if local is not None:
+        local_file_path = Path(local["arquivo_local"])
+    else:
+        # envio enfileirado antes da cópia local prévia: grava o currículo agora
+        local_file_path = save_curriculum_locally(
+            handle,
+            job["filename"] or "curriculo",
+            parse_iso_date(candidato.get("enviado_em")) or datetime.now(),
+            content_hash=candidato.get("arquivo_sha256")
+        )
+    # atualiza a cópia local com o registro final (arquivo_url, status)
+    save_candidate_locally(candidato, local_file_path)
+    arquivo_url = candidato.get("arquivo_url")
+    resume_index.submit(
+        candidato.get("id"), str(local_file_path), candidato.get("arquivo_sha256"), candidato.get("enviado_em")
+    )
+    return {"id": candidato.get("id"), "arquivo_url": arquivo_url}
+
+def _backfill_resume_index() -> None:
+    """Agenda a extração dos currículos locais de candidaturas ativas ainda fora do índice"""
+    try:
+        entries = candidate_journal.entries(_get_local_base_dir())
+    except Exception as exc:
+        print(f"Erro ao ler índice local de candidatos: {exc}")
+        return
+    for entry in entries:
+        if not entry.get("id") or not entry.get("arquivo_local"):
+            continue
+        if is_candidate_expired(entry) or resume_index.is_indexed(entry["id"]):
+            continue
+        resume_index.submit(entry["id"], entry["arquivo_local"], entry.get("arquivo_sha256"), entry.get("enviado_em"))
+
 
 
 # ==================== ATON NOTIFICACOES ====================
@@ -2641,7 +3120,7 @@ def build_random_notification(user_name: str = "Usuario", exclude: Optional[List
 
 
 @app.get("/api/aton/notification")
-async def aton_notification(user_name: Optional[str] = "Usuario", user_id: Optional[str] = None):
+def aton_notification(user_name: Optional[str] = "Usuario", user_id: Optional[str] = None):
     resolved_name = (user_name or "Usuario").strip() or "Usuario"
     user_key = _aton_user_key(user_id, resolved_name)
     today_key = datetime.now().strftime("%Y-%m-%d")
@@ -2651,13 +3130,13 @@ async def aton_notification(user_name: Optional[str] = "Usuario", user_id: Optio
     return {"ok": True, "message": message}
 
 @app.get("/api/aton/history")
-async def aton_history(user_name: Optional[str] = "Usuario", user_id: Optional[str] = None):
+def aton_history(user_name: Optional[str] = "Usuario", user_id: Optional[str] = None):
     user_key = _aton_user_key(user_id, user_name)
     history = _get_user_history(user_key)
     return {"ok": True, "history": history}
 
 @app.post("/api/aton/chat")
-async def aton_chat(payload: AtonChatRequest):
+def aton_chat(payload: AtonChatRequest):
     question = (payload.question or "").strip()
     if not question:
         raise HTTPException(status_code=400, detail="Pergunta vazia.")
@@ -2687,7 +3166,7 @@ async def aton_chat(payload: AtonChatRequest):
 # ==================== CONFIGURACOES / AUTH ====================
 
 @app.post("/api/auth/login")
-async def auth_login(payload: dict):
+def auth_login(payload: dict):
     email = (payload.get("email") or "").strip().lower()
     senha = payload.get("senha") or ""
     if not email or not senha:
@@ -2702,7 +3181,7 @@ async def auth_login(payload: dict):
     return {"ok": True, "token": token, "user": strip_user_sensitive(user)}
 
 @app.get("/api/auth/me")
-async def auth_me(request: Request):
+def auth_me(request: Request):
     token = _get_auth_token(request)
     if not token:
         raise HTTPException(status_code=401, detail="Token ausente.")
@@ -2719,7 +3198,7 @@ async def auth_me(request: Request):
     return {"ok": True, "user": strip_user_sensitive(user)}
 
 @app.get("/api/admin/configuracoes")
-async def get_configuracoes():
+def get_configuracoes():
     config = load_github_json("configuracoes.json", default={})
     if not isinstance(config, dict):
         config = {}
@@ -2741,7 +3220,7 @@ async def get_configuracoes():
     return {"ok": True, "configuracoes": config, "usuarios": users}
 
 @app.put("/api/admin/configuracoes")
-async def update_configuracoes(payload: dict):
+def update_configuracoes(payload: dict):
     github_payload = payload.get("github", {}) if isinstance(payload, dict) else {}
     if not isinstance(github_payload, dict):
         github_payload = {}
@@ -2781,7 +3260,7 @@ async def update_configuracoes(payload: dict):
 
 
 @app.post("/api/admin/configuracoes/github-init")
-async def init_github_repository(payload: dict):
+def init_github_repository(payload: dict):
     github_payload = payload.get("github", {}) if isinstance(payload, dict) else {}
     if not isinstance(github_payload, dict):
         github_payload = {}
@@ -2793,11 +3272,11 @@ async def init_github_repository(payload: dict):
     if not owner or not repo:
         raise HTTPException(status_code=400, detail="Informe dono e nome do repositorio.")
 
-    repo_url = f"https://api.github.com/repos/{owner}/{repo}"
-    response = requests.get(repo_url, headers=headers, timeout=10)
+    repo_url = f"{github_client.API_URL}/repos/{owner}/{repo}"
+    response = github_client.get(repo_url, headers=headers, timeout=10)
     if response.status_code == 404:
         user_login = None
-        user_response = requests.get("https://api.github.com/user", headers=headers, timeout=10)
+        user_response = github_client.get(f"{github_client.API_URL}/user", headers=headers, timeout=10)
         if user_response.status_code == 200:
             user_login = user_response.json().get("login")
         visibility = (github_payload.get("visibility") or "private").lower()
@@ -2808,10 +3287,10 @@ async def init_github_repository(payload: dict):
             "description": github_payload.get("description") or "Repositorio de dados do painel"
         }
         if user_login and owner.lower() == user_login.lower():
-            create_url = "https://api.github.com/user/repos"
+            create_url = f"{github_client.API_URL}/user/repos"
         else:
-            create_url = f"https://api.github.com/orgs/{owner}/repos"
-        create_response = requests.post(create_url, headers=headers, json=repo_payload, timeout=20)
+            create_url = f"{github_client.API_URL}/orgs/{owner}/repos"
+        create_response = github_client.post(create_url, headers=headers, json=repo_payload, timeout=20)
         if create_response.status_code not in [200, 201]:
             raise HTTPException(status_code=500, detail=f"Erro ao criar repositorio: {create_response.text}")
     elif response.status_code not in [200, 403]:
@@ -2828,7 +3307,7 @@ async def init_github_repository(payload: dict):
 
 @app.post("/api/admin/configuracoes/usuarios")
 
-async def create_usuario(payload: dict):
+def create_usuario(payload: dict):
     if not GITHUB_TOKEN:
         raise HTTPException(status_code=500, detail="Token do GitHub não configurado.")
     email = (payload.get("email") or "").strip().lower()
@@ -2855,7 +3334,7 @@ async def create_usuario(payload: dict):
     return {"ok": True, "senha": senha_plana, "user": strip_user_sensitive(user)}
 
 @app.put("/api/admin/configuracoes/usuarios/{email}")
-async def update_usuario(email: str, payload: dict):
+def update_usuario(email: str, payload: dict):
     if not GITHUB_TOKEN:
         raise HTTPException(status_code=500, detail="Token do GitHub não configurado.")
     email_norm = (email or "").strip().lower()
@@ -0,0 +1,95 @@
+"""Mede a busca por nome/email/CPF da listagem de candidaturas com 100 mil registros.
+
+Compara a varredura linear que `admin_list_candidatos` fazia antes (minusculas e
+regex do CPF em cada registro, a cada requisicao) com o indice de trigramas de
+`candidate_listing`, e mostra o tempo de construcao do indice.
+
+Uso: python bench_candidate_search.py [--candidatos 100000] [--repeticoes 20]
+"""
+
+import argparse
+import random
+import re
+import statistics
+import time
+from datetime import datetime, timedelta
+
+import candidate_listing
+
+FIRST_NAMES = ["José", "Maria", "Ana", "João", "Antônio", "Francisca", "Carlos", "Luíza", "Paulo", "Márcia",
+               "Pedro", "Adriana", "Lucas", "Juliana", "Marcos", "Fernanda", "Rafael", "Patrícia", "Tiago", "Cláudia"]
+LAST_NAMES = ["Silva", "Santos", "Oliveira", "Souza", "Rodrigues", "Ferreira", "Alves", "Pereira", "Lima", "Gomes",
+              "Conceição", "Ribeiro", "Araújo", "Carvalho", "Melo", "Barbosa", "Cardoso", "Nascimento", "Rocha", "Dias"]
+VAGAS = ["Operador de Caixa", "Repositor", "Açougueiro", "Padeiro", "Auxiliar de Limpeza", "Fiscal de Loja"]
+QUERIES = ["jose", "Conceição", "araujo", "maria.silva", "@exemplo", "123.4", "987654", "fernanda rocha", "zzzz"]
+
+
+def _candidates(total: int) -> list:
+    rng = random.Random(42)
+    now = datetime.now()
+    items = []
+    for index in range(total):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        cpf = "".join(str(rng.randint(0, 9)) for _ in range(11))
+        items.append({
+            "id": f"{index:012x}",
+            "nome": f"{first} {rng.choice(LAST_NAMES)} {last}",
+            "email": f"{first.lower()}.{last.lower()}{index}@exemplo.com",
+            "cpf": f"{cpf[:3]}.{cpf[3:6]}.{cpf[6:9]}-{cpf[9:]}",
+            "vaga": rng.choice(VAGAS),
+            "status": rng.choice(["Novo", "Em análise", "Aprovado", "Reprovado"]),
+            "enviado_em": (now - timedelta(minutes=index * 1.2)).isoformat(),
+        })
+    return items
+
+
+def _linear(candidates: list, query: str) -> list:
+    search_filter = query.strip().lower()
+    search_digits = re.sub(r"\D", "", search_filter)
+    found = []
+    for candidate in candidates:
+        nome = (candidate.get("nome") or "").lower()
+        email = (candidate.get("email") or "").lower()
+        cpf_digits = re.sub(r"\D", "", candidate.get("cpf") or "")
+        if (search_filter in nome) or (search_filter in email) or (search_digits and search_digits in cpf_digits):
+            found.append(candidate)
+    return found
+
+
+def _measure(fn, repeats: int) -> float:
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--candidatos", type=int, default=100_000)
+    parser.add_argument("--repeticoes", type=int, default=20)
+    args = parser.parse_args()
+
+    candidates = _candidates(args.candidatos)
+    started = time.perf_counter()
+    candidate_listing.rebuild(candidates)
+    built = time.perf_counter()
+    candidate_listing.search("abc")  # os trigramas sao montados na primeira busca
+    print(
+        f"{args.candidatos} candidaturas; listagem indexada em {built - started:.2f}s, "
+        f"trigramas em {time.perf_counter() - built:.2f}s"
+    )
+    print(f"{'consulta':<18}{'linear (ms)':>14}{'trigramas (ms)':>16}{'1a pagina (ms)':>16}{'resultados':>12}")
+    for query in QUERIES:
+        linear_ms = _measure(lambda: _linear(candidates, query), max(1, args.repeticoes // 4))
+        index_ms = _measure(lambda: candidate_listing.search(query), args.repeticoes)
+        page_ms = _measure(
+            lambda: candidate_listing.page(limit=50, scores=candidate_listing.search(query)), args.repeticoes
+        )
+        total = len(candidate_listing.search(query))
+        print(f"{query:<18}{linear_ms:>14.2f}{index_ms:>16.2f}{page_ms:>16.2f}{total:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Mede a vazao das rotas com 50 clientes simultaneos.
+
+Sem argumentos, sobe um app FastAPI de comparacao com duas versoes da mesma rota,
+que simula uma chamada lenta ao GitHub (I/O bloqueante de LATENCY segundos):
+`/async` (async def chamando I/O bloqueante, como as rotas eram antes) e
+`/sync` (def, executada no pool de threads, como as rotas sao agora).
+
+Com --url, dispara os clientes contra um servidor ja em execucao
+(ex.: python bench_concurrency.py --url http://127.0.0.1:8000/api/vagas).
+"""
+
+import argparse
+import statistics
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+CLIENTS = 50
+REQUESTS_PER_CLIENT = 4
+LATENCY = 0.2
+
+
+def _build_app():
+    from fastapi import FastAPI
+
+    app = FastAPI()
+
+    @app.get("/async")
+    async def blocking_async():
+        time.sleep(LATENCY)
+        return {"ok": True}
+
+    @app.get("/sync")
+    def blocking_sync():
+        time.sleep(LATENCY)
+        return {"ok": True}
+
+    return app
+
+
+def _start_server(port: int):
+    import uvicorn
+
+    config = uvicorn.Config(_build_app(), host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def _run(url: str, clients: int, per_client: int) -> dict:
+    latencies = []
+    lock = threading.Lock()
+
+    def client() -> None:
+        for _ in range(per_client):
+            started = time.perf_counter()
+            with urllib.request.urlopen(url, timeout=120) as response:
+                response.read()
+            with lock:
+                latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        for future in [pool.submit(client) for _ in range(clients)]:
+            future.result()
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "elapsed": elapsed,
+        "throughput": len(latencies) / elapsed,
+        "p50": statistics.median(latencies),
+        "p95": latencies[int(len(latencies) * 0.95) - 1],
+    }
+
+
+def _print(label: str, result: dict) -> None:
+    print(
+        f"{label:>28} {result['requests']:>6} req  {result['elapsed']:>7.2f} s  "
+        f"{result['throughput']:>8.1f} req/s  p50 {result['p50'] * 1000:>7.0f} ms  p95 {result['p95'] * 1000:>7.0f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="URL de um servidor em execucao")
+    parser.add_argument("--clients", type=int, default=CLIENTS)
+    parser.add_argument("--requests", type=int, default=REQUESTS_PER_CLIENT, help="requisicoes por cliente")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    print(f"{args.clients} clientes x {args.requests} requisicoes")
+    if args.url:
+        _print(args.url, _run(args.url, args.clients, args.requests))
+        return
+
+    server = _start_server(args.port)
+    try:
+        base = f"http://127.0.0.1:{args.port}"
+        _print("antes (async + bloqueante)", _run(f"{base}/async", args.clients, args.requests))
+        _print("depois (def no threadpool)", _run(f"{base}/sync", args.clients, args.requests))
+    finally:
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
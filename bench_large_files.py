@@ -0,0 +1,100 @@
+"""Mede o tempo de leitura de arquivos JSON grandes pelo github_client.
+
+Sobe um servidor HTTP local que imita a Contents API (conteudo inline ate 1 MB,
+`content` vazio acima disso e o blob via media type raw) e le arquivos de
+tamanhos crescentes ate 50 MB, exibindo tempo e pico de memoria.
+
+Uso: python bench_large_files.py [tamanhos em MB separados por virgula]
+"""
+
+import base64
+import json
+import sys
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import github_client
+
+INLINE_LIMIT = 1024 * 1024
+DEFAULT_SIZES_MB = [0.1, 0.5, 1, 2, 5, 10, 25, 50]
+
+_FILES = {}
+
+
+def _build_payload(size_bytes: int) -> bytes:
+    record = {
+        "id": "00000000-0000-0000-0000-000000000000",
+        "nome": "Candidato de Teste",
+        "cpf": "000.000.000-00",
+        "vaga": "Operador de Caixa",
+        "enviado_em": "2026-01-01T00:00:00",
+    }
+    line = json.dumps(record, ensure_ascii=False)
+    count = max(1, size_bytes // (len(line) + 2))
+    return ("[" + ",\n".join([line] * count) + "]").encode("utf-8")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        return
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        data = _FILES.get(path)
+        if data is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+        sha = f"bench{len(data)}"
+        if self.headers.get("Accept") == github_client.RAW_MEDIA_TYPE:
+            body = data
+            content_type = "application/octet-stream"
+        else:
+            inline = len(data) <= INLINE_LIMIT
+            body = json.dumps({
+                "sha": sha,
+                "size": len(data),
+                "encoding": "base64" if inline else "none",
+                "content": base64.b64encode(data).decode("ascii") if inline else "",
+            }).encode("utf-8")
+            content_type = "application/json"
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def main() -> None:
+    sizes = [float(value) for value in sys.argv[1].split(",")] if len(sys.argv) > 1 else DEFAULT_SIZES_MB
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}/repos/bench/bench/contents"
+
+    print(f"{'tamanho (MB)':>12} {'registros':>10} {'leitura (s)':>12} {'pico mem (MB)':>14} {'modo':>6}")
+    try:
+        for size_mb in sizes:
+            data = _build_payload(int(size_mb * 1024 * 1024))
+            path = f"/repos/bench/bench/contents/bench-{size_mb}.json"
+            _FILES[path] = data
+            url = f"{base}/bench-{size_mb}.json"
+
+            tracemalloc.start()
+            started = time.perf_counter()
+            payload = github_client.read_file(url)
+            records = github_client.load_json(url, payload)
+            elapsed = time.perf_counter() - started
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            mode = "raw" if github_client.is_truncated(payload) else "inline"
+            print(f"{len(data) / 1048576:>12.1f} {len(records):>10} {elapsed:>12.3f} {peak / 1048576:>14.1f} {mode:>6}")
+            _FILES.pop(path, None)
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
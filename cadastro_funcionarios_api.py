@@ -18,6 +18,7 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from dotenv import load_dotenv
 from app_paths import APP_DIR, DATA_DIR
+import github_client
 
 STORAGE_DIR = DATA_DIR / "data"
 UPLOAD_DIR = DATA_DIR / "uploads" / "funcionarios"
@@ -66,13 +67,13 @@ def _persist_record(record: dict) -> None:
     STORAGE_FILE.write_text(json.dumps(existing, ensure_ascii=False, indent=2), encoding="utf-8")
 
 
-async def _save_uploaded_photo(file: UploadFile) -> Optional[str]:
+def _save_uploaded_photo(file: UploadFile) -> Optional[str]:
     if not file or not file.filename:
         return None
     extension = Path(file.filename).suffix
     filename = f"{uuid.uuid4().hex}{extension}"
     destination = UPLOAD_DIR / filename
-    contents = await file.read()
+    contents = file.file.read()
     destination.write_bytes(contents)
     return str(destination)
 
@@ -97,9 +98,9 @@ def _write_local_lideres(lideres: list) -> None:
 
 
 def _fetch_lideres_from_github() -> tuple[str, Optional[str]]:
-    url = f"https://api.github.com/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{GITHUB_LIDERES_PATH}"
+    url = f"{github_client.API_URL}/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{GITHUB_LIDERES_PATH}"
     try:
-        response = requests.get(url, headers=GITHUB_HEADERS, timeout=15, params={"ref": GITHUB_BRANCH})
+        response = github_client.get(url, headers=GITHUB_HEADERS, timeout=15, params={"ref": GITHUB_BRANCH})
     except requests.RequestException as exc:
         raise HTTPException(status_code=500, detail=f"Erro ao acessar o GitHub para líderes: {exc}")
 
@@ -142,7 +143,7 @@ def _persist_lideres(lideres: list, sha: Optional[str], message: str) -> None:
     if not GITHUB_TOKEN:
         raise HTTPException(status_code=500, detail="Token do GitHub não configurado para salvar os líderes.")
     payload = json.dumps(lideres, ensure_ascii=False, indent=2)
-    url = f"https://api.github.com/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{GITHUB_LIDERES_PATH}"
+    url = f"{github_client.API_URL}/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{GITHUB_LIDERES_PATH}"
     body = {
         "message": message,
         "branch": GITHUB_BRANCH,
@@ -150,7 +151,7 @@ def _persist_lideres(lideres: list, sha: Optional[str], message: str) -> None:
     }
     if sha:
         body["sha"] = sha
-    response = requests.put(url, headers=GITHUB_HEADERS, json=body, timeout=30)
+    response = github_client.put(url, headers=GITHUB_HEADERS, json=body, timeout=30)
     if response.status_code not in (200, 201):
         raise HTTPException(status_code=500, detail="Não foi possível salvar os líderes no GitHub")
 
@@ -206,9 +207,9 @@ def _push_to_github(record: dict) -> None:
             detail="Token do GitHub não configurado para salvar os funcionários ativos."
         )
 
-    url = f"https://api.github.com/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{GITHUB_PATH}"
+    url = f"{github_client.API_URL}/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{GITHUB_PATH}"
     try:
-        response = requests.get(
+        response = github_client.get(
             url,
             headers=GITHUB_HEADERS,
             timeout=10,
@@ -247,7 +248,7 @@ def _push_to_github(record: dict) -> None:
         payload["sha"] = sha
 
     try:
-        push_response = requests.put(url, headers=GITHUB_HEADERS, json=payload, timeout=10)
+        push_response = github_client.put(url, headers=GITHUB_HEADERS, json=payload, timeout=10)
     except requests.RequestException as exc:
         raise HTTPException(status_code=500, detail=f"Erro ao salvar no GitHub: {exc}")
 
@@ -259,7 +260,7 @@ def _push_to_github(record: dict) -> None:
 
 
 @app.post("/api/funcionarios")
-async def cadastrar_funcionario(
+def cadastrar_funcionario(
     nome_completo: str = Form(...),
     cpf: str = Form(...),
     data_nascimento: str = Form(...),
@@ -328,7 +329,7 @@ async def cadastrar_funcionario(
 
     if foto:
         try:
-            path = await _save_uploaded_photo(foto)
+            path = _save_uploaded_photo(foto)
             record["foto_path"] = path
         except Exception as exc:
             raise HTTPException(status_code=500, detail=f"Erro ao salvar a foto: {exc}")
@@ -0,0 +1,168 @@
+"""Arquivo morto das candidaturas expiradas.
+
+Antes de a limpeza tirar as candidaturas vencidas do conjunto ativo, elas sao copiadas
+(com as referencias do curriculo: arquivo_url, arquivo_sha256, arquivo_local) para
+arquivos anuais compactados em ARCHIVE_DIR/candidatos_<ano>.jsonl.gz, pelo ano de envio.
+Cada execucao acrescenta um membro gzip novo ao fim do arquivo do ano (gzip aceita
+membros concatenados), entao o que ja foi gravado nunca e reescrito.
+
+Um indice SQLite (ARCHIVE_DIR/indice.db) guarda, por candidatura, o CPF (so digitos),
+o ano e a posicao do membro onde ela esta; a consulta por CPF descompacta apenas esses
+membros. Candidaturas ja arquivadas (mesmo id) sao ignoradas, entao repetir a limpeza
+depois de uma falha no commit nao duplica registros.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import re
+import sqlite3
+import threading
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app_paths import DATA_DIR
+
+ARCHIVE_DIR = Path(os.getenv("CANDIDATE_ARCHIVE_DIR") or DATA_DIR / "arquivo")
+DB_PATH = ARCHIVE_DIR / "indice.db"
+READ_CHUNK = 64 * 1024
+
+_LOCK = threading.Lock()
+_CONN: Optional[sqlite3.Connection] = None
+
+
+def _connection() -> sqlite3.Connection:
+    global _CONN
+    if _CONN is None:
+        ARCHIVE_DIR.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(DB_PATH), check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS arquivadas ("
+            "candidate_id TEXT PRIMARY KEY, cpf TEXT NOT NULL, ano INTEGER NOT NULL, "
+            "posicao INTEGER NOT NULL, enviado_em TEXT, arquivado_em TEXT NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS arquivadas_cpf ON arquivadas (cpf)")
+        _CONN = conn
+    return _CONN
+
+
+def _digits(value: Any) -> str:
+    return re.sub(r"\D", "", str(value or ""))
+
+
+def _year(candidate: dict, fallback: int) -> int:
+    match = re.match(r"(\d{4})-", str(candidate.get("enviado_em") or ""))
+    return int(match.group(1)) if match else fallback
+
+
+def archive_path(year: int) -> Path:
+    return ARCHIVE_DIR / f"candidatos_{year}.jsonl.gz"
+
+
+def archive(candidates: Iterable[dict]) -> int:
+    """Acrescenta as candidaturas ao arquivo do ano de envio; retorna quantas foram arquivadas.
+
+    Levanta a excecao da escrita, para a limpeza nao remover o que nao foi arquivado.
+    """
+    archived_at = datetime.now().isoformat()
+    with _LOCK:
+        conn = _connection()
+        by_year: Dict[int, List[dict]] = {}
+        seen = set()
+        for candidate in candidates:
+            candidate_id = str(candidate.get("id") or "")
+            if not candidate_id or candidate_id in seen:
+                continue
+            seen.add(candidate_id)
+            if conn.execute("SELECT 1 FROM arquivadas WHERE candidate_id = ?", (candidate_id,)).fetchone():
+                continue
+            by_year.setdefault(_year(candidate, datetime.now().year), []).append(candidate)
+
+        rows: List[Tuple[str, str, int, int, Optional[str], str]] = []
+        for year, items in sorted(by_year.items()):
+            payload = "".join(
+                json.dumps({**item, "arquivado_em": archived_at}, ensure_ascii=False) + "\n" for item in items
+            ).encode("utf-8")
+            with open(archive_path(year), "ab") as handle:
+                position = handle.tell()
+                handle.write(gzip.compress(payload, mtime=0))
+                handle.flush()
+                os.fsync(handle.fileno())
+            rows.extend(
+                (str(item["id"]), _digits(item.get("cpf")), year, position, item.get("enviado_em"), archived_at)
+                for item in items
+            )
+        if rows:
+            conn.execute("BEGIN")
+            try:
+                conn.executemany("INSERT OR IGNORE INTO arquivadas VALUES (?, ?, ?, ?, ?, ?)", rows)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return len(rows)
+
+
+def _read_member(year: int, position: int) -> List[dict]:
+    """Candidaturas de um unico membro gzip do arquivo do ano."""
+    decompressor = zlib.decompressobj(wbits=31)
+    data = []
+    with open(archive_path(year), "rb") as handle:
+        handle.seek(position)
+        while not decompressor.eof:
+            chunk = handle.read(READ_CHUNK)
+            if not chunk:
+                break
+            data.append(decompressor.decompress(chunk))
+    return [json.loads(line) for line in b"".join(data).splitlines() if line.strip()]
+
+
+def _load(rows: List[Tuple[str, int, int]]) -> List[dict]:
+    wanted: Dict[Tuple[int, int], set] = {}
+    for candidate_id, year, position in rows:
+        wanted.setdefault((year, position), set()).add(candidate_id)
+    found = []
+    for (year, position), ids in wanted.items():
+        found.extend(item for item in _read_member(year, position) if str(item.get("id")) in ids)
+    return sorted(found, key=lambda item: item.get("enviado_em") or "", reverse=True)
+
+
+def lookup_cpf(cpf: str) -> List[dict]:
+    """Candidaturas arquivadas do CPF, das mais recentes para as mais antigas."""
+    digits = _digits(cpf)
+    if not digits:
+        return []
+    with _LOCK:
+        rows = _connection().execute(
+            "SELECT candidate_id, ano, posicao FROM arquivadas WHERE cpf = ?", (digits,)
+        ).fetchall()
+    return _load(rows)
+
+
+def get(candidate_id: str) -> Optional[dict]:
+    with _LOCK:
+        rows = _connection().execute(
+            "SELECT candidate_id, ano, posicao FROM arquivadas WHERE candidate_id = ?", (str(candidate_id),)
+        ).fetchall()
+    found = _load(rows)
+    return found[0] if found else None
+
+
+def stats() -> Dict[str, Any]:
+    with _LOCK:
+        per_year = _connection().execute("SELECT ano, COUNT(*) FROM arquivadas GROUP BY ano").fetchall()
+    return {
+        "candidaturas": sum(count for _, count in per_year),
+        "anos": {
+            str(year): {
+                "candidaturas": count,
+                "bytes": archive_path(year).stat().st_size if archive_path(year).exists() else 0,
+            }
+            for year, count in per_year
+        },
+    }
@@ -0,0 +1,118 @@
+"""Indice persistente (CPF, vaga) -> data da candidatura mais recente.
+
+Usado por `check_duplicate_candidate` para aplicar a regra dos 90 dias com uma unica
+consulta, sem baixar e percorrer candidatos.json a cada envio. O indice fica em
+DATA_DIR/data/candidatos_index.db, e atualizado a cada candidatura salva e e
+reconstruido a partir do conjunto completo quando ainda nao existe, quando foi
+invalidado (ex.: exclusao ou restauracao de backup) ou quando passa de
+CANDIDATE_INDEX_MAX_AGE segundos (cobre gravacoes feitas por outras instancias).
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Iterable, Optional
+
+from app_paths import DATA_DIR
+
+DB_PATH = DATA_DIR / "data" / "candidatos_index.db"
+MAX_AGE_SECONDS = float(os.getenv("CANDIDATE_INDEX_MAX_AGE", "3600"))
+
+_LOCK = threading.Lock()
+_CONN: Optional[sqlite3.Connection] = None
+
+
+def index_key(cpf: str, vaga: str) -> str:
+    return f"{re.sub(r'[^0-9]', '', cpf or '')}|{(vaga or '').lower().strip()}"
+
+
+def _timestamp(value: str) -> tuple:
+    # datas ilegiveis ficam acima de todas as outras: contam como duplicata por seguranca
+    try:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return (1, datetime.max)
+    return (0, parsed.replace(tzinfo=None))
+
+
+def _connection() -> sqlite3.Connection:
+    global _CONN
+    if _CONN is None:
+        DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(DB_PATH), check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS ultima_candidatura (chave TEXT PRIMARY KEY, enviado_em TEXT NOT NULL)")
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (nome TEXT PRIMARY KEY, valor REAL)")
+        _CONN = conn
+    return _CONN
+
+
+def _built_at(conn: sqlite3.Connection) -> Optional[float]:
+    row = conn.execute("SELECT valor FROM meta WHERE nome = 'built_at'").fetchone()
+    return row[0] if row else None
+
+
+def is_fresh() -> bool:
+    """Indica se o indice existe e ainda esta dentro do prazo de validade."""
+    with _LOCK:
+        built_at = _built_at(_connection())
+    return built_at is not None and time.time() - built_at < MAX_AGE_SECONDS
+
+
+def lookup(cpf: str, vaga: str) -> Optional[str]:
+    """`enviado_em` da candidatura mais recente do CPF para a vaga, se houver."""
+    with _LOCK:
+        row = _connection().execute(
+            "SELECT enviado_em FROM ultima_candidatura WHERE chave = ?", (index_key(cpf, vaga),)
+        ).fetchone()
+    return row[0] if row else None
+
+
+def _upsert_locked(conn: sqlite3.Connection, key: str, enviado_em: str) -> None:
+    row = conn.execute("SELECT enviado_em FROM ultima_candidatura WHERE chave = ?", (key,)).fetchone()
+    if row is None or _timestamp(enviado_em) >= _timestamp(row[0]):
+        conn.execute(
+            "INSERT OR REPLACE INTO ultima_candidatura (chave, enviado_em) VALUES (?, ?)", (key, enviado_em)
+        )
+
+
+def record(candidate: dict) -> None:
+    """Registra uma candidatura recem-salva."""
+    enviado_em = candidate.get("enviado_em")
+    if not enviado_em:
+        return
+    with _LOCK:
+        _upsert_locked(_connection(), index_key(candidate.get("cpf", ""), candidate.get("vaga", "")), enviado_em)
+
+
+def rebuild(candidates: Iterable[dict]) -> int:
+    """Reconstroi o indice a partir do conjunto completo; retorna o numero de chaves."""
+    with _LOCK:
+        conn = _connection()
+        conn.execute("BEGIN")
+        try:
+            conn.execute("DELETE FROM ultima_candidatura")
+            for candidate in candidates:
+                if isinstance(candidate, dict) and candidate.get("enviado_em"):
+                    _upsert_locked(
+                        conn,
+                        index_key(candidate.get("cpf", ""), candidate.get("vaga", "")),
+                        candidate["enviado_em"],
+                    )
+            conn.execute("INSERT OR REPLACE INTO meta (nome, valor) VALUES ('built_at', ?)", (time.time(),))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return conn.execute("SELECT COUNT(*) FROM ultima_candidatura").fetchone()[0]
+
+
+def invalidate() -> None:
+    """Forca a reconstrucao na proxima consulta."""
+    with _LOCK:
+        _connection().execute("DELETE FROM meta WHERE nome = 'built_at'")
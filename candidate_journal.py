@@ -0,0 +1,191 @@
+"""Indice local das candidaturas em diario append-only.
+
+Salvar uma candidatura no backup local nao le nem regrava mais o candidatos.json
+inteiro: a candidatura e acrescentada como uma linha JSON em candidatos.jsonl, na mesma
+pasta. Um mapa em memoria (id -> posicao da ultima linha daquele id no diario) permite
+ler a versao mais recente sem varrer o arquivo.
+
+A compactacao junta o diario ao candidatos.json (a versao mais nova de cada id substitui
+a anterior, na mesma posicao; ids novos vao para o fim) e recomeca o diario vazio. Roda
+quando o diario passa de COMPACT_EVERY linhas, na inicializacao (antes da sincronizacao,
+que le o candidatos.json) e no desligamento.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+SNAPSHOT_NAME = "candidatos.json"
+JOURNAL_NAME = "candidatos.jsonl"
+COMPACT_EVERY = int(os.getenv("CANDIDATE_JOURNAL_COMPACT_EVERY", "2000"))
+
+_LOCK = threading.Lock()
+_BASE: Optional[Path] = None
+_OFFSETS: Dict[str, int] = {}
+_LINES = 0
+
+
+def _paths(base_dir: Path) -> Tuple[Path, Path]:
+    return base_dir / SNAPSHOT_NAME, base_dir / JOURNAL_NAME
+
+
+def _read_journal(journal_path: Path) -> List[dict]:
+    if not journal_path.exists():
+        return []
+    updates = []
+    with open(journal_path, "rb") as handle:
+        for line in handle:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # linha incompleta de uma escrita interrompida
+            if isinstance(entry, dict):
+                updates.append(entry)
+    return updates
+
+
+def _load_locked(base_dir: Path) -> None:
+    global _BASE, _LINES
+    if _BASE == base_dir:
+        return
+    _, journal_path = _paths(base_dir)
+    _OFFSETS.clear()
+    _LINES = 0
+    if journal_path.exists():
+        offset = 0
+        with open(journal_path, "rb") as handle:
+            for line in handle:
+                if not line.endswith(b"\n"):
+                    break  # escrita interrompida no meio da linha
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    entry = None
+                if isinstance(entry, dict) and entry.get("id"):
+                    _OFFSETS[str(entry["id"])] = offset
+                _LINES += 1
+                offset += len(line)
+        if offset < journal_path.stat().st_size:
+            # descarta o final truncado para o proximo acrescimo comecar numa linha nova
+            with open(journal_path, "r+b") as handle:
+                handle.truncate(offset)
+    _BASE = base_dir
+
+
+def _read_snapshot(snapshot_path: Path, strict: bool = False) -> List[dict]:
+    """Lista do candidatos.json; ilegivel, vira [] (com aviso) ou, com `strict`, levanta a excecao."""
+    if not snapshot_path.exists():
+        return []
+    try:
+        items = json.loads(snapshot_path.read_text(encoding="utf-8"))
+        if not isinstance(items, list):
+            raise ValueError("o conteudo nao e uma lista")
+    except Exception as exc:
+        if strict:
+            raise RuntimeError(f"Erro ao ler {snapshot_path}: {exc}") from exc
+        print(f"Erro ao ler {snapshot_path}: {exc}")
+        return []
+    return [item for item in items if isinstance(item, dict)]
+
+
+def _merge(snapshot: List[dict], updates: List[dict]) -> List[dict]:
+    """Aplica as linhas do diario (em ordem) sobre a lista do candidatos.json."""
+    merged = list(snapshot)
+    positions = {str(item["id"]): index for index, item in enumerate(merged) if item.get("id")}
+    for entry in updates:
+        entry_id = str(entry["id"]) if entry.get("id") else None
+        if entry_id in positions:
+            merged[positions[entry_id]] = entry
+        else:
+            if entry_id:
+                positions[entry_id] = len(merged)
+            merged.append(entry)
+    return merged
+
+
+def append(base_dir: Path, entry: dict) -> None:
+    """Acrescenta (ou atualiza, se o id ja existir) uma candidatura no indice local."""
+    global _LINES
+    base_dir = Path(base_dir)
+    line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+    with _LOCK:
+        _load_locked(base_dir)
+        _, journal_path = _paths(base_dir)
+        base_dir.mkdir(parents=True, exist_ok=True)
+        with open(journal_path, "ab") as handle:
+            offset = handle.tell()
+            handle.write(line)
+        _LINES += 1
+        if entry.get("id"):
+            _OFFSETS[str(entry["id"])] = offset
+        should_compact = _LINES >= COMPACT_EVERY
+    if should_compact:
+        try:
+            compact(base_dir)
+        except Exception as exc:
+            # a linha ja esta no diario; a compactacao fica para a proxima vez
+            print(f"Erro ao compactar {JOURNAL_NAME}: {exc}")
+
+
+def get(base_dir: Path, candidate_id: str) -> Optional[dict]:
+    """Versao mais recente da candidatura: direto do diario pela posicao, senao do candidatos.json."""
+    base_dir = Path(base_dir)
+    snapshot_path, journal_path = _paths(base_dir)
+    with _LOCK:
+        _load_locked(base_dir)
+        offset = _OFFSETS.get(str(candidate_id))
+        if offset is not None:
+            with open(journal_path, "rb") as handle:
+                handle.seek(offset)
+                return json.loads(handle.readline())
+        snapshot = _read_snapshot(snapshot_path)
+    return next((item for item in snapshot if str(item.get("id")) == str(candidate_id)), None)
+
+
+def entries(base_dir: Path) -> List[dict]:
+    """Todas as candidaturas do indice local (candidatos.json com o diario aplicado)."""
+    base_dir = Path(base_dir)
+    snapshot_path, journal_path = _paths(base_dir)
+    with _LOCK:
+        _load_locked(base_dir)
+        updates = _read_journal(journal_path)
+        snapshot = _read_snapshot(snapshot_path)
+    return _merge(snapshot, updates)
+
+
+def compact(base_dir: Path) -> int:
+    """Grava o diario no candidatos.json e recomeca o diario; retorna as linhas incorporadas.
+
+    Se o candidatos.json existir mas nao puder ser lido, levanta RuntimeError sem tocar em
+    nenhum dos dois arquivos (substitui-lo so pelo diario perderia as candidaturas dele).
+    """
+    global _LINES
+    base_dir = Path(base_dir)
+    snapshot_path, journal_path = _paths(base_dir)
+    with _LOCK:
+        _load_locked(base_dir)
+        if not _LINES:
+            return 0
+        updates = _read_journal(journal_path)
+        merged = _merge(_read_snapshot(snapshot_path, strict=True), updates)
+        tmp_path = snapshot_path.with_suffix(".json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(merged, handle, indent=2, ensure_ascii=False)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp_path, snapshot_path)
+        # o candidatos.json ja contem tudo o que estava no diario
+        open(journal_path, "wb").close()
+        compacted = _LINES
+        _OFFSETS.clear()
+        _LINES = 0
+        return compacted
+
+
+def stats() -> Dict[str, Any]:
+    with _LOCK:
+        return {"linhas_no_diario": _LINES, "ids_no_diario": len(_OFFSETS)}
@@ -0,0 +1,419 @@
+"""Indice em memoria da listagem de candidaturas do painel admin.
+
+Mantem as candidaturas ordenadas por data de envio, com indices secundarios por
+status e por vaga, para que `admin_list_candidatos` devolva paginas (`limit`/`cursor`)
+sem baixar, converter datas e ordenar o conjunto inteiro a cada requisicao. O indice
+e atualizado nas gravacoes feitas por esta instancia e reconstruido quando foi
+invalidado ou passa de CANDIDATE_LISTING_MAX_AGE segundos (cobre gravacoes de outras
+instancias).
+
+A busca por nome, email e CPF usa um indice de trigramas sobre os campos sem
+acentos e em minusculas: a consulta intersecta as listas dos seus trigramas e so
+confere os candidatos resultantes, com ranking (igualdade > inicio > palavra > trecho).
+
+Os agregados do dashboard (`dashboard_stats`) acompanham as mesmas alteracoes.
+
+O cursor e opaco para o cliente: codifica a posicao do ultimo item devolvido.
+"""
+
+from __future__ import annotations
+
+import base64
+import bisect
+import itertools
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import dashboard_stats
+
+MAX_AGE_SECONDS = float(os.getenv("CANDIDATE_LISTING_MAX_AGE", "300"))
+
+Entry = Tuple[datetime, str]
+
+_LOCK = threading.Lock()
+_BUILT_AT: Optional[float] = None
+_RECORDS: Dict[str, dict] = {}
+_ORDER: List[Entry] = []
+_BY_STATUS: Dict[str, List[Entry]] = {}
+_BY_VAGA: Dict[str, List[Entry]] = {}
+_ENTRIES: Dict[str, Entry] = {}
+# busca: campos normalizados (nome, email, digitos do CPF) e trigrama -> slots, montado
+# na primeira busca apos cada reconstrucao. Um slot removido fica vazio em _SLOT_IDS.
+_FIELDS: Dict[str, Tuple[str, str, str]] = {}
+_SLOTS: Dict[str, int] = {}
+_SLOT_IDS: List[Optional[str]] = []
+_TRIGRAMS: Dict[str, List[int]] = {}
+_TRIGRAMS_READY = False
+# candidaturas sem data valida ficam como datetime.min, no inicio das listas
+_UNDATED_END = datetime.min + timedelta(microseconds=1)
+
+
+def _parse_date(value) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).replace(tzinfo=None)
+    except ValueError:
+        return None
+
+
+def _entry(candidate: dict) -> Entry:
+    return (_parse_date(candidate.get("enviado_em")) or datetime.min, str(candidate.get("id")))
+
+
+def _status_key(value) -> str:
+    return str(value or "").strip().lower()
+
+
+def _vaga_key(value) -> str:
+    return str(value or "").strip().lower()
+
+
+def fold(text: str) -> str:
+    """Minusculas, sem acentos e com espacos simples (\"  José\" -> \"jose\")."""
+    decomposed = unicodedata.normalize("NFKD", str(text or ""))
+    folded = "".join(char for char in decomposed if not unicodedata.combining(char)).lower()
+    return " ".join(folded.split())
+
+
+def _search_fields(candidate: dict) -> Tuple[str, str, str]:
+    return (
+        fold(candidate.get("nome")),
+        fold(candidate.get("email")),
+        re.sub(r"\D", "", str(candidate.get("cpf") or "")),
+    )
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[index:index + 3] for index in range(len(text) - 2)}
+
+
+def _index_fields_locked(candidate_id: str, fields: Tuple[str, str, str]) -> None:
+    slot = len(_SLOT_IDS)
+    _SLOT_IDS.append(candidate_id)
+    _SLOTS[candidate_id] = slot
+    grams: Set[str] = set()
+    for field in fields:
+        grams.update(field[index:index + 3] for index in range(len(field) - 2))
+    for gram in grams:
+        posting = _TRIGRAMS.get(gram)
+        if posting is None:
+            _TRIGRAMS[gram] = [slot]
+        else:
+            posting.append(slot)
+
+
+def _ensure_trigrams_locked() -> None:
+    global _TRIGRAMS_READY
+    if _TRIGRAMS_READY:
+        return
+    _SLOTS.clear()
+    _SLOT_IDS.clear()
+    _TRIGRAMS.clear()
+    for candidate_id, fields in _FIELDS.items():
+        _index_fields_locked(candidate_id, fields)
+    _TRIGRAMS_READY = True
+
+
+def _insert_locked(candidate: dict) -> None:
+    entry = _entry(candidate)
+    _RECORDS[entry[1]] = candidate
+    _ENTRIES[entry[1]] = entry
+    _FIELDS[entry[1]] = _search_fields(candidate)
+    if _TRIGRAMS_READY:
+        _index_fields_locked(entry[1], _FIELDS[entry[1]])
+    dashboard_stats.add(entry[1], candidate)
+    bisect.insort(_ORDER, entry)
+    bisect.insort(_BY_STATUS.setdefault(_status_key(candidate.get("status")), []), entry)
+    bisect.insort(_BY_VAGA.setdefault(_vaga_key(candidate.get("vaga")), []), entry)
+
+
+def _discard(entries: List[Entry], entry: Entry) -> None:
+    position = bisect.bisect_left(entries, entry)
+    if position < len(entries) and entries[position] == entry:
+        del entries[position]
+
+
+def _remove_locked(candidate_id: str) -> None:
+    candidate = _RECORDS.pop(candidate_id, None)
+    if candidate is None:
+        return
+    _FIELDS.pop(candidate_id, None)
+    slot = _SLOTS.pop(candidate_id, None)
+    if slot is not None:
+        _SLOT_IDS[slot] = None
+    entry = _ENTRIES.pop(candidate_id)
+    dashboard_stats.remove(candidate_id)
+    _discard(_ORDER, entry)
+    _discard(_BY_STATUS.get(_status_key(candidate.get("status")), []), entry)
+    _discard(_BY_VAGA.get(_vaga_key(candidate.get("vaga")), []), entry)
+
+
+def is_fresh() -> bool:
+    with _LOCK:
+        return _BUILT_AT is not None and time.time() - _BUILT_AT < MAX_AGE_SECONDS
+
+
+def rebuild(candidates: Iterable[dict]) -> int:
+    """Reconstroi o indice a partir do conjunto completo; retorna o numero de candidaturas."""
+    global _BUILT_AT, _TRIGRAMS_READY
+    records = {str(c.get("id")): c for c in candidates if isinstance(c, dict) and c.get("id") is not None}
+    entries = {candidate_id: _entry(candidate) for candidate_id, candidate in records.items()}
+    order = sorted(entries.values())
+    by_status: Dict[str, List[Entry]] = {}
+    by_vaga: Dict[str, List[Entry]] = {}
+    fields: Dict[str, Tuple[str, str, str]] = {}
+    for entry in order:
+        candidate = records[entry[1]]
+        by_status.setdefault(_status_key(candidate.get("status")), []).append(entry)
+        by_vaga.setdefault(_vaga_key(candidate.get("vaga")), []).append(entry)
+        fields[entry[1]] = _search_fields(candidate)
+    with _LOCK:
+        _RECORDS.clear()
+        _RECORDS.update(records)
+        _ENTRIES.clear()
+        _ENTRIES.update(entries)
+        _ORDER[:] = order
+        _BY_STATUS.clear()
+        _BY_STATUS.update(by_status)
+        _BY_VAGA.clear()
+        _BY_VAGA.update(by_vaga)
+        _FIELDS.clear()
+        _FIELDS.update(fields)
+        _SLOTS.clear()
+        _SLOT_IDS.clear()
+        _TRIGRAMS.clear()
+        _TRIGRAMS_READY = False
+        dashboard_stats.reset(records)
+        _BUILT_AT = time.time()
+        return len(_ORDER)
+
+
+def upsert(candidate: dict) -> None:
+    """Registra uma candidatura nova ou alterada por esta instancia."""
+    if not isinstance(candidate, dict) or candidate.get("id") is None:
+        return
+    with _LOCK:
+        if _BUILT_AT is None:
+            return
+        _remove_locked(str(candidate["id"]))
+        _insert_locked(candidate)
+
+
+def remove(candidate_id: str) -> None:
+    with _LOCK:
+        _remove_locked(str(candidate_id))
+
+
+def get(candidate_id: str) -> Optional[dict]:
+    with _LOCK:
+        return _RECORDS.get(str(candidate_id))
+
+
+def count_expired(cutoff: datetime) -> int:
+    """Candidaturas com data de envio ate `cutoff` (sem contar as sem data)."""
+    with _LOCK:
+        return bisect.bisect_right(_ORDER, (cutoff, "\U0010ffff")) - bisect.bisect_left(_ORDER, (_UNDATED_END, ""))
+
+
+def invalidate() -> None:
+    """Forca a reconstrucao na proxima listagem."""
+    global _BUILT_AT
+    with _LOCK:
+        _BUILT_AT = None
+
+
+def _lookup_locked(text: str) -> Set[str]:
+    postings = [_TRIGRAMS.get(gram, []) for gram in _trigrams(text)]
+    postings.sort(key=len)
+    slots = set(postings[0])
+    for posting in postings[1:]:
+        slots.intersection_update(posting)
+        if not slots:
+            break
+    return {_SLOT_IDS[slot] for slot in slots if _SLOT_IDS[slot] is not None}
+
+
+def _score(fields: Tuple[str, str, str], text: str, digits: str) -> int:
+    nome, email, cpf = fields
+    score = 0
+    if text:
+        if nome == text:
+            score = 100
+        elif nome.startswith(text):
+            score = 80
+        elif f" {text}" in f" {nome}":
+            score = 60
+        elif text in nome:
+            score = 40
+        if email == text:
+            score = max(score, 90)
+        elif email.startswith(text):
+            score = max(score, 50)
+        elif text in email:
+            score = max(score, 30)
+    if digits:
+        if cpf == digits:
+            score = max(score, 100)
+        elif cpf.startswith(digits):
+            score = max(score, 70)
+        elif digits in cpf:
+            score = max(score, 20)
+    return score
+
+
+def search(query: str) -> Dict[str, int]:
+    """Candidaturas cujo nome, email ou CPF contem `query` (sem diferenciar acentos) -> relevancia.
+
+    Os digitos da consulta so sao comparados com o CPF quando ela nao tem letras.
+    """
+    text = fold(query)
+    digits = re.sub(r"\D", "", text) if not re.search(r"[a-z]", text) else ""
+    if not text:
+        return {}
+    with _LOCK:
+        if len(text) >= 3:
+            _ensure_trigrams_locked()
+            ids = _lookup_locked(text)
+            if len(digits) >= 3:
+                ids |= _lookup_locked(digits)
+        else:
+            # consultas curtas nao tem trigramas: confere todos os registros
+            ids = set(_FIELDS)
+        scores = {}
+        for candidate_id in ids:
+            score = _score(_FIELDS[candidate_id], text, digits)
+            if score:
+                scores[candidate_id] = score
+    return scores
+
+
+def encode_cursor(entry: tuple) -> str:
+    parts = [item.isoformat() if isinstance(item, datetime) else item for item in entry]
+    raw = json.dumps(parts, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        parts = json.loads(raw)
+        # (data, id) na ordem por envio; (relevancia, data, id) na ordem da busca
+        if not isinstance(parts, list) or len(parts) not in (2, 3):
+            raise ValueError(raw)
+        parts[-2] = datetime.fromisoformat(parts[-2])
+        return tuple(parts)
+    except (ValueError, UnicodeDecodeError, TypeError) as exc:
+        raise ValueError("Cursor invalido") from exc
+
+
+def page(
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    vaga: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    include_undated: bool = False,
+    predicate: Optional[Callable[[dict], bool]] = None,
+    scores: Optional[Dict[str, int]] = None,
+) -> Tuple[List[dict], Optional[str]]:
+    """Candidaturas da mais recente para a mais antiga, a partir de `cursor`.
+
+    `status` e `vaga` escolhem o indice secundario percorrido; `since`/`until` delimitam
+    a janela de envio (`until` exclusivo) por busca binaria; `include_undated` inclui as
+    candidaturas sem data valida no fim da lista. Com `scores` (resultado de `search`),
+    percorre so esses registros, da maior relevancia para a menor. Retorna a pagina e o
+    cursor da proxima (None quando acabou).
+    """
+    if scores is not None:
+        return _scored_page(scores, limit, cursor, status, vaga, since, until, include_undated, predicate)
+    with _LOCK:
+        sources = [_ORDER]
+        if status:
+            sources.append(_BY_STATUS.get(_status_key(status), []))
+        if vaga:
+            sources.append(_BY_VAGA.get(_vaga_key(vaga), []))
+        entries = min(sources, key=len) if len(sources) > 1 else _ORDER
+
+        start = len(entries)
+        if until:
+            start = bisect.bisect_left(entries, (until, ""))
+        if cursor:
+            start = min(start, bisect.bisect_left(entries, decode_cursor(cursor)))
+        positions: Iterable[int] = range(start - 1, -1, -1)
+        if since:
+            floor = bisect.bisect_left(entries, (since, ""))
+            positions = range(start - 1, floor - 1, -1)
+            if include_undated:
+                undated_end = bisect.bisect_left(entries, (_UNDATED_END, ""))
+                positions = itertools.chain(positions, range(min(start, undated_end) - 1, -1, -1))
+
+        items: List[dict] = []
+        last: Optional[Entry] = None
+        for position in positions:
+            entry = entries[position]
+            if _ENTRIES.get(entry[1]) != entry:
+                continue  # sobra de um registro alterado fora do indice
+            candidate = _RECORDS[entry[1]]
+            if status and _status_key(candidate.get("status")) != _status_key(status):
+                continue
+            if vaga and _vaga_key(candidate.get("vaga")) != _vaga_key(vaga):
+                continue
+            if predicate and not predicate(candidate):
+                continue
+            if limit is not None and len(items) >= limit:
+                return items, encode_cursor(last)
+            items.append(candidate)
+            last = entry
+    return items, None
+
+
+def _scored_page(
+    scores: Dict[str, int],
+    limit: Optional[int],
+    cursor: Optional[str],
+    status: Optional[str],
+    vaga: Optional[str],
+    since: Optional[datetime],
+    until: Optional[datetime],
+    include_undated: bool,
+    predicate: Optional[Callable[[dict], bool]],
+) -> Tuple[List[dict], Optional[str]]:
+    with _LOCK:
+        entries = sorted(
+            (score, _ENTRIES[candidate_id][0], candidate_id)
+            for candidate_id, score in scores.items()
+            if candidate_id in _ENTRIES
+        )
+        start = len(entries)
+        if cursor:
+            start = min(start, bisect.bisect_left(entries, decode_cursor(cursor)))
+        items: List[dict] = []
+        last = None
+        for position in range(start - 1, -1, -1):
+            entry = entries[position]
+            when = entry[1]
+            if when == datetime.min:
+                if since and not include_undated:
+                    continue
+            elif (since and when < since) or (until and when >= until):
+                continue
+            candidate = _RECORDS[entry[2]]
+            if status and _status_key(candidate.get("status")) != _status_key(status):
+                continue
+            if vaga and _vaga_key(candidate.get("vaga")) != _vaga_key(vaga):
+                continue
+            if predicate and not predicate(candidate):
+                continue
+            if limit is not None and len(items) >= limit:
+                return items, encode_cursor(last)
+            items.append(candidate)
+            last = entry
+    return items, None
@@ -0,0 +1,300 @@
+"""Armazenamento das candidaturas em arquivos mensais no GitHub.
+
+Com CANDIDATOS_SHARDED=1, as candidaturas deixam de ir para um unico candidatos.json
+e passam a ser gravadas em `candidatos/AAAA-MM.json` (pelo mes de `enviado_em`), com um
+manifesto pequeno em `candidatos/manifest.json` listando os meses existentes:
+
+- uma nova candidatura altera apenas o arquivo do mes corrente (e o manifesto, no
+  primeiro envio do mes);
+- a expiracao remove arquivos inteiros, cujo ultimo dia ja passou de RETENTION_DAYS;
+- as listagens leem apenas os meses da janela pedida.
+
+Na primeira utilizacao, se ainda nao houver manifesto, o candidatos.json existente e
+dividido em arquivos mensais num unico commit (o arquivo antigo e mantido como esta).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import requests
+from dotenv import load_dotenv
+
+from app_paths import APP_DIR
+import github_client
+
+load_dotenv(APP_DIR / ".env")
+load_dotenv()
+
+GITHUB_OWNER = os.getenv("GITHUB_OWNER", "PopularAtacarejo")
+GITHUB_REPO = os.getenv("GITHUB_REPO", "Candidatos")
+GITHUB_BRANCH = os.getenv("GITHUB_BRANCH", "main")
+GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
+
+ENABLED = os.getenv("CANDIDATOS_SHARDED", "").strip().lower() in ("1", "true", "yes", "sim")
+SHARD_DIR = os.getenv("CANDIDATOS_SHARD_DIR", "candidatos").strip("/") or "candidatos"
+MANIFEST_PATH = f"{SHARD_DIR}/manifest.json"
+LEGACY_PATH = "candidatos.json"
+RETENTION_DAYS = 90
+
+
+def _headers() -> dict:
+    headers = {"Accept": "application/vnd.github.v3+json"}
+    if GITHUB_TOKEN:
+        headers["Authorization"] = f"token {GITHUB_TOKEN}"
+    return headers
+
+
+def _repo_url() -> str:
+    return f"{github_client.API_URL}/repos/{GITHUB_OWNER}/{GITHUB_REPO}"
+
+
+def _contents_url(path: str) -> str:
+    return f"{_repo_url()}/contents/{path}"
+
+
+def _parse_date(value: Any) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).replace(tzinfo=None)
+    except ValueError:
+        return None
+
+
+def shard_name(when: datetime) -> str:
+    return when.strftime("%Y-%m")
+
+
+def shard_path(name: str) -> str:
+    return f"{SHARD_DIR}/{name}.json"
+
+
+def shard_for(candidate: dict) -> str:
+    """Mes (AAAA-MM) em que a candidatura e guardada; sem data valida, o mes corrente."""
+    return shard_name(_parse_date(candidate.get("enviado_em")) or datetime.now())
+
+
+def _month_end(name: str) -> datetime:
+    year, month = (int(part) for part in name.split("-"))
+    return datetime(year + month // 12, month % 12 + 1, 1)
+
+
+def _read_json(path: str) -> Tuple[Any, Optional[str]]:
+    """JSON e sha de `path`; (None, None) somente se o arquivo nao existe.
+
+    Qualquer outra falha (5xx, 403, download do blob) levanta RuntimeError, para nao ser
+    confundida com um arquivo ausente.
+    """
+    url = _contents_url(path)
+    params = {"ref": GITHUB_BRANCH}
+    response = github_client.get(url, headers=_headers(), params=params, timeout=10)
+    payload = github_client.payload_from_response(url, response)
+    if payload is None:
+        if response.status_code == 404:
+            return None, None
+        raise RuntimeError(f"Erro ao ler {path} no GitHub: {response.status_code}")
+    data = github_client.load_json(url, payload, headers=_headers(), params=params)
+    if data is None and github_client.is_truncated(payload):
+        raise RuntimeError(f"Erro ao baixar {path} do GitHub")
+    return data, payload.get("sha")
+
+
+def _serialize(payload: Any) -> str:
+    return json.dumps(payload, indent=2, ensure_ascii=False)
+
+
+def _blob_sha(content: str) -> str:
+    data = content.encode("utf-8")
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def _new_manifest(names: Iterable[str]) -> dict:
+    return {
+        "versao": 1,
+        "atualizado_em": datetime.utcnow().isoformat() + "Z",
+        "shards": {name: {"path": shard_path(name)} for name in sorted(names)},
+    }
+
+
+def load_manifest() -> Tuple[dict, Optional[str]]:
+    """Manifesto atual (e seu sha); cria os arquivos mensais a partir do candidatos.json se preciso."""
+    manifest, sha = _read_json(MANIFEST_PATH)
+    if isinstance(manifest, dict) and isinstance(manifest.get("shards"), dict):
+        return manifest, sha
+    if sha is not None:
+        raise RuntimeError(f"{MANIFEST_PATH} existe mas nao e um manifesto valido")
+    # so chega aqui com o manifesto confirmadamente ausente (404)
+    legacy, _ = _read_json(LEGACY_PATH)
+    migrated = write_all(legacy if isinstance(legacy, list) else [], f"Divide {LEGACY_PATH} em arquivos mensais")
+    manifest, sha = _read_json(MANIFEST_PATH)
+    if isinstance(manifest, dict) and isinstance(manifest.get("shards"), dict):
+        return manifest, sha  # criado agora (ou por outra instancia, se o commit daqui foi recusado)
+    if not migrated:
+        raise RuntimeError("Nao foi possivel criar o manifesto de candidaturas no GitHub")
+    return _new_manifest([]), sha
+
+
+def shards_in_window(manifest: dict, since: Optional[datetime] = None, until: Optional[datetime] = None) -> List[str]:
+    names = sorted(manifest.get("shards") or {})
+    if since:
+        names = [name for name in names if _month_end(name) > since]
+    if until:
+        names = [name for name in names if name <= shard_name(until)]
+    return names
+
+
+def load(since: Optional[datetime] = None, until: Optional[datetime] = None, strict: bool = False) -> List[dict]:
+    """Candidaturas dos meses que cruzam a janela [since, until], em ordem cronologica de mes.
+
+    `strict` e repassado a `read_shards`.
+    """
+    manifest, _ = load_manifest()
+    return read_shards(shards_in_window(manifest, since, until), strict=strict)
+
+
+def read_shards(names: Iterable[str], strict: bool = False) -> List[dict]:
+    """Candidaturas dos meses `names`; um mes que nao pode ser lido e pulado (com aviso).
+
+    Com `strict`, a falha (ou um arquivo que nao e uma lista) levanta RuntimeError: a
+    limpeza nao pode apagar um mes que nao leu.
+    """
+    candidates: List[dict] = []
+    for name in names:
+        try:
+            records, _ = _read_json(shard_path(name))
+            if records is not None and not isinstance(records, list):
+                raise RuntimeError(f"Conteudo invalido em {shard_path(name)}")
+        except RuntimeError as exc:
+            if strict:
+                raise
+            print(f"Aviso: {exc}")
+            continue
+        if isinstance(records, list):
+            candidates.extend(records)
+    return candidates
+
+
+def append(candidate: dict, message: str) -> requests.Response:
+    """Acrescenta uma candidatura ao arquivo do seu mes."""
+    name = shard_for(candidate)
+    path = shard_path(name)
+    manifest, manifest_sha = load_manifest()
+    if name not in manifest["shards"]:
+        # primeiro envio do mes: cria o arquivo e registra no manifesto no mesmo commit
+        response = github_client.commit_files(
+            _repo_url(),
+            _headers(),
+            GITHUB_BRANCH,
+            {
+                path: _serialize([candidate]),
+                MANIFEST_PATH: _serialize(_new_manifest(list(manifest["shards"]) + [name])),
+            },
+            message,
+            expected_shas={MANIFEST_PATH: manifest_sha},
+        )
+        if response or response.status_code not in github_client.CONFLICT_STATUS:
+            return response
+        # outra gravacao criou o mes antes; segue pelo caminho normal
+        github_client.forget_file(_contents_url(MANIFEST_PATH))
+    records, sha = _read_json(path)
+    records = records if isinstance(records, list) else []
+    return github_client.put_records(
+        _contents_url(path),
+        _headers(),
+        records + [candidate],
+        message,
+        GITHUB_BRANCH,
+        sha=sha,
+        timeout=30,
+    )
+
+
+def _locate(candidate_id: str, hint: Optional[dict] = None) -> Tuple[Optional[str], List[dict], Optional[str]]:
+    manifest, _ = load_manifest()
+    names = shards_in_window(manifest)
+    if hint and shard_for(hint) in names:
+        names.remove(shard_for(hint))
+        names.insert(0, shard_for(hint))
+    for name in names:
+        records, sha = _read_json(shard_path(name))
+        if isinstance(records, list) and any(str(item.get("id")) == str(candidate_id) for item in records):
+            return name, records, sha
+    return None, [], None
+
+
+def remove(candidate_id: str, message: str, hint: Optional[dict] = None) -> Optional[requests.Response]:
+    """Remove uma candidatura do seu arquivo mensal; None se ela nao foi encontrada."""
+    name, records, sha = _locate(candidate_id, hint)
+    if name is None:
+        return None
+    records = [item for item in records if str(item.get("id")) != str(candidate_id)]
+    return github_client.put_records(
+        _contents_url(shard_path(name)), _headers(), records, message, GITHUB_BRANCH, sha=sha, timeout=30
+    )
+
+
+def expired_shards(manifest: dict, now: Optional[datetime] = None) -> List[str]:
+    """Meses cujas candidaturas ja passaram todas do prazo de retencao."""
+    cutoff = (now or datetime.now()) - timedelta(days=RETENTION_DAYS)
+    return [name for name in shards_in_window(manifest) if _month_end(name) <= cutoff]
+
+
+def drop_shards(
+    manifest: dict,
+    manifest_sha: Optional[str],
+    names: List[str],
+    extra_removals: Iterable[str],
+    message: str,
+) -> requests.Response:
+    """Remove os arquivos mensais `names` (e `extra_removals`, ex.: curriculos) num unico commit."""
+    remaining = [name for name in manifest["shards"] if name not in names]
+    files: Dict[str, Optional[str]] = {shard_path(name): None for name in names}
+    files.update({path: None for path in extra_removals})
+    files[MANIFEST_PATH] = _serialize(_new_manifest(remaining))
+    return github_client.commit_files(
+        _repo_url(), _headers(), GITHUB_BRANCH, files, message, expected_shas={MANIFEST_PATH: manifest_sha}
+    )
+
+
+def write_all(records: List[dict], message: str) -> bool:
+    """Grava a lista completa redistribuida por mes (migracao e exportacao do banco local).
+
+    Meses sem alteracao em relacao a versao conhecida nao sao reenviados; meses que
+    ficaram vazios sao removidos.
+    """
+    groups: Dict[str, List[dict]] = {}
+    for record in records or []:
+        if isinstance(record, dict):
+            groups.setdefault(shard_for(record), []).append(record)
+
+    previous, manifest_sha = _read_json(MANIFEST_PATH)
+    has_manifest = isinstance(previous, dict) and isinstance(previous.get("shards"), dict)
+    previous_names = set(previous["shards"]) if has_manifest else set()
+    files: Dict[str, Optional[str]] = {}
+    for name, items in groups.items():
+        content = _serialize(items)
+        if github_client.known_sha(_contents_url(shard_path(name))) != _blob_sha(content):
+            files[shard_path(name)] = content
+    for name in previous_names - set(groups):
+        files[shard_path(name)] = None
+    if not has_manifest or previous_names != set(groups):
+        files[MANIFEST_PATH] = _serialize(_new_manifest(groups))
+    if not files:
+        return True
+    # o commit e recusado se o manifesto ou algum mes gravado mudou (ou foi criado) depois da leitura
+    expected: Dict[str, Optional[str]] = {MANIFEST_PATH: manifest_sha or github_client.ABSENT}
+    for path in files:
+        if path != MANIFEST_PATH:
+            url = _contents_url(path)
+            expected[path] = github_client.known_sha(url) or _read_json(path)[1] or github_client.ABSENT
+    response = github_client.commit_files(_repo_url(), _headers(), GITHUB_BRANCH, files, message, expected_shas=expected)
+    if not response:
+        # shas possivelmente vencidos no cache: a proxima tentativa le de novo
+        for path in files:
+            github_client.forget_file(_contents_url(path))
+    return bool(response)
@@ -0,0 +1,184 @@
+"""Registro das visualizacoes de candidaturas no painel admin.
+
+Abrir uma candidatura nao grava mais nada no GitHub nem no registro do candidato:
+cada visualizacao e acrescentada a um log local (DATA_DIR/data/visualizacoes.log,
+uma linha JSON por evento) e o ultimo visualizador e o historico recente ficam num
+mapa em memoria. De tempos em tempos (ou quando o log passa de COMPACT_EVERY linhas)
+o mapa e gravado como resumo em DATA_DIR/data/visualizacoes.json e o log recomeca
+vazio; na inicializacao o resumo e carregado e o log e reaplicado por cima.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, Iterable, List, Optional
+
+from app_paths import DATA_DIR
+import github_client
+
+LOG_PATH = DATA_DIR / "data" / "visualizacoes.log"
+SUMMARY_PATH = DATA_DIR / "data" / "visualizacoes.json"
+HISTORY_LIMIT = 50
+COMPACT_EVERY = int(os.getenv("VIEW_LOG_COMPACT_EVERY", "5000"))
+COMPACT_SECONDS = float(os.getenv("VIEW_LOG_COMPACT_SECONDS", "3600"))
+
+_LOCK = threading.Lock()
+_VIEWS: Dict[str, Deque[Dict[str, str]]] = {}
+_LOADED = False
+_LOG_LINES = 0
+_COMPACTOR: Optional[threading.Thread] = None
+
+
+def _apply_locked(candidate_id: str, viewer: str, timestamp: str) -> None:
+    history = _VIEWS.get(candidate_id)
+    if history is None:
+        history = _VIEWS[candidate_id] = deque(maxlen=HISTORY_LIMIT)
+    history.append({"viewer": viewer, "timestamp": timestamp})
+
+
+def _load_locked() -> None:
+    global _LOADED, _LOG_LINES
+    if _LOADED:
+        return
+    _VIEWS.clear()
+    if SUMMARY_PATH.exists():
+        try:
+            summary = json.loads(SUMMARY_PATH.read_text(encoding="utf-8"))
+        except Exception as exc:
+            print(f"Erro ao ler resumo de visualizacoes: {exc}")
+            summary = {}
+        for candidate_id, history in (summary if isinstance(summary, dict) else {}).items():
+            _VIEWS[candidate_id] = deque(history or [], maxlen=HISTORY_LIMIT)
+    _LOG_LINES = 0
+    if LOG_PATH.exists():
+        with open(LOG_PATH, "r", encoding="utf-8") as handle:
+            for line in handle:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue  # linha incompleta de uma escrita interrompida
+                if event.get("id") == "*esquecer*":
+                    for candidate_id in event.get("ids") or []:
+                        _VIEWS.pop(candidate_id, None)
+                else:
+                    _apply_locked(event["id"], event.get("viewer") or "", event.get("timestamp") or "")
+                _LOG_LINES += 1
+    _LOADED = True
+
+
+def _append_locked(event: Dict[str, Any]) -> None:
+    global _LOG_LINES
+    LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with open(LOG_PATH, "a", encoding="utf-8") as handle:
+        handle.write(json.dumps(event, ensure_ascii=False) + "\n")
+    _LOG_LINES += 1
+
+
+def record(candidate_id: str, viewer: str) -> Dict[str, Any]:
+    """Registra que `viewer` abriu a candidatura e devolve o resumo atualizado."""
+    candidate_id = str(candidate_id)
+    timestamp = datetime.utcnow().isoformat()
+    with _LOCK:
+        _load_locked()
+        _append_locked({"id": candidate_id, "viewer": viewer, "timestamp": timestamp})
+        _apply_locked(candidate_id, viewer, timestamp)
+        summary = _summary_locked(candidate_id)
+        should_compact = _LOG_LINES >= COMPACT_EVERY
+    if should_compact:
+        compact()
+    return summary
+
+
+def _summary_locked(candidate_id: str) -> Dict[str, Any]:
+    history = _VIEWS.get(candidate_id)
+    if not history:
+        return {}
+    return {
+        "ultimo_visualizador": history[-1]["viewer"],
+        "ultimo_visualizado_em": history[-1]["timestamp"],
+        "view_history": list(history),
+    }
+
+
+def summary(candidate_id: str) -> Dict[str, Any]:
+    """Ultimo visualizador, data e historico recente da candidatura ({} se nunca aberta)."""
+    with _LOCK:
+        _load_locked()
+        return _summary_locked(str(candidate_id))
+
+
+def decorate(candidates: Iterable[dict]) -> List[dict]:
+    """Copia das candidaturas com os dados de visualizacao do log sobrepostos."""
+    with _LOCK:
+        _load_locked()
+        decorated = []
+        for candidate in candidates:
+            views = _summary_locked(str(candidate.get("id")))
+            decorated.append({**candidate, **views} if views else candidate)
+    return decorated
+
+
+def forget(candidate_ids: Iterable[str]) -> None:
+    """Descarta as visualizacoes de candidaturas removidas."""
+    ids = [str(candidate_id) for candidate_id in candidate_ids]
+    if not ids:
+        return
+    with _LOCK:
+        _load_locked()
+        if not any(candidate_id in _VIEWS for candidate_id in ids):
+            return
+        _append_locked({"id": "*esquecer*", "ids": ids})
+        for candidate_id in ids:
+            _VIEWS.pop(candidate_id, None)
+
+
+def compact() -> None:
+    """Grava o mapa atual como resumo e recomeca o log."""
+    global _LOG_LINES
+    with _LOCK:
+        _load_locked()
+        if not _LOG_LINES:
+            return
+        SUMMARY_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = SUMMARY_PATH.with_suffix(".json.tmp")
+        payload = {candidate_id: list(history) for candidate_id, history in _VIEWS.items()}
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(payload, handle, ensure_ascii=False)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp_path, SUMMARY_PATH)
+        # o resumo ja contem tudo o que estava no log
+        open(LOG_PATH, "w", encoding="utf-8").close()
+        _LOG_LINES = 0
+
+
+def _compactor_loop() -> None:
+    while True:
+        time.sleep(COMPACT_SECONDS)
+        try:
+            compact()
+        except Exception as exc:
+            print(f"Erro ao compactar log de visualizacoes: {exc}")
+
+
+def start() -> None:
+    """Carrega o resumo e o log e inicia a compactacao periodica."""
+    global _COMPACTOR
+    with _LOCK:
+        _load_locked()
+        if _COMPACTOR is not None:
+            return
+        _COMPACTOR = threading.Thread(
+            target=github_client.background(_compactor_loop), name="visualizacoes", daemon=True
+        )
+        _COMPACTOR.start()
+
+
+def stats() -> Dict[str, Any]:
+    with _LOCK:
+        return {"candidatos": len(_VIEWS), "eventos_no_log": _LOG_LINES}
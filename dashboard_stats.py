@@ -0,0 +1,215 @@
+"""Agregados do dashboard admin mantidos de forma incremental.
+
+`candidate_listing` chama `add`/`remove` a cada candidatura incluida, alterada
+(remove + add) ou excluida e `reset` quando reconstroi o indice; o dashboard so le
+os contadores prontos:
+
+- contagens por status, vaga e cidade;
+- candidaturas por dia de envio, de onde saem os totais de expiradas (dia de envio
+  ha 90 dias ou mais) e dos ultimos 7 dias. Esses dois totais avancam uma vez por
+  dia (`_roll_forward_locked`), somando/subtraindo apenas os dias que cruzaram a janela;
+- as candidaturas dos ultimos 7 dias, ordenadas, para a lista de recentes.
+
+O resumo das vagas e recalculado quando a lista de vagas e gravada por esta
+instancia ou quando passa de VAGAS_MAX_AGE segundos.
+"""
+
+from __future__ import annotations
+
+import bisect
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+EXPIRY_DAYS = 90
+RECENT_DAYS = 7
+VAGAS_MAX_AGE = float(os.getenv("DASHBOARD_VAGAS_MAX_AGE", "600"))
+DEFAULT_LABEL = "Não informada"
+
+RecentEntry = Tuple[datetime, str]
+
+_LOCK = threading.Lock()
+_BY_STATUS: Dict[str, int] = {}
+_BY_VAGA: Dict[str, int] = {}
+_BY_CITY: Dict[str, int] = {}
+_BY_DAY: Dict[date, int] = {}
+# o que cada candidatura somou, para subtrair exatamente o mesmo na remocao
+_CONTRIBUTIONS: Dict[str, Tuple[str, str, str, Optional[datetime]]] = {}
+_RECENT: List[RecentEntry] = []
+_RECENT_RECORDS: Dict[str, dict] = {}
+_TOTAL = 0
+_EXPIRED = 0
+_LAST_DAYS = 0
+_TODAY: Optional[date] = None
+_VAGAS: Optional[Dict[str, Any]] = None
+_VAGAS_AT = 0.0
+
+
+def _parse_date(value) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).replace(tzinfo=None)
+    except ValueError:
+        return None
+
+
+def _bump(counter: Dict[str, int], key: str, delta: int) -> None:
+    value = counter.get(key, 0) + delta
+    if value:
+        counter[key] = value
+    else:
+        counter.pop(key, None)
+
+
+def _expired_day(day: date, today: date) -> bool:
+    return day <= today - timedelta(days=EXPIRY_DAYS)
+
+
+def _recent_day(day: date, today: date) -> bool:
+    return day >= today - timedelta(days=RECENT_DAYS)
+
+
+def _apply_locked(contribution: Tuple[str, str, str, Optional[datetime]], delta: int) -> None:
+    global _TOTAL, _EXPIRED, _LAST_DAYS
+    status, vaga, city, sent_at = contribution
+    _TOTAL += delta
+    _bump(_BY_STATUS, status, delta)
+    _bump(_BY_VAGA, vaga, delta)
+    _bump(_BY_CITY, city, delta)
+    if sent_at is None:
+        return
+    day = sent_at.date()
+    _BY_DAY[day] = _BY_DAY.get(day, 0) + delta
+    if not _BY_DAY[day]:
+        del _BY_DAY[day]
+    if _expired_day(day, _TODAY):
+        _EXPIRED += delta
+    if _recent_day(day, _TODAY):
+        _LAST_DAYS += delta
+
+
+def _roll_forward_locked(today: date) -> None:
+    """Avanca os totais das janelas de 7 e 90 dias ate `today`."""
+    global _TODAY, _EXPIRED, _LAST_DAYS
+    if _TODAY is None or today <= _TODAY:
+        _TODAY = _TODAY or today
+        return
+    if (today - _TODAY).days > EXPIRY_DAYS:
+        _EXPIRED = sum(count for day, count in _BY_DAY.items() if _expired_day(day, today))
+        _LAST_DAYS = sum(count for day, count in _BY_DAY.items() if _recent_day(day, today))
+    else:
+        day = _TODAY
+        while day < today:
+            day += timedelta(days=1)
+            _EXPIRED += _BY_DAY.get(day - timedelta(days=EXPIRY_DAYS), 0)
+            _LAST_DAYS -= _BY_DAY.get(day - timedelta(days=RECENT_DAYS + 1), 0)
+    _TODAY = today
+    cutoff = datetime.combine(today - timedelta(days=RECENT_DAYS), datetime.min.time())
+    drop = bisect.bisect_left(_RECENT, (cutoff, ""))
+    for _, candidate_id in _RECENT[:drop]:
+        _RECENT_RECORDS.pop(candidate_id, None)
+    del _RECENT[:drop]
+
+
+def _contribution(candidate: dict) -> Tuple[str, str, str, Optional[datetime]]:
+    return (
+        (candidate.get("status") or "Novo").strip(),
+        (candidate.get("vaga") or DEFAULT_LABEL).strip(),
+        (candidate.get("cidade") or DEFAULT_LABEL).strip(),
+        _parse_date(candidate.get("enviado_em")),
+    )
+
+
+def _add_locked(candidate_id: str, candidate: dict) -> None:
+    contribution = _contribution(candidate)
+    _CONTRIBUTIONS[candidate_id] = contribution
+    _apply_locked(contribution, 1)
+    sent_at = contribution[3]
+    if sent_at is not None and _recent_day(sent_at.date(), _TODAY):
+        bisect.insort(_RECENT, (sent_at, candidate_id))
+        _RECENT_RECORDS[candidate_id] = candidate
+
+
+def _remove_locked(candidate_id: str) -> None:
+    contribution = _CONTRIBUTIONS.pop(candidate_id, None)
+    if contribution is None:
+        return
+    _apply_locked(contribution, -1)
+    if _RECENT_RECORDS.pop(candidate_id, None) is not None:
+        entry = (contribution[3], candidate_id)
+        position = bisect.bisect_left(_RECENT, entry)
+        if position < len(_RECENT) and _RECENT[position] == entry:
+            del _RECENT[position]
+
+
+def reset(candidates: Dict[str, dict]) -> None:
+    """Recalcula tudo a partir do conjunto completo (id -> candidatura)."""
+    global _TOTAL, _EXPIRED, _LAST_DAYS, _TODAY
+    with _LOCK:
+        for counter in (_BY_STATUS, _BY_VAGA, _BY_CITY, _BY_DAY, _CONTRIBUTIONS, _RECENT_RECORDS):
+            counter.clear()
+        _RECENT.clear()
+        _TOTAL = _EXPIRED = _LAST_DAYS = 0
+        _TODAY = date.today()
+        for candidate_id, candidate in candidates.items():
+            _add_locked(candidate_id, candidate)
+
+
+def add(candidate_id: str, candidate: dict) -> None:
+    with _LOCK:
+        _roll_forward_locked(date.today())
+        _add_locked(str(candidate_id), candidate)
+
+
+def remove(candidate_id: str) -> None:
+    with _LOCK:
+        _roll_forward_locked(date.today())
+        _remove_locked(str(candidate_id))
+
+
+def set_vagas(vagas: List[dict]) -> Dict[str, Any]:
+    """Recalcula (e devolve) o resumo das vagas a partir da lista completa."""
+    global _VAGAS, _VAGAS_AT
+    recentes = sorted(
+        ((_parse_date(vaga.get("inserido_em")) or datetime.min, index) for index, vaga in enumerate(vagas)),
+        reverse=True,
+    )
+    ativas = len([v for v in vagas if (v.get("status") or "ativa").lower() == "ativa"])
+    summary = {
+        "total_vagas": len(vagas),
+        "vagas_ativas": ativas,
+        "vagas_inativas": len(vagas) - ativas,
+        "vagas_recentes": [vagas[index] for _, index in recentes[:5]],
+    }
+    with _LOCK:
+        _VAGAS = summary
+        _VAGAS_AT = time.time()
+    return summary
+
+
+def vagas_summary() -> Optional[Dict[str, Any]]:
+    """Resumo das vagas, ou None se ainda nao calculado ou vencido."""
+    with _LOCK:
+        if _VAGAS is None or time.time() - _VAGAS_AT >= VAGAS_MAX_AGE:
+            return None
+        return _VAGAS
+
+
+def snapshot(recent_limit: int = 10) -> Dict[str, Any]:
+    """Contadores atuais das candidaturas e as `recent_limit` mais recentes dos ultimos 7 dias."""
+    with _LOCK:
+        _roll_forward_locked(date.today())
+        recent = [_RECENT_RECORDS[candidate_id] for _, candidate_id in reversed(_RECENT[-recent_limit:])]
+        return {
+            "total_candidatos": _TOTAL,
+            "candidatos_ativos": max(0, _TOTAL - _EXPIRED),
+            "candidatos_expirados": _EXPIRED,
+            "candidatos_7_dias": _LAST_DAYS,
+            "candidatos_por_status": dict(_BY_STATUS),
+            "candidatos_por_vaga": dict(_BY_VAGA),
+            "candidatos_por_cidade": dict(_BY_CITY),
+            "candidatos_recentes": recent,
+        }
@@ -4,13 +4,17 @@ from typing import Any, Dict, Optional, Tuple, List
 import base64
 import json
 import os
-import requests
 from fastapi import APIRouter, HTTPException
 from dotenv import load_dotenv
 from app_paths import APP_DIR, DATA_DIR
-from sync_service import enqueue_pending
+import github_client
+import local_store
 
+import funcionarios_router
 from funcionarios_router import (
+    EncryptionError,
+    _commit_remote_files,
+    _encrypt_payload,
     _fetch_remote_funcionarios,
     _write_remote_funcionarios,
     _save_local_funcionarios,
@@ -101,8 +105,12 @@ def _github_headers() -> dict:
 
 
 def _load_reprovados() -> Tuple[List[dict], Optional[str]]:
-    url = f"https://api.github.com/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{REPROVADOS_PATH}"
-    response = requests.get(url, headers=_github_headers(), timeout=15, params={"ref": GITHUB_BRANCH})
+    if local_store.handles("reprovados"):
+        stored = local_store.load("reprovados")
+        if stored is not None:
+            return stored, None
+    url = f"{github_client.API_URL}/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{REPROVADOS_PATH}"
+    response = github_client.get(url, headers=_github_headers(), timeout=15, params={"ref": GITHUB_BRANCH})
     if response.status_code == 404:
         return [], None
     if response.status_code != 200:
@@ -118,13 +126,11 @@ def _load_reprovados() -> Tuple[List[dict], Optional[str]]:
         raise HTTPException(status_code=500, detail=f"reprovados.json invalido: {exc}")
     if not isinstance(data, list):
         raise HTTPException(status_code=500, detail="reprovados.json em formato inesperado.")
+    local_store.seed("reprovados", data, payload.get("sha"))
     return data, payload.get("sha")
 
 
-def _save_reprovados(items: List[dict], sha: Optional[str], message: str) -> None:
-    if not GITHUB_TOKEN:
-        enqueue_pending(REPROVADOS_PATH, items, message)
-        raise HTTPException(status_code=500, detail="Token do GitHub nao configurado.")
+def _save_local_reprovados(items: List[dict]) -> None:
     try:
         (BASE_DIR / "reprovados.json").write_text(
             json.dumps(items, ensure_ascii=False, indent=2),
@@ -132,23 +138,10 @@ def _save_reprovados(items: List[dict], sha: Optional[str], message: str) -> Non
         )
     except Exception:
         pass
-    url = f"https://api.github.com/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{REPROVADOS_PATH}"
-    content = json.dumps(items, ensure_ascii=False, indent=2)
-    payload = {
-        "message": message,
-        "branch": GITHUB_BRANCH,
-        "content": base64.b64encode(content.encode("utf-8")).decode("utf-8"),
-    }
-    if sha:
-        payload["sha"] = sha
-    response = requests.put(url, headers=_github_headers(), json=payload, timeout=20)
-    if response.status_code not in (200, 201):
-        enqueue_pending(REPROVADOS_PATH, items, message)
-        raise HTTPException(status_code=500, detail="Falha ao salvar reprovados.json no GitHub.")
 
 
 @router.get("/")
-async def list_experiencia():
+def list_experiencia():
     try:
         funcionarios, _ = _fetch_remote_funcionarios()
     except HTTPException:
@@ -165,13 +158,13 @@ async def list_experiencia():
 
 
 @router.get("/reprovados")
-async def list_reprovados():
+def list_reprovados():
     reprovados, _ = _load_reprovados()
     return {"ok": True, "count": len(reprovados), "reprovados": reprovados}
 
 
 @router.post("/{identifier}/efetivar")
-async def efetivar_funcionario(identifier: str):
+def efetivar_funcionario(identifier: str):
     funcionarios, sha = _fetch_remote_funcionarios()
     target = _find_funcionario_by_identifier(funcionarios, identifier)
     if not target:
@@ -187,7 +180,7 @@ async def efetivar_funcionario(identifier: str):
 
 
 @router.post("/{identifier}/desligar")
-async def desligar_funcionario(identifier: str):
+def desligar_funcionario(identifier: str):
     funcionarios, sha = _fetch_remote_funcionarios()
     target = _find_funcionario_by_identifier(funcionarios, identifier)
     if not target:
@@ -204,7 +197,7 @@ async def desligar_funcionario(identifier: str):
 
 
 @router.post("/{identifier}/reprovar")
-async def reprovar_funcionario(identifier: str, payload: Dict[str, Any]):
+def reprovar_funcionario(identifier: str, payload: Dict[str, Any]):
     motivo = (payload.get("motivo") or "").strip()
     if not motivo:
         raise HTTPException(status_code=400, detail="Informe o motivo da reprovacao.")
@@ -235,10 +228,17 @@ async def reprovar_funcionario(identifier: str, payload: Dict[str, Any]):
         "raw": target,
     }
     reprovados.append(reprovado)
-    _save_reprovados(reprovados, sha_rep, f"Reprovar funcionario {target.get('nome_completo', '')}")
-
     funcionarios = [item for item in funcionarios if item is not target]
-    _write_remote_funcionarios(funcionarios, sha, f"Remover funcionario reprovado {target.get('nome_completo', '')}")
+    _save_local_reprovados(reprovados)
     _save_local_funcionarios(funcionarios)
 
+    try:
+        files = [
+            (REPROVADOS_PATH, reprovados, json.dumps(reprovados, ensure_ascii=False, indent=2), sha_rep),
+            (funcionarios_router.GITHUB_PATH, funcionarios, _encrypt_payload(funcionarios), sha),
+        ]
+    except EncryptionError as exc:
+        raise HTTPException(status_code=500, detail=str(exc)) from exc
+    _commit_remote_files(files, f"Reprovar funcionario {target.get('nome_completo', '')}")
+
     return {"ok": True, "reprovado": reprovado}
@@ -0,0 +1,78 @@
+"""Limpeza agendada das candidaturas expiradas.
+
+A remocao das candidaturas vencidas (e dos seus curriculos) roda numa thread propria
+a cada EXPIRY_SWEEP_SECONDS, nunca dentro de uma requisicao: `/status` e
+`/api/cleanup` apenas consultam o ultimo resultado ou pedem uma execucao antecipada.
+A funcao registrada em `start` faz o trabalho e devolve um relatorio (quantidades e
+tempos de cada etapa), guardado para `stats()`.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+import github_client
+
+INTERVAL_SECONDS = float(os.getenv("EXPIRY_SWEEP_SECONDS", "21600"))
+FIRST_RUN_DELAY = float(os.getenv("EXPIRY_SWEEP_DELAY", "300"))
+
+_LOCK = threading.Lock()
+_WAKE = threading.Event()
+_THREAD: Optional[threading.Thread] = None
+_SWEEP: Optional[Callable[[], Dict[str, Any]]] = None
+_STATE: Dict[str, Any] = {"executando": False, "ultima_execucao": None, "proxima_execucao": None}
+
+
+def _run_once() -> None:
+    with _LOCK:
+        _STATE["executando"] = True
+    started = time.perf_counter()
+    try:
+        report = dict(_SWEEP() or {})
+    except Exception as exc:
+        print(f"Erro na limpeza agendada: {exc}")
+        report = {"erro": str(exc)}
+    report["total_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    report["concluida_em"] = datetime.now().isoformat()
+    print(f"Limpeza agendada: {report}")
+    with _LOCK:
+        _STATE["executando"] = False
+        _STATE["ultima_execucao"] = report
+
+
+def _loop() -> None:
+    delay = FIRST_RUN_DELAY
+    while True:
+        with _LOCK:
+            _STATE["proxima_execucao"] = datetime.fromtimestamp(time.time() + delay).isoformat()
+        _WAKE.wait(timeout=delay)
+        _WAKE.clear()
+        _run_once()
+        delay = INTERVAL_SECONDS
+
+
+def start(sweep: Callable[[], Dict[str, Any]]) -> None:
+    """Registra a funcao de limpeza e inicia o agendamento."""
+    global _SWEEP, _THREAD
+    _SWEEP = sweep
+    if _THREAD is not None:
+        return
+    _THREAD = threading.Thread(target=github_client.background(_loop), name="limpeza-expirados", daemon=True)
+    _THREAD.start()
+
+
+def trigger() -> bool:
+    """Pede uma execucao antecipada; False se o agendamento nao estiver ativo."""
+    if _THREAD is None:
+        return False
+    _WAKE.set()
+    return True
+
+
+def stats() -> Dict[str, Any]:
+    with _LOCK:
+        return dict(_STATE)
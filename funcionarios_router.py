@@ -6,7 +6,7 @@ import secrets
 import uuid
 from datetime import datetime
 from pathlib import Path
-from typing import Any, List, Optional
+from typing import Any, List, Optional, Tuple
 from pydantic import BaseModel
 
 import requests
@@ -20,6 +20,9 @@ from lideres_router import (
 )
 from sync_service import enqueue_pending
 from app_paths import DATA_DIR
+import github_client
+import local_store
+import record_export
 
 router = APIRouter(prefix="/api/funcionarios", tags=["funcionarios"])
 
@@ -204,10 +207,27 @@ def _parse_remote_json(raw: str, context: str) -> List[dict]:
     )
 
 
+local_store.configure(
+    "funcionarios",
+    encode=_encrypt_payload,
+    decode=lambda raw: _parse_remote_json(raw.decode("utf-8"), "funcionarios ativos"),
+)
+local_store.configure(
+    "desligados",
+    encode=_encrypt_payload,
+    decode=lambda raw: _parse_remote_json(raw.decode("utf-8"), "desligados"),
+)
+
+
 def _fetch_remote_funcionarios():
-    url = f"https://api.github.com/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{GITHUB_PATH}"
+    if local_store.handles("funcionarios"):
+        # no banco local o "sha" e a versao lida, usada no merge ao gravar
+        stored, version = local_store.load_versioned("funcionarios")
+        if stored is not None:
+            return stored, version
+    url = f"{github_client.API_URL}/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{GITHUB_PATH}"
     try:
-        response = requests.get(
+        response = github_client.get(
             url,
             headers=GITHUB_HEADERS,
             timeout=10,
@@ -229,36 +249,40 @@ def _fetch_remote_funcionarios():
     sha = payload.get("sha")
 
     if not content:
-        return [], sha
+        return [], None if local_store.handles("funcionarios") else sha
 
     decoded = _decode_github_content(content, "funcionarios ativos")
     funcionarios = _parse_remote_json(decoded, "funcionarios ativos")
-    return funcionarios, sha
+    return local_store.seeded("funcionarios", funcionarios, sha)
 
 
 def _write_remote_funcionarios(funcionarios, sha, message):
     _save_local_funcionarios(funcionarios)
+    if local_store.handles("funcionarios"):
+        _save_local_store("funcionarios", funcionarios, sha, message)
+        return
     if not GITHUB_TOKEN:
         enqueue_pending(GITHUB_PATH, funcionarios, message)
         raise HTTPException(
             status_code=500,
             detail="Token do GitHub nÃ£o configurado para salvar os funcionÃ¡rios ativos."
         )
-    url = f"https://api.github.com/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{GITHUB_PATH}"
+    url = f"{github_client.API_URL}/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{GITHUB_PATH}"
     try:
-        serialized = _encrypt_payload(funcionarios)
+        push_response = github_client.put_records(
+            url,
+            GITHUB_HEADERS,
+            funcionarios,
+            message,
+            GITHUB_BRANCH,
+            sha=sha,
+            encode=_encrypt_payload,
+            decode=lambda raw: _parse_remote_json(raw.decode("utf-8"), "funcionarios ativos"),
+            timeout=10,
+        )
     except EncryptionError as exc:
         raise HTTPException(status_code=500, detail=str(exc)) from exc
-    payload = {
-        "message": message,
-        "content": base64.b64encode(serialized.encode("utf-8")).decode("utf-8"),
-        "branch": GITHUB_BRANCH,
-    }
-    if sha:
-        payload["sha"] = sha
-    try:
-        push_response = requests.put(url, headers=GITHUB_HEADERS, json=payload, timeout=10)
-    except requests.RequestException as exc:
+    except requests.RequestException as exc:
         enqueue_pending(GITHUB_PATH, funcionarios, message)
         raise HTTPException(status_code=500, detail=f"Erro ao salvar no GitHub: {exc}")
     if push_response.status_code not in (200, 201):
@@ -269,6 +293,13 @@ def _write_remote_funcionarios(funcionarios, sha, message):
         )
 
 
+def _save_local_store(dataset, items, version, message):
+    try:
+        local_store.save(dataset, items, message, expected_version=version)
+    except local_store.ConflictError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+
+
 def _save_local_funcionarios(funcionarios):
     try:
         FUNCIONARIOS_DATA_FILE.write_text(json.dumps(funcionarios, ensure_ascii=False, indent=2), encoding="utf-8")
@@ -277,9 +308,13 @@ def _save_local_funcionarios(funcionarios):
 
 
 def _fetch_remote_desligados():
-    url = f"https://api.github.com/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{GITHUB_DESLIGADOS_PATH}"
+    if local_store.handles("desligados"):
+        stored, version = local_store.load_versioned("desligados")
+        if stored is not None:
+            return stored, version
+    url = f"{github_client.API_URL}/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{GITHUB_DESLIGADOS_PATH}"
     try:
-        response = requests.get(
+        response = github_client.get(
             url,
             headers=GITHUB_HEADERS,
             timeout=10,
@@ -301,36 +336,40 @@ def _fetch_remote_desligados():
     sha = payload.get("sha")
 
     if not content:
-        return [], sha
+        return [], None if local_store.handles("desligados") else sha
 
     decoded = _decode_github_content(content, "desligados")
     entries = _parse_remote_json(decoded, "desligados")
-    return entries, sha
+    return local_store.seeded("desligados", entries, sha)
 
 
 def _write_remote_desligados(entries, sha, message):
     _save_local_desligados(entries)
+    if local_store.handles("desligados"):
+        _save_local_store("desligados", entries, sha, message)
+        return
     if not GITHUB_TOKEN:
         enqueue_pending(GITHUB_DESLIGADOS_PATH, entries, message)
         raise HTTPException(
             status_code=500,
             detail="Token do GitHub nÃ£o configurado para salvar os desligados."
         )
-    url = f"https://api.github.com/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{GITHUB_DESLIGADOS_PATH}"
+    url = f"{github_client.API_URL}/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{GITHUB_DESLIGADOS_PATH}"
     try:
-        serialized = _encrypt_payload(entries)
+        push_response = github_client.put_records(
+            url,
+            GITHUB_HEADERS,
+            entries,
+            message,
+            GITHUB_BRANCH,
+            sha=sha,
+            encode=_encrypt_payload,
+            decode=lambda raw: _parse_remote_json(raw.decode("utf-8"), "desligados"),
+            timeout=10,
+        )
     except EncryptionError as exc:
         raise HTTPException(status_code=500, detail=str(exc)) from exc
-    payload = {
-        "message": message,
-        "content": base64.b64encode(serialized.encode("utf-8")).decode("utf-8"),
-        "branch": GITHUB_BRANCH,
-    }
-    if sha:
-        payload["sha"] = sha
-    try:
-        push_response = requests.put(url, headers=GITHUB_HEADERS, json=payload, timeout=10)
-    except requests.RequestException as exc:
+    except requests.RequestException as exc:
         enqueue_pending(GITHUB_DESLIGADOS_PATH, entries, message)
         raise HTTPException(status_code=500, detail=f"Erro ao salvar desligados no GitHub: {exc}")
     if push_response.status_code not in (200, 201):
@@ -355,6 +394,48 @@ def _append_to_desligados(record: dict):
     _save_local_desligados(entries)
 
 
+def _commit_remote_files(files: List[Tuple[str, Any, str, Optional[str]]], message: str) -> None:
+    """Grava varios arquivos (caminho, dados, conteudo serializado, sha lido) em um unico commit."""
+    datasets = {path: local_store.dataset_for(path) for path, _, _, _ in files}
+    if all(name and local_store.handles(name) for name in datasets.values()):
+        try:
+            local_store.save_many(
+                {datasets[path]: items for path, items, _, _ in files},
+                message,
+                expected_versions={datasets[path]: version for path, _, _, version in files},
+            )
+        except local_store.ConflictError as exc:
+            raise HTTPException(status_code=409, detail=str(exc)) from exc
+        return
+    if not GITHUB_TOKEN:
+        for path, items, _, _ in files:
+            enqueue_pending(path, items, message)
+        raise HTTPException(
+            status_code=500,
+            detail="Token do GitHub nao configurado para salvar as alteracoes."
+        )
+    repo_url = f"{github_client.API_URL}/repos/{GITHUB_OWNER}/{GITHUB_REPO}"
+    try:
+        committed = github_client.commit_files(
+            repo_url,
+            GITHUB_HEADERS,
+            GITHUB_BRANCH,
+            {path: serialized for path, _, serialized, _ in files},
+            message,
+            expected_shas={path: sha for path, _, _, sha in files if isinstance(sha, str)},
+        )
+    except requests.RequestException as exc:
+        print(f"Erro ao gravar commit no GitHub: {exc}")
+        committed = False
+    if not committed:
+        for path, items, _, _ in files:
+            enqueue_pending(path, items, message)
+        raise HTTPException(
+            status_code=500,
+            detail="Nao foi possivel gravar as alteracoes no GitHub."
+        )
+
+
 def _persist_record(record: dict) -> None:
     existing = []
     if STORAGE_FILE.exists():
@@ -366,13 +447,13 @@ def _persist_record(record: dict) -> None:
     STORAGE_FILE.write_text(json.dumps(existing, ensure_ascii=False, indent=2), encoding="utf-8")
 
 
-async def _save_uploaded_photo(file: UploadFile) -> Optional[str]:
+def _save_uploaded_photo(file: UploadFile) -> Optional[str]:
     if not file or not file.filename:
         return None
     extension = Path(file.filename).suffix
     filename = f"{uuid.uuid4().hex}{extension}"
     destination = UPLOAD_DIR / filename
-    contents = await file.read()
+    contents = file.file.read()
     destination.write_bytes(contents)
     return str(destination)
 
@@ -466,7 +547,7 @@ class DesligamentoPayload(BaseModel):
 
 
 @router.post("/")
-async def registrar_funcionario(
+def registrar_funcionario(
     nome_completo: str = Form(...),
     cpf: str = Form(...),
     data_nascimento: str = Form(...),
@@ -543,7 +624,7 @@ async def registrar_funcionario(
 
     if foto:
         try:
-            path = await _save_uploaded_photo(foto)
+            path = _save_uploaded_photo(foto)
             record["foto_path"] = path
         except Exception as exc:
             raise HTTPException(status_code=500, detail=f"Erro ao salvar a foto: {exc}")
@@ -560,7 +641,7 @@ async def registrar_funcionario(
 
 
 @router.put("/{funcionario_id}")
-async def atualizar_funcionario(
+def atualizar_funcionario(
     funcionario_id: str,
     payload: FuncionarioUpdatePayload = Body(...),
 ):
@@ -636,7 +717,7 @@ async def atualizar_funcionario(
 
 
 @router.post("/{funcionario_identifier}/desligar")
-async def desligar_funcionario(
+def desligar_funcionario(
     funcionario_identifier: str,
     payload: DesligamentoPayload = Body(...),
 ):
@@ -657,9 +738,18 @@ async def desligar_funcionario(
         "desligado_em": timestamp,
     }
 
-    _write_remote_funcionarios(funcionarios, sha, f"Desliga colaborador {target.get('nome_completo', '')}")
+    desligados, desligados_sha = _fetch_remote_desligados()
+    desligados.append(desligamento)
     _save_local_funcionarios(funcionarios)
-    _append_to_desligados(desligamento)
+    _save_local_desligados(desligados)
+    try:
+        files = [
+            (GITHUB_PATH, funcionarios, _encrypt_payload(funcionarios), sha),
+            (GITHUB_DESLIGADOS_PATH, desligados, _encrypt_payload(desligados), desligados_sha),
+        ]
+    except EncryptionError as exc:
+        raise HTTPException(status_code=500, detail=str(exc)) from exc
+    _commit_remote_files(files, f"Desliga colaborador {target.get('nome_completo', '')}")
 
     return {"ok": True, "desligado": desligamento}
 
@@ -672,9 +762,9 @@ def _load_funcionarios() -> List[dict]:
                 return data
         except json.JSONDecodeError:
             pass
-    url = f"https://raw.githubusercontent.com/{GITHUB_OWNER}/{GITHUB_REPO}/{GITHUB_BRANCH}/funcionarios-ativos.json"
+    url = f"{github_client.RAW_URL}/{GITHUB_OWNER}/{GITHUB_REPO}/{GITHUB_BRANCH}/funcionarios-ativos.json"
     try:
-        response = requests.get(url, timeout=10)
+        response = github_client.get(url, timeout=10)
         if response.status_code == 200:
             try:
                 return _parse_remote_json(response.text, "funcionarios ativos (raw)")
@@ -708,14 +798,56 @@ def _find_funcionario_by_identifier(funcionarios: List[dict], identifier: str) -
     return None
 
 
+FUNCIONARIO_EXPORT_COLUMNS = [
+    "id", "nome_completo", "cpf", "matricula", "empresa", "setor", "funcao", "cbo",
+    "data_admissao", "lider_responsavel", "em_experiencia", "status", "situacao",
+    "data_nascimento", "cidade", "estado",
+]
+
+
+@router.get("/exportar")
+def exportar_funcionarios(
+    formato: str = "csv",
+    colunas: Optional[str] = None,
+    separador: str = ";",
+    empresa: Optional[str] = None,
+    setor: Optional[str] = None,
+    funcao: Optional[str] = None,
+    status: Optional[str] = None,
+):
+    """Exporta os funcionários ativos em CSV ou NDJSON, enviados aos poucos.
+
+    Com o armazenamento local, os registros são lidos do banco em lotes; `colunas`
+    ("nome_completo,cpf,setor") escolhe os campos e os demais parâmetros filtram por valor exato.
+    """
+    records = local_store.iter_records("funcionarios") if local_store.handles("funcionarios") else None
+    if records is None:
+        records = iter(_load_funcionarios())
+    filters = {"empresa": empresa, "setor": setor, "funcao": funcao, "status": status}
+    filters = {field: value.strip().lower() for field, value in filters.items() if value and value.strip()}
+    rows = (
+        record for record in records
+        if isinstance(record, dict)
+        and all(str(record.get(field) or "").strip().lower() == value for field, value in filters.items())
+    )
+    return record_export.streaming_response(
+        rows,
+        formato,
+        record_export.parse_columns(colunas),
+        FUNCIONARIO_EXPORT_COLUMNS,
+        "funcionarios",
+        separador,
+    )
+
+
 @router.get("/")
-async def list_funcionarios():
+def list_funcionarios():
     funcionarios = _load_funcionarios()
     ordered = sorted(funcionarios, key=lambda f: (f.get("nome_completo") or "").lower())
     return {"ok": True, "count": len(ordered), "funcionarios": ordered}
 
 
 @router.get("", include_in_schema=False)
-async def list_funcionarios_without_trailing_slash():
-    return await list_funcionarios()
+def list_funcionarios_without_trailing_slash():
+    return list_funcionarios()
 
@@ -5,11 +5,12 @@ import uuid
 from datetime import datetime
 from typing import List, Optional
 
-import requests
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
 from dotenv import load_dotenv
 from app_paths import APP_DIR, DATA_DIR
+import github_client
+import local_store
 from sync_service import enqueue_pending
 
 load_dotenv(APP_DIR / ".env")
@@ -52,9 +53,9 @@ class FuncaoBase(BaseModel):
 
 
 def get_funcoes_file() -> tuple[Optional[str], Optional[str]]:
-    url = f'https://api.github.com/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{FILE_PATH}'
+    url = f'{github_client.API_URL}/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{FILE_PATH}'
 
-    response = requests.get(url, headers=_get_headers(), timeout=15)
+    response = github_client.get(url, headers=_get_headers(), timeout=15)
     if response.status_code == 200:
         payload = response.json()
         content = base64.b64decode(payload['content']).decode('utf-8')
@@ -68,11 +69,14 @@ def get_funcoes_file() -> tuple[Optional[str], Optional[str]]:
 
 def persist_funcoes(funcoes: List[dict], sha: Optional[str], message: str) -> None:
     _save_local_funcoes(funcoes)
+    if local_store.handles('funcoes'):
+        local_store.save('funcoes', funcoes, message, expected_version=sha)
+        return
     if not _get_github_token():
         enqueue_pending(FILE_PATH, funcoes, message)
         raise RuntimeError('Token do GitHub não configurado')
     payload = json.dumps(funcoes, indent=2, ensure_ascii=False)
-    url = f'https://api.github.com/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{FILE_PATH}'
+    url = f'{github_client.API_URL}/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{FILE_PATH}'
     data = {
         'message': message,
         'branch': BRANCH,
@@ -81,20 +85,25 @@ def persist_funcoes(funcoes: List[dict], sha: Optional[str], message: str) -> No
     if sha:
         data['sha'] = sha
 
-    response = requests.put(url, headers=_get_headers(), json=data, timeout=30)
+    response = github_client.put(url, headers=_get_headers(), json=data, timeout=30)
     if response.status_code not in (200, 201):
         enqueue_pending(FILE_PATH, funcoes, message)
         raise RuntimeError('Não foi possível salvar as funções no GitHub')
 
 
 def load_funcoes() -> tuple[List[dict], Optional[str]]:
+    if local_store.handles('funcoes'):
+        # no banco local o "sha" e a versao lida, usada no merge ao gravar
+        stored, version = local_store.load_versioned('funcoes')
+        if stored is not None:
+            return stored, version
     content, sha = get_funcoes_file()
     if not content:
-        return [], sha
+        return [], None if local_store.handles('funcoes') else sha
     parsed = json.loads(content)
     if not isinstance(parsed, list):
         raise RuntimeError('O arquivo de funções está corrompido')
-    return parsed, sha
+    return local_store.seeded('funcoes', parsed, sha)
 
 
 def sort_funcoes(funcoes: List[dict]) -> List[dict]:
@@ -103,7 +112,7 @@ def sort_funcoes(funcoes: List[dict]) -> List[dict]:
 
 @router.get('/')
 @router.get('', include_in_schema=False)
-async def list_funcoes():
+def list_funcoes():
     try:
         funcoes, _ = load_funcoes()
         return {'ok': True, 'count': len(funcoes), 'funcoes': sort_funcoes(funcoes)}
@@ -120,7 +129,7 @@ def ensure_github_token() -> None:
 
 @router.post('/')
 @router.post('', include_in_schema=False)
-async def create_funcao(payload: FuncaoBase):
+def create_funcao(payload: FuncaoBase):
 
     try:
         funcoes, sha = load_funcoes()
@@ -137,7 +146,7 @@ async def create_funcao(payload: FuncaoBase):
 
 
 @router.put('/{funcao_id}')
-async def update_funcao(funcao_id: str, payload: FuncaoBase):
+def update_funcao(funcao_id: str, payload: FuncaoBase):
 
     try:
         funcoes, sha = load_funcoes()
@@ -158,7 +167,7 @@ async def update_funcao(funcao_id: str, payload: FuncaoBase):
 
 
 @router.delete('/{funcao_id}')
-async def delete_funcao(funcao_id: str):
+def delete_funcao(funcao_id: str):
 
     try:
         funcoes, sha = load_funcoes()
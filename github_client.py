@@ -0,0 +1,898 @@
+"""
+Cliente HTTP compartilhado para as chamadas ao GitHub.
+
+Todas as leituras e escritas de arquivos do repositorio de dados passam por
+uma unica `requests.Session` com pool de conexoes keep-alive, evitando um novo
+handshake TCP/TLS a cada chamada. Os GETs guardam o ETag de cada URL e enviam
+`If-None-Match` nas leituras seguintes; um 304 e respondido com a copia local.
+
+Para a Contents API tambem e mantido um cache `(content, sha)` por arquivo:
+`put_file`/`delete_file` reaproveitam o sha conhecido em vez de fazer um GET
+antes de cada escrita e atualizam o cache com o sha devolvido pelo GitHub.
+
+`commit_files` grava varios arquivos (e remocoes) em um unico commit pela Git
+Data API (blobs, trees, commits e atualizacao do ref), para que uma operacao
+logica nunca deixe o repositorio pela metade.
+
+Arquivos acima do limite de 1 MB da Contents API chegam sem `content`; nesse
+caso `open_content`/`load_json` baixam o blob com o media type raw, em streaming
+para um arquivo temporario indexado pelo sha (so a versao mais recente de cada
+arquivo e mantida, com o diretorio limitado a RAW_CACHE_MAX_BYTES), e `put_file`
+grava conteudos grandes pela API de blobs.
+
+`put_records` grava listas de registros JSON com concorrencia otimista: se o sha
+estiver desatualizado (409/422), rele a versao atual, faz o merge de tres vias por
+`id` (base lida, versao do GitHub, versao local) e tenta de novo com backoff.
+
+Todas as chamadas passam por um agendador com prioridade: no maximo
+GITHUB_MAX_CONCURRENCY requisicoes simultaneas, as interativas (padrao) sempre na
+frente das de segundo plano (`with priority(BACKGROUND)` / `background(fn)`). Os
+cabecalhos X-RateLimit-* e Retry-After sao acompanhados; quando a cota restante
+cai abaixo de GITHUB_RATE_RESERVE, o segundo plano espera o reset para deixar a
+cota para as requisicoes dos usuarios.
+"""
+
+from __future__ import annotations
+
+import base64
+import io
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import requests
+from cachetools import LRUCache
+from requests.adapters import HTTPAdapter
+
+import record_merge
+
+POOL_SIZE = int(os.getenv("GITHUB_POOL_SIZE", "20"))
+ETAG_CACHE_SIZE = int(os.getenv("GITHUB_ETAG_CACHE_SIZE", "256"))
+
+_SESSION: Optional[requests.Session] = None
+_SESSION_LOCK = threading.Lock()
+
+_ETAG_CACHE: LRUCache = LRUCache(maxsize=ETAG_CACHE_SIZE)
+_ETAG_LOCK = threading.Lock()
+
+ETAG_STATS = {"hits": 0, "misses": 0}
+
+_FILES: Dict[str, Dict[str, Any]] = {}
+_FILES_LOCK = threading.Lock()
+_RAW_SHAS: Dict[str, str] = {}  # arquivo -> sha da copia bruta em disco
+_RAW_LOCK = threading.Lock()
+
+CONFLICT_STATUS = (409, 422)
+# valor de `expected_shas` em commit_files para "o arquivo ainda nao pode existir"
+ABSENT = "0" * 40
+CONFLICT_RETRIES = int(os.getenv("GITHUB_CONFLICT_RETRIES", "4"))
+CONFLICT_BACKOFF = float(os.getenv("GITHUB_CONFLICT_BACKOFF", "0.25"))
+COMMIT_ATTEMPTS = int(os.getenv("GITHUB_COMMIT_ATTEMPTS", "3"))
+
+RAW_MEDIA_TYPE = "application/vnd.github.raw"
+LARGE_FILE_THRESHOLD = int(os.getenv("GITHUB_LARGE_FILE_THRESHOLD", str(900 * 1024)))
+RAW_CHUNK_SIZE = 256 * 1024
+RAW_CACHE_DIR = Path(os.getenv("GITHUB_RAW_CACHE_DIR", str(Path(tempfile.gettempdir()) / "github_raw_cache")))
+# limite do diretorio de copias brutas; alem dele as menos usadas sao apagadas
+RAW_CACHE_MAX_BYTES = int(os.getenv("GITHUB_RAW_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+DEFAULT_API_URL = "https://api.github.com"
+DEFAULT_RAW_URL = "https://raw.githubusercontent.com"
+API_URL = DEFAULT_API_URL
+RAW_URL = DEFAULT_RAW_URL
+INTERACTIVE = 0
+BACKGROUND = 1
+MAX_CONCURRENCY = int(os.getenv("GITHUB_MAX_CONCURRENCY", "8"))
+RATE_RESERVE = int(os.getenv("GITHUB_RATE_RESERVE", "200"))
+MAX_RETRY_WAIT = float(os.getenv("GITHUB_MAX_RETRY_WAIT", "60"))
+INTERACTIVE_MAX_WAIT = float(os.getenv("GITHUB_INTERACTIVE_MAX_WAIT", "10"))
+
+_LOCAL = threading.local()
+_SCHEDULER = threading.Condition()
+_ACTIVE = 0
+_WAITING = {INTERACTIVE: 0, BACKGROUND: 0}
+RATE_LIMIT: Dict[str, Any] = {
+    "limit": None,
+    "remaining": None,
+    "reset": None,
+    "blocked_until": 0.0,
+    "throttled": 0,
+    "deferred_background": 0,
+}
+
+
+def get_session() -> requests.Session:
+    global _SESSION
+    if _SESSION is not None:
+        return _SESSION
+    with _SESSION_LOCK:
+        if _SESSION is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _SESSION = session
+    return _SESSION
+
+
+def configure_base_urls() -> None:
+    """Le GITHUB_API_URL/GITHUB_RAW_URL (ex.: o servidor local de `github_standin`).
+
+    Basta GITHUB_API_URL: sem GITHUB_RAW_URL, os downloads raw usam `<API_URL>/raw`.
+    """
+    global API_URL, RAW_URL
+    api_url = (os.getenv("GITHUB_API_URL") or "").strip().rstrip("/")
+    raw_url = (os.getenv("GITHUB_RAW_URL") or "").strip().rstrip("/")
+    new_api = api_url or DEFAULT_API_URL
+    new_raw = raw_url or (f"{api_url}/raw" if api_url else DEFAULT_RAW_URL)
+    if (new_api, new_raw) != (API_URL, RAW_URL):
+        API_URL, RAW_URL = new_api, new_raw
+        invalidate()
+        with _FILES_LOCK:
+            _FILES.clear()
+
+
+def current_priority() -> int:
+    return getattr(_LOCAL, "priority", INTERACTIVE)
+
+
+@contextmanager
+def priority(level: int) -> Iterator[None]:
+    """Define a prioridade das chamadas ao GitHub feitas pela thread atual."""
+    previous = current_priority()
+    _LOCAL.priority = level
+    try:
+        yield
+    finally:
+        _LOCAL.priority = previous
+
+
+def background(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Embrulha `fn` para que suas chamadas ao GitHub rodem com prioridade de segundo plano."""
+    def runner(*args: Any, **kwargs: Any) -> Any:
+        with priority(BACKGROUND):
+            return fn(*args, **kwargs)
+    runner.__name__ = getattr(fn, "__name__", "runner")
+    return runner
+
+
+def _budget_wait(level: int, now: float) -> float:
+    """Segundos que uma requisicao desta prioridade deve esperar pela cota do GitHub."""
+    wait = RATE_LIMIT["blocked_until"] - now
+    remaining = RATE_LIMIT["remaining"]
+    reset = RATE_LIMIT["reset"]
+    if remaining is not None and reset and reset > now:
+        if remaining <= 0 or (level == BACKGROUND and remaining < RATE_RESERVE):
+            wait = max(wait, reset - now)
+    return max(wait, 0.0)
+
+
+def _acquire(level: int, rate_limited: bool) -> None:
+    global _ACTIVE
+    deadline = time.time() + INTERACTIVE_MAX_WAIT if level == INTERACTIVE else None
+    with _SCHEDULER:
+        _WAITING[level] += 1
+        counted = False
+        try:
+            while True:
+                now = time.time()
+                wait = _budget_wait(level, now) if rate_limited else 0.0
+                if deadline is not None:
+                    wait = min(wait, max(deadline - now, 0.0))
+                ahead = level == BACKGROUND and _WAITING[INTERACTIVE] > 0
+                if wait <= 0 and not ahead and _ACTIVE < MAX_CONCURRENCY:
+                    break
+                if wait > 0 and level == BACKGROUND and not counted:
+                    RATE_LIMIT["deferred_background"] += 1
+                    counted = True
+                _SCHEDULER.wait(timeout=wait if wait > 0 else 1.0)
+            _ACTIVE += 1
+        finally:
+            _WAITING[level] -= 1
+
+
+def _release() -> None:
+    global _ACTIVE
+    with _SCHEDULER:
+        _ACTIVE -= 1
+        _SCHEDULER.notify_all()
+
+
+def _record_rate_limit(response: requests.Response) -> float:
+    """Atualiza o estado da cota a partir da resposta; retorna quanto esperar antes de repetir."""
+    headers = response.headers
+    retry_wait = 0.0
+    with _SCHEDULER:
+        if headers.get("X-RateLimit-Remaining") is not None:
+            try:
+                RATE_LIMIT["remaining"] = int(headers["X-RateLimit-Remaining"])
+                RATE_LIMIT["limit"] = int(headers.get("X-RateLimit-Limit") or 0) or RATE_LIMIT["limit"]
+                RATE_LIMIT["reset"] = float(headers.get("X-RateLimit-Reset") or 0) or RATE_LIMIT["reset"]
+            except ValueError:
+                pass
+        if response.status_code in (403, 429):
+            retry_after = headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                retry_wait = float(retry_after)
+            elif RATE_LIMIT["remaining"] == 0 and RATE_LIMIT["reset"]:
+                retry_wait = max(RATE_LIMIT["reset"] - time.time(), 1.0)
+            if retry_wait:
+                RATE_LIMIT["throttled"] += 1
+                RATE_LIMIT["blocked_until"] = max(RATE_LIMIT["blocked_until"], time.time() + retry_wait)
+        _SCHEDULER.notify_all()
+    return retry_wait
+
+
+def _send(method: str, url: str, **kwargs: Any) -> requests.Response:
+    """Executa a requisicao respeitando prioridade, concorrencia e a cota do GitHub."""
+    level = current_priority()
+    rate_limited = url.startswith(API_URL)
+    for attempt in range(2):
+        _acquire(level, rate_limited)
+        try:
+            response = get_session().request(method, url, **kwargs)
+        finally:
+            _release()
+        retry_wait = _record_rate_limit(response) if rate_limited else 0.0
+        limit = MAX_RETRY_WAIT if level == BACKGROUND else INTERACTIVE_MAX_WAIT
+        if not retry_wait or attempt or retry_wait > limit:
+            return response
+        print(f"GitHub limitou as requisicoes; nova tentativa em {retry_wait:.0f}s")
+        response.close()
+    return response
+
+
+def rate_limit_status() -> Dict[str, Any]:
+    with _SCHEDULER:
+        status = dict(RATE_LIMIT)
+        status["active"] = _ACTIVE
+        status["waiting_interactive"] = _WAITING[INTERACTIVE]
+        status["waiting_background"] = _WAITING[BACKGROUND]
+    status["blocked_for"] = round(max(status.pop("blocked_until") - time.time(), 0.0), 1)
+    return status
+
+
+def _header_value(headers: Optional[Dict[str, str]], name: str) -> str:
+    for key, value in (headers or {}).items():
+        if key.lower() == name.lower():
+            return value or ""
+    return ""
+
+
+def _cache_key(url: str, params: Optional[Dict[str, Any]], headers: Optional[Dict[str, str]]) -> str:
+    prepared = requests.Request("GET", url, params=params).prepare().url
+    return f"{_header_value(headers, 'Accept')}|{prepared}"
+
+
+def invalidate(url: Optional[str] = None) -> None:
+    """Remove entradas do cache de ETag (todas, se `url` nao for informada)."""
+    with _ETAG_LOCK:
+        if url is None:
+            _ETAG_CACHE.clear()
+            return
+        for key in [k for k in _ETAG_CACHE.keys() if k.split("|", 1)[1].startswith(url)]:
+            _ETAG_CACHE.pop(key, None)
+
+
+def get(
+    url: str,
+    headers: Optional[Dict[str, str]] = None,
+    params: Optional[Dict[str, Any]] = None,
+    timeout: float = 10,
+    **kwargs: Any,
+) -> requests.Response:
+    """GET condicional: reaproveita a resposta anterior quando o GitHub devolve 304."""
+    request_headers = dict(headers or {})
+    cacheable = not kwargs.get("stream") and not _header_value(request_headers, "If-None-Match")
+    key = _cache_key(url, params, request_headers) if cacheable else None
+    cached: Optional[requests.Response] = None
+    if key:
+        with _ETAG_LOCK:
+            cached = _ETAG_CACHE.get(key)
+        if cached is not None:
+            request_headers["If-None-Match"] = cached.headers.get("ETag", "")
+
+    response = _send("GET", url, headers=request_headers, params=params, timeout=timeout, **kwargs)
+
+    if response.status_code == 304 and cached is not None:
+        ETAG_STATS["hits"] += 1
+        return cached
+    if key:
+        ETAG_STATS["misses"] += 1
+        with _ETAG_LOCK:
+            if response.status_code == 200 and response.headers.get("ETag"):
+                _ETAG_CACHE[key] = response
+            else:
+                _ETAG_CACHE.pop(key, None)
+    return response
+
+
+def put(url: str, headers: Optional[Dict[str, str]] = None, timeout: float = 30, **kwargs: Any) -> requests.Response:
+    return _send("PUT", url, headers=headers, timeout=timeout, **kwargs)
+
+
+def post(url: str, headers: Optional[Dict[str, str]] = None, timeout: float = 30, **kwargs: Any) -> requests.Response:
+    return _send("POST", url, headers=headers, timeout=timeout, **kwargs)
+
+
+def patch(url: str, headers: Optional[Dict[str, str]] = None, timeout: float = 30, **kwargs: Any) -> requests.Response:
+    return _send("PATCH", url, headers=headers, timeout=timeout, **kwargs)
+
+
+def delete(url: str, headers: Optional[Dict[str, str]] = None, timeout: float = 30, **kwargs: Any) -> requests.Response:
+    return _send("DELETE", url, headers=headers, timeout=timeout, **kwargs)
+
+
+def _file_key(url: str) -> str:
+    return url.split("?", 1)[0]
+
+
+def known_sha(url: str) -> Optional[str]:
+    with _FILES_LOCK:
+        entry = _FILES.get(_file_key(url))
+    return entry.get("sha") if entry else None
+
+
+def cached_content(url: str) -> Optional[str]:
+    """Conteudo (base64) da ultima versao conhecida do arquivo."""
+    with _FILES_LOCK:
+        entry = _FILES.get(_file_key(url))
+    return entry.get("content") if entry else None
+
+
+def remember_file(url: str, sha: Optional[str], content: Optional[str] = None, etag: Optional[str] = None) -> None:
+    if not sha:
+        forget_file(url)
+        return
+    with _FILES_LOCK:
+        _FILES[_file_key(url)] = {"sha": sha, "content": content, "etag": etag, "payload": None}
+
+
+def forget_file(url: str) -> None:
+    with _FILES_LOCK:
+        _FILES.pop(_file_key(url), None)
+
+
+def read_file(
+    url: str,
+    headers: Optional[Dict[str, str]] = None,
+    params: Optional[Dict[str, Any]] = None,
+    timeout: float = 10,
+) -> Optional[dict]:
+    """Le um arquivo da Contents API e registra seu sha. Retorna None se nao existir."""
+    response = get(url, headers=headers, params=params, timeout=timeout)
+    return payload_from_response(url, response)
+
+
+def payload_from_response(url: str, response: requests.Response) -> Optional[dict]:
+    """Decodifica a resposta de um GET na Contents API, registrando o sha no cache."""
+    key = _file_key(url)
+    if response.status_code == 404:
+        forget_file(key)
+        return None
+    if response.status_code != 200:
+        return None
+    etag = response.headers.get("ETag")
+    with _FILES_LOCK:
+        entry = _FILES.get(key)
+        if entry and etag and entry.get("etag") == etag and entry.get("payload") is not None:
+            return entry["payload"]
+    payload = response.json()
+    if isinstance(payload, dict) and payload.get("sha"):
+        with _FILES_LOCK:
+            _FILES[key] = {
+                "sha": payload.get("sha"),
+                "content": payload.get("content"),
+                "etag": etag,
+                "payload": payload,
+            }
+    return payload
+
+
+def is_truncated(payload: Optional[dict]) -> bool:
+    """Indica se a Contents API omitiu o conteudo (arquivos acima de 1 MB)."""
+    if not isinstance(payload, dict):
+        return False
+    return not payload.get("content") and (payload.get("size") or 0) > 0
+
+
+def _raw_cache_path(sha: str) -> Path:
+    return RAW_CACHE_DIR / sha
+
+
+def _unlink_quietly(path: Path) -> None:
+    try:
+        path.unlink()
+    except OSError:
+        pass  # ja removido, ou ainda aberto (Windows): sai numa proxima limpeza
+
+
+def _remember_raw(url: str, sha: str) -> None:
+    """Registra `sha` como a copia atual do arquivo e apaga a versao anterior dele.
+
+    Depois limita o diretorio a RAW_CACHE_MAX_BYTES, removendo primeiro as copias usadas
+    ha mais tempo (inclusive as de execucoes anteriores, que nao estao no mapa).
+    """
+    key = _file_key(url)
+    with _RAW_LOCK:
+        previous = _RAW_SHAS.get(key)
+        _RAW_SHAS[key] = sha
+        if previous and previous != sha and previous not in _RAW_SHAS.values():
+            _unlink_quietly(_raw_cache_path(previous))
+        entries = []
+        for path in RAW_CACHE_DIR.iterdir():
+            if path.suffix == ".part" or path.name == sha:
+                continue
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        try:
+            total = _raw_cache_path(sha).stat().st_size + sum(size for _, size, _ in entries)
+        except OSError:
+            return
+        for _, size, path in sorted(entries):
+            if total <= RAW_CACHE_MAX_BYTES:
+                break
+            _unlink_quietly(path)
+            total -= size
+
+
+def download_raw(
+    url: str,
+    headers: Optional[Dict[str, str]] = None,
+    params: Optional[Dict[str, Any]] = None,
+    sha: Optional[str] = None,
+    timeout: float = 120,
+) -> Optional[IO[bytes]]:
+    """Baixa o conteudo bruto de um arquivo em streaming; com `sha`, reaproveita a copia em disco."""
+    if sha:
+        cached = _raw_cache_path(sha)
+        try:
+            handle = cached.open("rb")
+        except FileNotFoundError:
+            pass
+        else:
+            os.utime(cached)  # marca como usada para a limpeza por tamanho
+            _remember_raw(url, sha)
+            return handle
+    raw_headers = dict(headers or {})
+    raw_headers["Accept"] = RAW_MEDIA_TYPE
+    with _send("GET", url, headers=raw_headers, params=params, timeout=timeout, stream=True) as response:
+        if response.status_code != 200:
+            print(f"Erro ao baixar conteudo bruto de {_file_key(url)}: {response.status_code}")
+            return None
+        if not sha:
+            spool = tempfile.SpooledTemporaryFile(max_size=LARGE_FILE_THRESHOLD)
+            for chunk in response.iter_content(chunk_size=RAW_CHUNK_SIZE):
+                spool.write(chunk)
+            spool.seek(0)
+            return spool
+        RAW_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        partial = RAW_CACHE_DIR / f"{sha}.{threading.get_ident()}.part"
+        with partial.open("wb") as handle:
+            for chunk in response.iter_content(chunk_size=RAW_CHUNK_SIZE):
+                handle.write(chunk)
+        os.replace(partial, _raw_cache_path(sha))
+    handle = _raw_cache_path(sha).open("rb")
+    _remember_raw(url, sha)
+    return handle
+
+
+def open_content(
+    url: str,
+    payload: Optional[dict],
+    headers: Optional[Dict[str, str]] = None,
+    params: Optional[Dict[str, Any]] = None,
+) -> Optional[IO[bytes]]:
+    """Abre o conteudo de um payload da Contents API, buscando o blob bruto quando ele veio truncado."""
+    if not isinstance(payload, dict):
+        return None
+    if is_truncated(payload):
+        return download_raw(url, headers=headers, params=params, sha=payload.get("sha"))
+    return io.BytesIO(base64.b64decode(payload.get("content") or ""))
+
+
+def load_json(
+    url: str,
+    payload: Optional[dict],
+    headers: Optional[Dict[str, str]] = None,
+    params: Optional[Dict[str, Any]] = None,
+) -> Any:
+    """Decodifica o JSON de um payload da Contents API (None se vazio ou ausente)."""
+    handle = open_content(url, payload, headers=headers, params=params)
+    if handle is None:
+        return None
+    with handle:
+        text = io.TextIOWrapper(handle, encoding="utf-8")
+        first = text.read(1)
+        if not first:
+            return None
+        text.seek(0)
+        return json.load(text)
+
+
+def _resolve_sha(url: str, headers: Optional[Dict[str, str]], body: Dict[str, Any], refresh: bool) -> None:
+    if refresh:
+        forget_file(url)
+    sha = known_sha(url)
+    if not sha:
+        current = read_file(url, headers=headers)
+        sha = current.get("sha") if isinstance(current, dict) else None
+    if sha:
+        body["sha"] = sha
+    else:
+        body.pop("sha", None)
+
+
+def put_file(
+    url: str,
+    headers: Optional[Dict[str, str]],
+    body: Dict[str, Any],
+    timeout: float = 30,
+) -> requests.Response:
+    """PUT na Contents API usando o sha em cache; refaz a leitura do sha uma vez em caso de conflito."""
+    body = dict(body)
+    explicit_sha = "sha" in body
+    if len(body.get("content") or "") * 3 // 4 > LARGE_FILE_THRESHOLD and body.get("branch"):
+        return _put_large_file(url, headers, body)
+    if not explicit_sha:
+        _resolve_sha(url, headers, body, refresh=False)
+    response = put(url, headers=headers, json=body, timeout=timeout)
+    if response.status_code in CONFLICT_STATUS and not explicit_sha:
+        _resolve_sha(url, headers, body, refresh=True)
+        response = put(url, headers=headers, json=body, timeout=timeout)
+    if response.status_code in (200, 201):
+        try:
+            new_sha = (response.json().get("content") or {}).get("sha")
+        except ValueError:
+            new_sha = None
+        remember_file(url, new_sha, body.get("content"))
+    elif response.status_code in CONFLICT_STATUS:
+        forget_file(url)
+    return response
+
+
+def _put_large_file(url: str, headers: Optional[Dict[str, str]], body: Dict[str, Any]) -> requests.Response:
+    """Grava conteudos grandes pela API de blobs, com o mesmo controle de sha da Contents API."""
+    repo_url, _, path = _file_key(url).partition("/contents/")
+    expected = body.get("sha") if "sha" in body else known_sha(url)
+    return commit_files(
+        repo_url,
+        headers,
+        body["branch"],
+        {path: base64.b64decode(body["content"])},
+        body.get("message") or f"Atualiza {path}",
+        expected_shas={path: expected},
+    )
+
+
+def _encode_records(records: List[Any]) -> str:
+    return json.dumps(records, indent=2, ensure_ascii=False)
+
+
+def _decode_records(raw: bytes) -> List[Any]:
+    text = raw.decode("utf-8").strip()
+    if not text:
+        return []
+    data = json.loads(text)
+    if isinstance(data, dict):
+        return [data]
+    return data if isinstance(data, list) else []
+
+
+def _records_at(
+    url: str,
+    headers: Optional[Dict[str, str]],
+    sha: Optional[str],
+    decode: Callable[[bytes], List[Any]],
+) -> Optional[List[Any]]:
+    """Recupera a versao `sha` de um arquivo: do cache se possivel, senao pela API de blobs."""
+    if not sha:
+        return None
+    with _FILES_LOCK:
+        entry = _FILES.get(_file_key(url))
+        content = entry.get("content") if entry and entry.get("sha") == sha else None
+    if content:
+        return decode(base64.b64decode(content))
+    repo_url = _file_key(url).partition("/contents/")[0]
+    handle = download_raw(f"{repo_url}/git/blobs/{sha}", headers=headers, sha=sha)
+    if handle is None:
+        return None
+    with handle:
+        return decode(handle.read())
+
+
+def _read_current(
+    url: str,
+    headers: Optional[Dict[str, str]],
+    branch: str,
+    decode: Callable[[bytes], List[Any]],
+) -> Tuple[Optional[List[Any]], Optional[str], requests.Response]:
+    """Versao atual do arquivo para um merge: (registros, sha, resposta do GET).
+
+    Somente um 404 vira lista vazia (com sha None); qualquer outra falha na leitura, ou no
+    download do blob de um arquivo grande, devolve registros None.
+    """
+    forget_file(url)
+    params = {"ref": branch}
+    response = get(url, headers=headers, params=params, timeout=10)
+    payload = payload_from_response(url, response)
+    if payload is None:
+        return ([] if response.status_code == 404 else None), None, response
+    handle = open_content(url, payload, headers=headers, params=params)
+    if handle is None:
+        return (None if is_truncated(payload) else []), payload.get("sha"), response
+    with handle:
+        return decode(handle.read()), payload.get("sha"), response
+
+
+def rebase_records(
+    url: str,
+    headers: Optional[Dict[str, str]],
+    branch: str,
+    base_sha: Optional[str],
+    records: List[Any],
+    key_fn: Optional[Callable[[Any], Optional[str]]] = None,
+    decode: Optional[Callable[[bytes], List[Any]]] = None,
+) -> Tuple[List[Any], Optional[str]]:
+    """Combina `records` (alterados a partir da versao `base_sha`) com a versao atual do arquivo.
+
+    Retorna a lista do merge de tres vias e o sha atual (None se o arquivo nao existe), para
+    uma nova tentativa de gravacao. Uma falha na leitura levanta RuntimeError.
+    """
+    decode = decode or _decode_records
+    base = _records_at(url, headers, base_sha, decode)
+    theirs, current_sha, response = _read_current(url, headers, branch, decode)
+    if theirs is None:
+        raise RuntimeError(f"Erro ao ler {_file_key(url)} para o merge: {response.status_code}")
+    return record_merge.three_way_merge(base, theirs, records, key_fn), current_sha
+
+
+def put_records(
+    url: str,
+    headers: Optional[Dict[str, str]],
+    records: List[Any],
+    message: str,
+    branch: str,
+    sha: Optional[str] = None,
+    key_fn: Optional[Callable[[Any], Optional[str]]] = None,
+    encode: Optional[Callable[[List[Any]], Union[str, bytes]]] = None,
+    decode: Optional[Callable[[bytes], List[Any]]] = None,
+    timeout: float = 30,
+) -> requests.Response:
+    """Grava uma lista de registros; em conflito de sha faz merge de tres vias e tenta de novo.
+
+    `sha` e o sha da versao lida (padrao: o conhecido pelo cache). `encode`/`decode`
+    convertem entre a lista e o conteudo do arquivo (ex.: payload criptografado).
+    """
+    response, _ = put_records_merged(url, headers, records, message, branch, sha, key_fn, encode, decode, timeout)
+    return response
+
+
+def put_records_merged(
+    url: str,
+    headers: Optional[Dict[str, str]],
+    records: List[Any],
+    message: str,
+    branch: str,
+    sha: Optional[str] = None,
+    key_fn: Optional[Callable[[Any], Optional[str]]] = None,
+    encode: Optional[Callable[[List[Any]], Union[str, bytes]]] = None,
+    decode: Optional[Callable[[bytes], List[Any]]] = None,
+    timeout: float = 30,
+) -> Tuple[requests.Response, List[Any]]:
+    """Como `put_records`, mas retorna tambem a lista enviada na ultima tentativa (ja com o merge)."""
+    encode = encode or _encode_records
+    decode = decode or _decode_records
+    base_sha = sha or known_sha(url)
+    base: Optional[List[Any]] = None
+    base_loaded = False
+    current_sha = base_sha
+    mine = records
+    response = None
+    for attempt in range(CONFLICT_RETRIES + 1):
+        content = encode(mine)
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        body = {"message": message, "branch": branch, "content": base64.b64encode(content).decode("utf-8")}
+        if current_sha:
+            body["sha"] = current_sha
+        response = put_file(url, headers, body, timeout=timeout)
+        if response.status_code not in CONFLICT_STATUS or attempt == CONFLICT_RETRIES:
+            break
+
+        if not base_loaded:
+            base = _records_at(url, headers, base_sha, decode)
+            base_loaded = True
+        theirs, current_sha, read_response = _read_current(url, headers, branch, decode)
+        if theirs is None:
+            # sem a versao atual o merge descartaria os registros dela: a gravacao falha
+            print(f"Erro ao reler {_file_key(url).rpartition('/contents/')[2]} apos conflito: {read_response.status_code}")
+            if read_response.status_code == 200:
+                return _failed_response(url, 502, "download of the current version failed"), mine
+            return read_response, mine
+        print(f"Conflito ao gravar {_file_key(url).rpartition('/contents/')[2]}; refazendo merge (tentativa {attempt + 1})")
+        mine = record_merge.three_way_merge(base, theirs, mine, key_fn)
+        base = theirs
+        time.sleep(min(CONFLICT_BACKOFF * (2 ** attempt), 4.0) + random.uniform(0, CONFLICT_BACKOFF))
+    return response, mine
+
+
+def delete_file(
+    url: str,
+    headers: Optional[Dict[str, str]],
+    body: Dict[str, Any],
+    timeout: float = 30,
+) -> Optional[requests.Response]:
+    """DELETE na Contents API; retorna None quando o arquivo nao existe."""
+    body = dict(body)
+    if "sha" not in body:
+        _resolve_sha(url, headers, body, refresh=False)
+        if "sha" not in body:
+            return None
+    response = delete(url, headers=headers, json=body, timeout=timeout)
+    if response.status_code in CONFLICT_STATUS:
+        _resolve_sha(url, headers, body, refresh=True)
+        if "sha" not in body:
+            return None
+        response = delete(url, headers=headers, json=body, timeout=timeout)
+    forget_file(url)
+    return response
+
+
+def _tree_shas(repo_url: str, headers: Optional[Dict[str, str]], tree_sha: str, paths: Iterable[str]) -> Dict[str, str]:
+    """Retorna o sha atual de cada caminho de `paths` presente na arvore (percorre so os diretorios necessarios)."""
+    listings: Dict[str, Dict[str, str]] = {}
+
+    def listing(folder: str) -> Dict[str, str]:
+        if folder in listings:
+            return listings[folder]
+        if not folder:
+            sha = tree_sha
+        else:
+            parent, _, name = folder.rpartition("/")
+            sha = listing(parent).get(name)
+        entries: Dict[str, str] = {}
+        if sha:
+            response = get(f"{repo_url}/git/trees/{sha}", headers=headers, timeout=30)
+            if response.status_code == 200:
+                for item in response.json().get("tree") or []:
+                    entries[item.get("path")] = item.get("sha")
+        listings[folder] = entries
+        return entries
+
+    found = {}
+    for path in paths:
+        folder, _, name = path.rpartition("/")
+        sha = listing(folder).get(name)
+        if sha:
+            found[path] = sha
+    return found
+
+
+def _failed_response(url: str, status_code: int, message: str) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status_code
+    response.url = url
+    response._content = json.dumps({"message": message}).encode("utf-8")
+    return response
+
+
+def _conflict_response(url: str, message: str) -> requests.Response:
+    return _failed_response(url, 409, message)
+
+
+def commit_files(
+    repo_url: str,
+    headers: Optional[Dict[str, str]],
+    branch: str,
+    files: Dict[str, Optional[Union[str, bytes]]],
+    message: str,
+    expected_shas: Optional[Dict[str, Optional[str]]] = None,
+) -> requests.Response:
+    """Grava `files` (caminho -> conteudo, ou None para remover) em um unico commit no branch.
+
+    `expected_shas` protege os arquivos lidos antes da escrita: se algum deles tiver mudado no
+    branch (ou, com ABSENT, tiver sido criado), o commit e abortado com 409 em vez de
+    sobrescrever a alteracao. A resposta devolvida
+    e a da atualizacao do ref (ou a da etapa que falhou), entao `bool(response)` indica sucesso.
+    """
+    expected_shas = {path: sha for path, sha in (expected_shas or {}).items() if sha}
+    ref_url = f"{repo_url}/git/refs/heads/{branch}"
+    encoded = {
+        path: (content.encode("utf-8") if isinstance(content, str) else content)
+        for path, content in files.items()
+    }
+    removals = [path for path, data in encoded.items() if data is None]
+
+    blobs: Dict[str, str] = {}
+    for path, data in encoded.items():
+        if data is None:
+            continue
+        blob_response = post(
+            f"{repo_url}/git/blobs",
+            headers=headers,
+            json={"content": base64.b64encode(data).decode("utf-8"), "encoding": "base64"},
+            timeout=120,
+        )
+        if blob_response.status_code not in (200, 201):
+            print(f"Erro ao criar blob de {path}: {blob_response.status_code} - {blob_response.text}")
+            return blob_response
+        blobs[path] = blob_response.json()["sha"]
+
+    response = None
+    for _ in range(max(1, COMMIT_ATTEMPTS)):
+        response = _send("GET", ref_url, headers=headers, timeout=15)
+        if response.status_code != 200:
+            print(f"Erro ao ler ref {branch}: {response.status_code}")
+            return response
+        head_sha = response.json()["object"]["sha"]
+
+        response = get(f"{repo_url}/git/commits/{head_sha}", headers=headers, timeout=15)
+        if response.status_code != 200:
+            print(f"Erro ao ler commit {head_sha}: {response.status_code}")
+            return response
+        base_tree = response.json()["tree"]["sha"]
+
+        current = _tree_shas(repo_url, headers, base_tree, set(removals) | set(expected_shas))
+        changed = [path for path, sha in expected_shas.items() if current.get(path, ABSENT) != sha]
+        if changed:
+            print(f"Commit abortado: {', '.join(changed)} mudou no GitHub antes da gravacao ({message})")
+            return _conflict_response(ref_url, f"{', '.join(changed)} changed since it was read")
+
+        tree = [
+            {"path": path, "mode": "100644", "type": "blob", "sha": sha}
+            for path, sha in blobs.items()
+            if current.get(path) != sha
+        ]
+        tree += [
+            {"path": path, "mode": "100644", "type": "blob", "sha": None}
+            for path in removals
+            if path in current
+        ]
+        if not tree:
+            return response
+
+        response = post(f"{repo_url}/git/trees", headers=headers, json={"base_tree": base_tree, "tree": tree})
+        if response.status_code not in (200, 201):
+            print(f"Erro ao criar tree: {response.status_code} - {response.text}")
+            return response
+
+        response = post(
+            f"{repo_url}/git/commits",
+            headers=headers,
+            json={"message": message, "tree": response.json()["sha"], "parents": [head_sha]},
+        )
+        if response.status_code not in (200, 201):
+            print(f"Erro ao criar commit: {response.status_code} - {response.text}")
+            return response
+
+        response = patch(ref_url, headers=headers, json={"sha": response.json()["sha"], "force": False})
+        if response.status_code == 200:
+            for path, data in encoded.items():
+                contents_url = f"{repo_url}/contents/{path}"
+                if data is None:
+                    forget_file(contents_url)
+                elif len(data) > LARGE_FILE_THRESHOLD:
+                    remember_file(contents_url, blobs[path])
+                else:
+                    remember_file(contents_url, blobs[path], base64.b64encode(data).decode("utf-8"))
+            return response
+        if response.status_code != 422:
+            print(f"Erro ao atualizar ref {branch}: {response.status_code} - {response.text}")
+            return response
+        # 422: o branch avancou (nao e fast-forward); tenta de novo sobre o novo HEAD
+
+    print(f"Commit nao aplicado apos {COMMIT_ATTEMPTS} tentativas: {message}")
+    return response
+
+
+configure_base_urls()
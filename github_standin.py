@@ -0,0 +1,475 @@
+"""Servidor local que imita a parte da API do GitHub usada pelo backend.
+
+Serve a Contents API (GET/PUT/DELETE com a mesma semantica de sha), metadados do
+repositorio, downloads raw e a Git Data API (refs, commits, trees e blobs) a partir
+de um repositorio em memoria, opcionalmente semeado com os arquivos de um
+diretorio. Permite simular latencia, erros e limite de requisicoes para testar o
+backend sem tocar no GitHub.
+
+Uso:
+    python github_standin.py --port 8787 --seed-dir ./dados --latency 0.05 --error-rate 0.02
+    GITHUB_API_URL=http://127.0.0.1:8787 GITHUB_TOKEN=local uvicorn backend:app
+
+Com GITHUB_API_URL apontando para o servidor, os downloads raw usam `<url>/raw`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import hashlib
+import json
+import random
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+INLINE_LIMIT = 1024 * 1024
+
+
+def _blob_sha(data: bytes) -> str:
+    return hashlib.sha1(f"blob {len(data)}\0".encode("utf-8") + data).hexdigest()
+
+
+def _object_sha(kind: str, payload: Any) -> str:
+    raw = json.dumps(payload, sort_keys=True).encode("utf-8")
+    return hashlib.sha1(f"{kind} {len(raw)}\0".encode("utf-8") + raw).hexdigest()
+
+
+class StandinError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class Repository:
+    """Repositorio git minimo em memoria: blobs, trees aninhadas, commits e branches."""
+
+    def __init__(self, owner: str, name: str, default_branch: str = "main"):
+        self.owner = owner
+        self.name = name
+        self.default_branch = default_branch
+        self.blobs: Dict[str, bytes] = {}
+        self.trees: Dict[str, Dict[str, Tuple[str, str]]] = {}
+        self.commits: Dict[str, dict] = {}
+        self.refs: Dict[str, str] = {}
+        self.lock = threading.RLock()
+        empty_tree = self._store_tree({})
+        self.refs[default_branch] = self._store_commit("Initial commit", empty_tree, [])
+
+    # -- objetos -------------------------------------------------------------
+    def _store_blob(self, data: bytes) -> str:
+        sha = _blob_sha(data)
+        self.blobs[sha] = data
+        return sha
+
+    def _store_tree(self, entries: Dict[str, Tuple[str, str]]) -> str:
+        sha = _object_sha("tree", sorted(entries.items()))
+        self.trees[sha] = dict(entries)
+        return sha
+
+    def _store_commit(self, message: str, tree: str, parents: List[str]) -> str:
+        payload = {"message": message, "tree": tree, "parents": parents, "date": time.time()}
+        sha = _object_sha("commit", payload)
+        self.commits[sha] = {"sha": sha, **payload}
+        return sha
+
+    def _flatten(self, tree_sha: str, prefix: str = "") -> Dict[str, str]:
+        files = {}
+        for name, (kind, sha) in self.trees[tree_sha].items():
+            path = f"{prefix}{name}"
+            if kind == "tree":
+                files.update(self._flatten(sha, f"{path}/"))
+            else:
+                files[path] = sha
+        return files
+
+    def _build(self, files: Dict[str, str]) -> str:
+        children: Dict[str, Dict[str, str]] = {}
+        entries: Dict[str, Tuple[str, str]] = {}
+        for path, sha in files.items():
+            head, sep, rest = path.partition("/")
+            if sep:
+                children.setdefault(head, {})[rest] = sha
+            else:
+                entries[head] = ("blob", sha)
+        for name, nested in children.items():
+            entries[name] = ("tree", self._build(nested))
+        return self._store_tree(entries)
+
+    # -- consultas -----------------------------------------------------------
+    def head(self, branch: Optional[str]) -> str:
+        branch = branch or self.default_branch
+        if branch not in self.refs:
+            if branch in self.commits:
+                return branch
+            raise StandinError(404, "No commit found for the ref")
+        return self.refs[branch]
+
+    def files(self, ref: Optional[str]) -> Dict[str, str]:
+        return self._flatten(self.commits[self.head(ref)]["tree"])
+
+    def tree_listing(self, tree_sha: str, prefix: str = "") -> List[dict]:
+        if tree_sha not in self.trees:
+            raise StandinError(404, "Not Found")
+        listing = []
+        for name, (kind, sha) in sorted(self.trees[tree_sha].items()):
+            item = {"path": f"{prefix}{name}", "mode": "040000" if kind == "tree" else "100644", "type": kind, "sha": sha}
+            if kind == "blob":
+                item["size"] = len(self.blobs[sha])
+            listing.append(item)
+        return listing
+
+    # -- escrita -------------------------------------------------------------
+    def commit_files(self, branch: Optional[str], changes: Dict[str, Optional[bytes]], message: str) -> Tuple[str, Dict[str, str]]:
+        branch = branch or self.default_branch
+        parent = self.head(branch)
+        files = self._flatten(self.commits[parent]["tree"])
+        for path, data in changes.items():
+            if data is None:
+                files.pop(path, None)
+            else:
+                files[path] = self._store_blob(data)
+        commit = self._store_commit(message, self._build(files), [parent])
+        self.refs[branch] = commit
+        return commit, files
+
+    def create_tree(self, base_tree: Optional[str], entries: List[dict]) -> str:
+        files = self._flatten(base_tree) if base_tree else {}
+        for entry in entries:
+            path = entry.get("path")
+            if not path:
+                raise StandinError(422, "tree.path is required")
+            if "content" in entry:
+                files[path] = self._store_blob(str(entry["content"]).encode("utf-8"))
+            elif entry.get("sha") is None:
+                if path not in files:
+                    raise StandinError(422, f"GitRPC::BadObjectState: path {path} does not exist")
+                files.pop(path)
+            else:
+                if entry["sha"] not in self.blobs:
+                    raise StandinError(422, f"tree.sha {entry['sha']} is not a valid blob")
+                files[path] = entry["sha"]
+        return self._build(files)
+
+
+class Standin:
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 error_status: int = 502, rate_limit: int = 5000, auto_create: bool = True):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.rate_limit = rate_limit
+        self.auto_create = auto_create
+        self.repos: Dict[Tuple[str, str], Repository] = {}
+        self.lock = threading.Lock()
+        self.window_start = time.time()
+        self.used = 0
+        self.stats = {"requests": 0, "injected_errors": 0, "rate_limited": 0}
+
+    def repo(self, owner: str, name: str, create: bool = False) -> Repository:
+        key = (owner.lower(), name.lower())
+        with self.lock:
+            if key not in self.repos:
+                if not (create or self.auto_create):
+                    raise StandinError(404, "Not Found")
+                self.repos[key] = Repository(owner, name)
+            return self.repos[key]
+
+    def seed(self, owner: str, name: str, directory: Path) -> int:
+        repo = self.repo(owner, name, create=True)
+        changes = {}
+        for path in sorted(directory.rglob("*")):
+            if path.is_file() and not any(part.startswith(".") for part in path.relative_to(directory).parts):
+                changes[path.relative_to(directory).as_posix()] = path.read_bytes()
+        if changes:
+            repo.commit_files(None, changes, f"Seed a partir de {directory}")
+        return len(changes)
+
+    def consume(self) -> Tuple[int, int]:
+        """Conta uma requisicao na janela de uma hora; retorna (restante, reset)."""
+        with self.lock:
+            now = time.time()
+            if now - self.window_start >= 3600:
+                self.window_start = now
+                self.used = 0
+            self.used += 1
+            return self.rate_limit - self.used, int(self.window_start + 3600)
+
+
+class Handler(BaseHTTPRequestHandler):
+    server_version = "GitHubStandin/1.0"
+    standin: Standin
+    _rate_headers: Optional[Dict[str, str]] = None
+
+    def log_message(self, format: str, *args: Any) -> None:
+        return
+
+    # -- utilitarios -----------------------------------------------------------
+    def _send(self, status: int, payload: Any = None, raw: Optional[bytes] = None,
+              content_type: str = "application/json; charset=utf-8", extra: Optional[Dict[str, str]] = None) -> None:
+        body = raw if raw is not None else (b"" if payload is None else json.dumps(payload).encode("utf-8"))
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (self._rate_headers or {}).items():
+            self.send_header(key, value)
+        for key, value in (extra or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _body(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        try:
+            return json.loads(self.rfile.read(length).decode("utf-8"))
+        except ValueError:
+            raise StandinError(400, "Problems parsing JSON")
+
+    def _wants_raw(self) -> bool:
+        return "vnd.github.raw" in (self.headers.get("Accept") or "")
+
+    def _contents_payload(self, repo: Repository, path: str, sha: str) -> dict:
+        data = repo.blobs[sha]
+        inline = len(data) <= INLINE_LIMIT
+        base = f"http://{self.headers.get('Host')}"
+        return {
+            "type": "file",
+            "name": path.rsplit("/", 1)[-1],
+            "path": path,
+            "sha": sha,
+            "size": len(data),
+            "encoding": "base64" if inline else "none",
+            "content": base64.encodebytes(data).decode("ascii") if inline else "",
+            "url": f"{base}/repos/{repo.owner}/{repo.name}/contents/{path}",
+            "download_url": f"{base}/raw/{repo.owner}/{repo.name}/{repo.default_branch}/{path}",
+        }
+
+    # -- despacho ----------------------------------------------------------------
+    def _dispatch(self) -> None:
+        standin = self.standin
+        standin.stats["requests"] += 1
+        self._rate_headers = None
+        if standin.latency or standin.jitter:
+            time.sleep(standin.latency + random.uniform(0, standin.jitter))
+        parsed = urllib.parse.urlsplit(self.path)
+        parts = [urllib.parse.unquote(p) for p in parsed.path.strip("/").split("/") if p]
+        query = dict(urllib.parse.parse_qsl(parsed.query))
+
+        if parts[:1] == ["_standin"]:
+            return self._send(200, {"stats": standin.stats, "repos": [f"{o}/{r}" for o, r in standin.repos]})
+
+        if parts[:1] != ["raw"]:
+            remaining, reset = standin.consume()
+            self._rate_headers = {
+                "X-RateLimit-Limit": str(standin.rate_limit),
+                "X-RateLimit-Remaining": str(max(remaining, 0)),
+                "X-RateLimit-Reset": str(reset),
+            }
+            if remaining < 0:
+                standin.stats["rate_limited"] += 1
+                return self._send(403, {"message": "API rate limit exceeded"},
+                                  extra={"Retry-After": str(max(reset - int(time.time()), 1))})
+        if standin.error_rate and random.random() < standin.error_rate:
+            standin.stats["injected_errors"] += 1
+            return self._send(standin.error_status, {"message": "Erro injetado pelo github_standin"})
+
+        if parts[:1] == ["raw"] and len(parts) >= 5:
+            return self._raw(parts[1], parts[2], parts[3:])
+        if parts == ["user"]:
+            return self._send(200, {"login": "standin", "type": "User"})
+        if self.command == "POST" and (parts == ["user", "repos"] or (len(parts) == 3 and parts[0] == "orgs" and parts[2] == "repos")):
+            body = self._body()
+            owner = parts[1] if parts[0] == "orgs" else "standin"
+            repo = standin.repo(owner, body.get("name") or "repo", create=True)
+            return self._send(201, self._repo_meta(repo))
+        if len(parts) >= 3 and parts[0] == "repos":
+            repo = standin.repo(parts[1], parts[2])
+            rest = parts[3:]
+            if not rest and self.command == "GET":
+                return self._send(200, self._repo_meta(repo))
+            if rest[:1] == ["contents"]:
+                return self._contents(repo, "/".join(rest[1:]), query)
+            if rest[:1] == ["git"]:
+                return self._git(repo, rest[1:])
+        raise StandinError(404, "Not Found")
+
+    def _repo_meta(self, repo: Repository) -> dict:
+        return {
+            "name": repo.name,
+            "full_name": f"{repo.owner}/{repo.name}",
+            "owner": {"login": repo.owner},
+            "private": True,
+            "default_branch": repo.default_branch,
+            "permissions": {"admin": True, "push": True, "pull": True},
+        }
+
+    def _raw(self, owner: str, name: str, rest: List[str]) -> None:
+        repo = self.standin.repo(owner, name)
+        if rest[:2] == ["refs", "heads"]:
+            rest = rest[2:]
+        branch, path = rest[0], "/".join(rest[1:])
+        with repo.lock:
+            sha = repo.files(branch).get(path)
+            if not sha:
+                raise StandinError(404, "404: Not Found")
+            data = repo.blobs[sha]
+        self._send(200, raw=data, content_type="text/plain; charset=utf-8", extra={"ETag": f'"{sha}"'})
+
+    def _contents(self, repo: Repository, path: str, query: Dict[str, str]) -> None:
+        with repo.lock:
+            if self.command == "GET":
+                files = repo.files(query.get("ref"))
+                sha = files.get(path)
+                if sha:
+                    etag = f'"{sha}"'
+                    if self.headers.get("If-None-Match") == etag:
+                        return self._send(304, extra={"ETag": etag})
+                    if self._wants_raw():
+                        return self._send(200, raw=repo.blobs[sha], content_type="application/vnd.github.raw", extra={"ETag": etag})
+                    return self._send(200, self._contents_payload(repo, path, sha), extra={"ETag": etag})
+                prefix = f"{path}/" if path else ""
+                names = sorted({p[len(prefix):].split("/", 1)[0] for p in files if p.startswith(prefix)})
+                if not names:
+                    raise StandinError(404, "Not Found")
+                listing = []
+                for item in names:
+                    full = f"{prefix}{item}"
+                    if full in files:
+                        listing.append({**self._contents_payload(repo, full, files[full]), "content": None, "encoding": None})
+                    else:
+                        listing.append({"type": "dir", "name": item, "path": full})
+                return self._send(200, listing)
+
+            body = self._body()
+            branch = body.get("branch") or repo.default_branch
+            current = repo.files(branch).get(path)
+            if self.command == "PUT":
+                if current and not body.get("sha"):
+                    raise StandinError(422, "Invalid request.\n\n\"sha\" wasn't supplied.")
+                if current and body.get("sha") != current:
+                    raise StandinError(409, f"{path} does not match {body.get('sha')}")
+                try:
+                    data = base64.b64decode(body.get("content") or "")
+                except ValueError:
+                    raise StandinError(422, "content is not valid Base64")
+                commit, files = repo.commit_files(branch, {path: data}, body.get("message") or f"Update {path}")
+                payload = {"content": self._contents_payload(repo, path, files[path]), "commit": {"sha": commit}}
+                payload["content"].pop("content")
+                return self._send(200 if current else 201, payload)
+            if self.command == "DELETE":
+                if not current:
+                    raise StandinError(404, "Not Found")
+                if body.get("sha") != current:
+                    raise StandinError(409, f"{path} does not match {body.get('sha')}")
+                commit, _ = repo.commit_files(branch, {path: None}, body.get("message") or f"Delete {path}")
+                return self._send(200, {"content": None, "commit": {"sha": commit}})
+        raise StandinError(405, "Method Not Allowed")
+
+    def _git(self, repo: Repository, rest: List[str]) -> None:
+        with repo.lock:
+            if rest[:2] in (["ref", "heads"], ["refs", "heads"]) and len(rest) >= 3:
+                branch = "/".join(rest[2:])
+                if self.command == "GET":
+                    return self._send(200, {"ref": f"refs/heads/{branch}", "object": {"sha": repo.head(branch), "type": "commit"}})
+                if self.command == "PATCH":
+                    body = self._body()
+                    target = body.get("sha")
+                    if target not in repo.commits:
+                        raise StandinError(422, "Object does not exist")
+                    if not body.get("force") and repo.head(branch) not in repo.commits[target]["parents"] and repo.head(branch) != target:
+                        raise StandinError(422, "Update is not a fast forward")
+                    repo.refs[branch] = target
+                    return self._send(200, {"ref": f"refs/heads/{branch}", "object": {"sha": target, "type": "commit"}})
+            if rest[:1] == ["commits"]:
+                if self.command == "GET" and len(rest) == 2:
+                    commit = repo.commits.get(rest[1])
+                    if not commit:
+                        raise StandinError(404, "Not Found")
+                    return self._send(200, {"sha": commit["sha"], "message": commit["message"],
+                                            "tree": {"sha": commit["tree"]}, "parents": [{"sha": p} for p in commit["parents"]]})
+                if self.command == "POST":
+                    body = self._body()
+                    if body.get("tree") not in repo.trees:
+                        raise StandinError(422, "Tree SHA does not exist")
+                    sha = repo._store_commit(body.get("message") or "", body["tree"], list(body.get("parents") or []))
+                    return self._send(201, {"sha": sha, "tree": {"sha": body["tree"]}})
+            if rest[:1] == ["trees"]:
+                if self.command == "GET" and len(rest) == 2:
+                    return self._send(200, {"sha": rest[1], "tree": repo.tree_listing(rest[1]), "truncated": False})
+                if self.command == "POST":
+                    body = self._body()
+                    sha = repo.create_tree(body.get("base_tree"), body.get("tree") or [])
+                    return self._send(201, {"sha": sha, "tree": repo.tree_listing(sha)})
+            if rest[:1] == ["blobs"]:
+                if self.command == "GET" and len(rest) == 2:
+                    data = repo.blobs.get(rest[1])
+                    if data is None:
+                        raise StandinError(404, "Not Found")
+                    if self._wants_raw():
+                        return self._send(200, raw=data, content_type="application/vnd.github.raw")
+                    return self._send(200, {"sha": rest[1], "size": len(data), "encoding": "base64",
+                                            "content": base64.encodebytes(data).decode("ascii")})
+                if self.command == "POST":
+                    body = self._body()
+                    content = body.get("content") or ""
+                    data = base64.b64decode(content) if body.get("encoding") == "base64" else content.encode("utf-8")
+                    return self._send(201, {"sha": repo._store_blob(data)})
+        raise StandinError(404, "Not Found")
+
+    def _handle(self) -> None:
+        try:
+            self._dispatch()
+        except StandinError as exc:
+            self._send(exc.status, {"message": exc.message})
+        except Exception as exc:  # pragma: no cover - ajuda a depurar o proprio servidor
+            self._send(500, {"message": f"Erro interno do github_standin: {exc}"})
+
+    do_GET = do_PUT = do_POST = do_PATCH = do_DELETE = do_HEAD = _handle
+
+
+def serve(host: str = "127.0.0.1", port: int = 8787, standin: Optional[Standin] = None) -> ThreadingHTTPServer:
+    """Cria o servidor (sem iniciar o loop); use `serve_forever()` ou uma thread."""
+    handler = type("BoundHandler", (Handler,), {"standin": standin or Standin()})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Servidor local que imita a API do GitHub")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--owner", default="PopularAtacarejo")
+    parser.add_argument("--repo", default="Candidatos")
+    parser.add_argument("--seed-dir", help="diretorio cujos arquivos viram o conteudo inicial do repositorio")
+    parser.add_argument("--latency", type=float, default=0.0, help="latencia fixa por requisicao (s)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="latencia aleatoria adicional (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fracao de requisicoes que falham")
+    parser.add_argument("--error-status", type=int, default=502)
+    parser.add_argument("--rate-limit", type=int, default=5000, help="requisicoes por hora antes do 403")
+    args = parser.parse_args()
+
+    standin = Standin(args.latency, args.jitter, args.error_rate, args.error_status, args.rate_limit)
+    standin.repo(args.owner, args.repo, create=True)
+    if args.seed_dir:
+        count = standin.seed(args.owner, args.repo, Path(args.seed_dir))
+        print(f"{count} arquivo(s) carregado(s) de {args.seed_dir}")
+    server = serve(args.host, args.port, standin)
+    print(f"github_standin em http://{args.host}:{args.port} (GITHUB_API_URL=http://{args.host}:{args.port})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,10 @@ from datetime import datetime
 from pathlib import Path
 from sync_service import enqueue_pending
 from app_paths import DATA_DIR
-from typing import List, Optional
+import github_client
+import write_behind
+import local_store
+from typing import List, Optional
 
 import requests
 from fastapi import APIRouter, Body, HTTPException
@@ -66,9 +69,9 @@ def _serialize_setores(values: List[str]) -> List[str]:
 
 
 def _get_lideres_file() -> tuple[Optional[str], Optional[str]]:
-    url = f"https://api.github.com/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{GITHUB_PATH}"
+    url = f"{github_client.API_URL}/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{GITHUB_PATH}"
     try:
-        response = requests.get(url, headers=GITHUB_HEADERS, timeout=15, params={"ref": GITHUB_BRANCH})
+        response = github_client.get(url, headers=GITHUB_HEADERS, timeout=15, params={"ref": GITHUB_BRANCH})
     except requests.RequestException as exc:
         raise HTTPException(status_code=500, detail=f"Erro ao acessar GitHub: {exc}")
 
@@ -86,31 +89,40 @@ def _get_lideres_file() -> tuple[Optional[str], Optional[str]]:
 
 
 def _persist_lideres(lideres: List[dict], sha: Optional[str], message: str) -> None:
-    payload = json.dumps(lideres, indent=2, ensure_ascii=False)
-    url = f"https://api.github.com/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{GITHUB_PATH}"
-    body = {
-        "message": message,
-        "branch": GITHUB_BRANCH,
-        "content": base64.b64encode(payload.encode("utf-8")).decode("utf-8")
-    }
-    if sha:
-        body["sha"] = sha
-    response = requests.put(url, headers=GITHUB_HEADERS, json=body, timeout=30)
+    if local_store.handles("lideres"):
+        try:
+            local_store.save("lideres", lideres, message, expected_version=sha)
+        except local_store.ConflictError as exc:
+            raise HTTPException(status_code=409, detail=str(exc)) from exc
+        return
+    if write_behind.handles(GITHUB_PATH):
+        write_behind.submit(GITHUB_PATH, lideres, message)
+        return
+    url = f"{github_client.API_URL}/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{GITHUB_PATH}"
+    response = github_client.put_records(url, GITHUB_HEADERS, lideres, message, GITHUB_BRANCH, sha=sha, timeout=30)
     if response.status_code not in (200, 201):
         enqueue_pending(GITHUB_PATH, lideres, message)
         raise HTTPException(status_code=500, detail="NÃ£o foi possÃ­vel salvar os lÃ­deres no GitHub")
 
 
 def _load_lideres() -> tuple[List[dict], Optional[str]]:
+    if local_store.handles("lideres"):
+        # no banco local o "sha" e a versao lida, usada no merge ao gravar
+        stored, version = local_store.load_versioned("lideres")
+        if stored is not None:
+            return stored, version
+    pending = write_behind.pending_payload(GITHUB_PATH)
+    if isinstance(pending, list):
+        return pending, None
     content, sha = _get_lideres_file()
     if content is None:
         return [], sha
     if not content:
-        return [], sha
+        return [], None if local_store.handles("lideres") else sha
     try:
         parsed = json.loads(content)
         if isinstance(parsed, list):
-            return parsed, sha
+            return local_store.seeded("lideres", parsed, sha)
         raise HTTPException(status_code=500, detail="Arquivo de lÃ­deres corrompido")
     except json.JSONDecodeError as exc:
         raise HTTPException(status_code=500, detail=f"Formato invÃ¡lido do arquivo de lÃ­deres: {exc}")
@@ -128,9 +140,9 @@ def _load_funcionarios() -> List[dict]:
                 return data
         except json.JSONDecodeError:
             pass
-    url = f"https://raw.githubusercontent.com/{GITHUB_OWNER}/{GITHUB_REPO}/{GITHUB_BRANCH}/funcionarios-ativos.json"
+    url = f"{github_client.RAW_URL}/{GITHUB_OWNER}/{GITHUB_REPO}/{GITHUB_BRANCH}/funcionarios-ativos.json"
     try:
-        response = requests.get(url, timeout=10)
+        response = github_client.get(url, timeout=10)
         if response.status_code == 200:
             return response.json()
     except requests.RequestException:
@@ -159,7 +171,7 @@ def _attach_employees(lider: dict) -> dict:
 
 
 @router.get("/")
-async def list_lideres():
+def list_lideres():
     lideres, _ = _load_lideres()
     sorted_list = sorted(lideres, key=lambda l: l.get("nome", ""))
     return {
@@ -170,7 +182,7 @@ async def list_lideres():
 
 
 @router.get("/{lider_id}")
-async def get_lider_detail(lider_id: str):
+def get_lider_detail(lider_id: str):
     lideres, _ = _load_lideres()
     lider = next((item for item in lideres if item.get("id") == lider_id), None)
     if not lider:
@@ -180,7 +192,7 @@ async def get_lider_detail(lider_id: str):
 
 
 @router.post("/")
-async def create_lider(payload: LiderBase = Body(...)):
+def create_lider(payload: LiderBase = Body(...)):
     lideres, sha = _load_lideres()
     lider = payload.dict()
     lider["setores_responsaveis"] = _serialize_setores(lider["setores_responsaveis"])
@@ -194,7 +206,7 @@ async def create_lider(payload: LiderBase = Body(...)):
 
 
 @router.put("/{lider_id}")
-async def update_lider(lider_id: str, payload: LiderUpdate = Body(...)):
+def update_lider(lider_id: str, payload: LiderUpdate = Body(...)):
     lideres, sha = _load_lideres()
     lider = next((item for item in lideres if item.get("id") == lider_id), None)
     if not lider:
@@ -210,7 +222,7 @@ async def update_lider(lider_id: str, payload: LiderUpdate = Body(...)):
 
 
 @router.delete("/{lider_id}")
-async def delete_lider(lider_id: str):
+def delete_lider(lider_id: str):
     lideres, sha = _load_lideres()
     filtered = [item for item in lideres if item.get("id") != lider_id]
     if len(filtered) == len(lideres):
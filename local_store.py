@@ -0,0 +1,580 @@
+"""Armazenamento local opcional em SQLite, com o GitHub como replica assincrona.
+
+Com LOCAL_STORE=1, as leituras e gravacoes dos conjuntos em DATASETS (um por tabela
+em DATA_DIR/data/local_store.db) sao atendidas localmente. Na primeira leitura a
+tabela e preenchida com o conteudo do GitHub (`seed`); depois disso, cada gravacao
+marca o conjunto como alterado e uma thread em segundo plano exporta o snapshot JSON
+para o repositorio com `github_client.put_records` (merge de tres vias em conflito).
+O estado de replicacao fica no proprio banco, entao alteracoes ainda nao exportadas
+sobrevivem a um reinicio.
+
+Quem grava a lista inteira (le, altera, grava) usa `load_versioned` e passa a versao lida
+para `save`: se outra gravacao aconteceu no meio, as duas sao combinadas por merge de tres
+vias em vez de a ultima sobrescrever a anterior.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from app_paths import APP_DIR, DATA_DIR
+import github_client
+import record_merge
+
+load_dotenv(APP_DIR / ".env")
+load_dotenv()
+
+GITHUB_OWNER = os.getenv("GITHUB_OWNER", "PopularAtacarejo")
+GITHUB_REPO = os.getenv("GITHUB_REPO", "Candidatos")
+GITHUB_BRANCH = os.getenv("GITHUB_BRANCH", "main")
+GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
+
+ENABLED = os.getenv("LOCAL_STORE", "").strip().lower() in ("1", "true", "yes", "sim")
+DB_PATH = DATA_DIR / "data" / "local_store.db"
+REPLICA_DEBOUNCE_SECONDS = float(os.getenv("LOCAL_STORE_REPLICA_DEBOUNCE", "2"))
+REPLICA_RETRY_SECONDS = float(os.getenv("LOCAL_STORE_REPLICA_RETRY", "15"))
+MAX_RETRY_SECONDS = 600
+# versoes lidas por `load_versioned` guardadas em memoria, por conjunto, para o merge em `save`
+BASE_VERSIONS = int(os.getenv("LOCAL_STORE_BASE_VERSIONS", "4"))
+
+# conjunto -> caminho no repositorio (None: somente local) e conversores do arquivo
+DATASETS: Dict[str, Dict[str, Any]] = {
+    "candidatos": {"path": "candidatos.json"},
+    "funcionarios": {"path": os.getenv("GITHUB_FUNCIONARIOS_PATH", "funcionarios-ativos.json")},
+    "desligados": {"path": os.getenv("GITHUB_DESLIGADOS_PATH", "desligados/Ex-funcionarios.json")},
+    "lideres": {"path": os.getenv("GITHUB_LIDERES_PATH", "lideres.json")},
+    "setores": {"path": "setores.json"},
+    "funcoes": {"path": "funcoes.json"},
+    "empresas": {"path": "empresas.json"},
+    "vagas": {"path": "vagas.json"},
+    "reprovados": {"path": "reprovados.json"},
+    "atestados": {"path": None},
+}
+ACTIVE = {
+    item.strip()
+    for item in os.getenv("LOCAL_STORE_DATASETS", ",".join(DATASETS)).split(",")
+    if item.strip() in DATASETS
+}
+
+_LOCK = threading.RLock()
+_WAKE = threading.Event()
+_CONN: Optional[sqlite3.Connection] = None
+_WORKER: Optional[threading.Thread] = None
+_BASES: Dict[str, Dict[int, List[str]]] = {}
+
+STATS: Dict[str, Any] = {
+    "reads": 0,
+    "writes": 0,
+    "replications": 0,
+    "failures": 0,
+    "last_replication_at": None,
+    "last_error": None,
+}
+
+
+class ConflictError(RuntimeError):
+    """A versao lida ja nao esta disponivel para o merge com a versao atual do conjunto."""
+
+
+def handles(dataset: str) -> bool:
+    """Indica se `dataset` e servido pelo banco local."""
+    return ENABLED and dataset in ACTIVE
+
+
+def dataset_for(path: str) -> Optional[str]:
+    """Conjunto que replica o arquivo `path` do repositorio, se houver."""
+    for name, spec in DATASETS.items():
+        if spec.get("path") == path:
+            return name
+    return None
+
+
+def configure(
+    dataset: str,
+    path: Optional[str] = None,
+    encode: Optional[Callable[[List[Any]], Any]] = None,
+    decode: Optional[Callable[[bytes], List[Any]]] = None,
+    export: Optional[Callable[[List[Any], str], bool]] = None,
+) -> None:
+    """Ajusta o caminho no repositorio, os conversores (ex.: payload criptografado) ou a
+    funcao que exporta o conjunto (ex.: candidaturas divididas por mes) de um conjunto."""
+    spec = DATASETS[dataset]
+    if path:
+        spec["path"] = path
+    if encode:
+        spec["encode"] = encode
+    if decode:
+        spec["decode"] = decode
+    if export:
+        spec["export"] = export
+
+
+def _headers() -> dict:
+    headers = {"Accept": "application/vnd.github.v3+json"}
+    if GITHUB_TOKEN:
+        headers["Authorization"] = f"token {GITHUB_TOKEN}"
+    return headers
+
+
+def _connection() -> sqlite3.Connection:
+    global _CONN
+    if _CONN is None:
+        DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(DB_PATH), check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS replicas ("
+            "dataset TEXT PRIMARY KEY, version INTEGER NOT NULL DEFAULT 0, "
+            "replicated_version INTEGER NOT NULL DEFAULT 0, sha TEXT, messages TEXT, "
+            "updated_at TEXT, replicated_at TEXT)"
+        )
+        for name in DATASETS:
+            conn.execute(
+                f'CREATE TABLE IF NOT EXISTS "{name}" ('
+                "seq INTEGER PRIMARY KEY AUTOINCREMENT, record_id TEXT, data TEXT NOT NULL)"
+            )
+            conn.execute(f'CREATE INDEX IF NOT EXISTS "{name}_record_id" ON "{name}" (record_id)')
+        _CONN = conn
+    return _CONN
+
+
+def _replica_row(conn: sqlite3.Connection, dataset: str) -> Optional[tuple]:
+    return conn.execute(
+        "SELECT version, replicated_version, sha, messages FROM replicas WHERE dataset = ?",
+        (dataset,),
+    ).fetchone()
+
+
+def _rows(records: Iterable[Any]) -> List[tuple]:
+    return [
+        (record_merge.record_id(record), json.dumps(record, ensure_ascii=False))
+        for record in records
+    ]
+
+
+def _read_locked(conn: sqlite3.Connection, dataset: str) -> List[Any]:
+    return [json.loads(data) for (data,) in conn.execute(f'SELECT data FROM "{dataset}" ORDER BY seq')]
+
+
+def _replace_locked(conn: sqlite3.Connection, dataset: str, records: List[Any]) -> None:
+    conn.execute(f'DELETE FROM "{dataset}"')
+    conn.executemany(f'INSERT INTO "{dataset}" (record_id, data) VALUES (?, ?)', _rows(records))
+
+
+def _mark_dirty_locked(conn: sqlite3.Connection, dataset: str, message: str) -> None:
+    row = _replica_row(conn, dataset)
+    messages = json.loads(row[3]) if row and row[3] else []
+    messages.append(message)
+    conn.execute(
+        "INSERT INTO replicas (dataset, version, messages, updated_at) VALUES (?, 1, ?, ?) "
+        "ON CONFLICT(dataset) DO UPDATE SET version = version + 1, messages = excluded.messages, "
+        "updated_at = excluded.updated_at",
+        (dataset, json.dumps(messages[-20:], ensure_ascii=False), datetime.utcnow().isoformat() + "Z"),
+    )
+    STATS["writes"] += 1
+
+
+def load(dataset: str) -> Optional[List[Any]]:
+    """Registros de `dataset`, ou None se a tabela ainda nao foi preenchida a partir do GitHub."""
+    with _LOCK:
+        conn = _connection()
+        if _replica_row(conn, dataset) is None:
+            return None
+        STATS["reads"] += 1
+        return _read_locked(conn, dataset)
+
+
+def load_versioned(dataset: str) -> Tuple[Optional[List[Any]], Optional[int]]:
+    """Registros e versao local de `dataset`, para gravar com `save(..., expected_version=)`.
+
+    (None, None) se a tabela ainda nao foi preenchida a partir do GitHub.
+    """
+    with _LOCK:
+        conn = _connection()
+        row = _replica_row(conn, dataset)
+        if row is None:
+            return None, None
+        STATS["reads"] += 1
+        data = [item for (item,) in conn.execute(f'SELECT data FROM "{dataset}" ORDER BY seq')]
+        bases = _BASES.setdefault(dataset, {})
+        bases[row[0]] = data
+        while len(bases) > BASE_VERSIONS:
+            bases.pop(min(bases))
+    return [json.loads(item) for item in data], row[0]
+
+
+def iter_records(dataset: str, batch_size: int = 500) -> Optional[Iterator[Any]]:
+    """Percorre os registros de `dataset` em lotes, sem montar a lista inteira.
+
+    None se a tabela ainda nao foi preenchida a partir do GitHub.
+    """
+    with _LOCK:
+        if _replica_row(_connection(), dataset) is None:
+            return None
+    return _snapshot_records(dataset, batch_size)
+
+
+def _snapshot_records(dataset: str, batch_size: int) -> Iterator[Any]:
+    # conexao propria: a consulta le um snapshot (WAL) e nao segura o _LOCK entre os lotes
+    conn = sqlite3.connect(str(DB_PATH), check_same_thread=False)
+    try:
+        cursor = conn.execute(f'SELECT data FROM "{dataset}" ORDER BY seq')
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            for (data,) in rows:
+                yield json.loads(data)
+    finally:
+        conn.close()
+
+
+def seed(dataset: str, records: List[Any], sha: Optional[str] = None) -> None:
+    """Preenche a tabela com a versao lida do GitHub (no-op se o conjunto ja esta no banco)."""
+    if not handles(dataset) or not isinstance(records, list):
+        return
+    with _LOCK:
+        conn = _connection()
+        if _replica_row(conn, dataset) is not None:
+            return
+        conn.execute("BEGIN")
+        try:
+            _replace_locked(conn, dataset, records)
+            conn.execute(
+                "INSERT INTO replicas (dataset, sha, replicated_at) VALUES (?, ?, ?)",
+                (dataset, sha, datetime.utcnow().isoformat() + "Z"),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+
+def seeded(dataset: str, records: List[Any], sha: Optional[str] = None) -> Tuple[List[Any], Any]:
+    """`seed` seguido da leitura, para os loaders que devolvem (registros, sha).
+
+    Com o conjunto no banco local, devolve a versao local (nunca o sha do GitHub, que
+    `save(..., expected_version=)` nao aceita); fora dele, os proprios registros e o `sha`.
+    """
+    seed(dataset, records, sha)
+    if not handles(dataset):
+        return records, sha
+    stored, version = load_versioned(dataset)
+    return (stored, version) if stored is not None else (records, None)
+
+
+def save(dataset: str, records: List[Any], message: str, expected_version: Optional[int] = None) -> None:
+    """Substitui o conteudo de `dataset` e agenda a exportacao para o GitHub.
+
+    Com `expected_version` (de `load_versioned`), alteracoes gravadas por outra requisicao
+    desde a leitura sao preservadas: a lista e combinada com a atual por merge de tres vias.
+    """
+    save_many(
+        {dataset: records},
+        message,
+        expected_versions={dataset: expected_version} if expected_version is not None else None,
+    )
+
+
+def _rebase_locked(conn: sqlite3.Connection, dataset: str, records: List[Any], expected: int) -> List[Any]:
+    if not isinstance(expected, int) or isinstance(expected, bool):
+        raise TypeError(f"Versao local invalida para {dataset}: {expected!r} (use a de load_versioned)")
+    row = _replica_row(conn, dataset)
+    if row is None or row[0] == expected:
+        return records
+    base = _BASES.get(dataset, {}).get(expected)
+    if base is None:
+        raise ConflictError(
+            f"{dataset} foi alterado por outra operacao (versao {expected}, atual {row[0]}); tente novamente"
+        )
+    return record_merge.three_way_merge([json.loads(item) for item in base], _read_locked(conn, dataset), records)
+
+
+def save_many(
+    changes: Dict[str, List[Any]],
+    message: str,
+    expected_versions: Optional[Dict[str, Optional[int]]] = None,
+) -> None:
+    """Grava varios conjuntos numa unica transacao local (com merge, como em `save`, se houver versao lida)."""
+    expected_versions = expected_versions or {}
+    with _LOCK:
+        conn = _connection()
+        conn.execute("BEGIN")
+        try:
+            for dataset, records in changes.items():
+                if expected_versions.get(dataset) is not None:
+                    records = _rebase_locked(conn, dataset, records, expected_versions[dataset])
+                _replace_locked(conn, dataset, records)
+                _mark_dirty_locked(conn, dataset, message)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    _schedule()
+
+
+def upsert(dataset: str, record: dict, message: str) -> None:
+    """Insere ou atualiza (pelo campo `id`) um unico registro."""
+    record_key = record_merge.record_id(record)
+    data = json.dumps(record, ensure_ascii=False)
+    with _LOCK:
+        conn = _connection()
+        if _replica_row(conn, dataset) is None:
+            raise RuntimeError(f"Conjunto {dataset} ainda nao carregado no banco local")
+        conn.execute("BEGIN")
+        try:
+            updated = 0
+            if record_key is not None:
+                updated = conn.execute(
+                    f'UPDATE "{dataset}" SET data = ? WHERE record_id = ?', (data, record_key)
+                ).rowcount
+            if not updated:
+                conn.execute(f'INSERT INTO "{dataset}" (record_id, data) VALUES (?, ?)', (record_key, data))
+            _mark_dirty_locked(conn, dataset, message)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    _schedule()
+
+
+def delete(dataset: str, record_key: str, message: str) -> bool:
+    """Remove o registro com o `id` informado; retorna False se ele nao existe."""
+    with _LOCK:
+        conn = _connection()
+        conn.execute("BEGIN")
+        try:
+            removed = conn.execute(
+                f'DELETE FROM "{dataset}" WHERE record_id = ?', (str(record_key),)
+            ).rowcount
+            if removed:
+                _mark_dirty_locked(conn, dataset, message)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    if removed:
+        _schedule()
+    return bool(removed)
+
+
+def delete_many(dataset: str, record_keys: Iterable[str], message: str) -> int:
+    """Remove numa unica transacao os registros com os `id`s informados; retorna quantos existiam.
+
+    Diferente de `save`, nao substitui a tabela: registros gravados por outras threads
+    desde a leitura do chamador continuam no banco.
+    """
+    keys = [(str(key),) for key in record_keys]
+    with _LOCK:
+        conn = _connection()
+        conn.execute("BEGIN")
+        try:
+            before = conn.total_changes
+            conn.executemany(f'DELETE FROM "{dataset}" WHERE record_id = ?', keys)
+            removed = conn.total_changes - before
+            if removed:
+                _mark_dirty_locked(conn, dataset, message)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    if removed:
+        _schedule()
+    return removed
+
+
+def _commit_message(messages: List[str]) -> str:
+    if not messages:
+        return "Sincroniza dados locais"
+    if len(messages) == 1:
+        return messages[0]
+    return f"{messages[-1]} (+{len(messages) - 1} alteracoes agrupadas)"
+
+
+def _replicate(dataset: str) -> bool:
+    spec = DATASETS[dataset]
+    with _LOCK:
+        conn = _connection()
+        row = _replica_row(conn, dataset)
+        if row is None or row[0] == row[1]:
+            return True
+        version, sha = row[0], row[2]
+        messages = json.loads(row[3]) if row[3] else []
+        records = _read_locked(conn, dataset)
+
+    if spec.get("export"):
+        error = "falha na exportacao"
+        try:
+            ok = spec["export"](records, _commit_message(messages))
+        except Exception as exc:
+            ok = False
+            error = str(exc)
+        if not ok:
+            STATS["failures"] += 1
+            STATS["last_error"] = f"{dataset}: {error}"
+            return False
+        return _mark_replicated(dataset, version, messages, None, None)
+
+    url = f"{github_client.API_URL}/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{spec['path']}"
+    decode = spec.get("decode")
+    try:
+        response, written = github_client.put_records_merged(
+            url,
+            _headers(),
+            records,
+            _commit_message(messages),
+            GITHUB_BRANCH,
+            sha=sha,
+            encode=spec.get("encode"),
+            decode=decode,
+            timeout=30,
+        )
+    except Exception as exc:  # inclui erros de encode/decode, que nao podem derrubar a thread
+        STATS["failures"] += 1
+        STATS["last_error"] = f"{dataset}: {exc}"
+        return False
+    if response.status_code not in (200, 201):
+        STATS["failures"] += 1
+        STATS["last_error"] = f"{dataset}: {response.status_code} - {response.text[:200]}"
+        return False
+
+    # se o GitHub tinha alteracoes de outra origem, a lista gravada (com o merge) volta para o banco;
+    # vem do proprio put_records, pois arquivos grandes nao ficam com o conteudo no cache
+    return _mark_replicated(
+        dataset, version, messages, github_client.known_sha(url), written if written != records else None, records
+    )
+
+
+def _mark_replicated(
+    dataset: str,
+    version: int,
+    messages: List[str],
+    sha: Optional[str],
+    merged: Optional[List[Any]],
+    exported: Optional[List[Any]] = None,
+) -> bool:
+    """Registra a exportacao da `version`; `merged` e o que foi gravado no GitHub quando o
+    merge trouxe alteracoes de outra origem, e `exported` a lista que se tentou gravar."""
+    with _LOCK:
+        conn = _connection()
+        conn.execute("BEGIN")
+        try:
+            current = _replica_row(conn, dataset)
+            replaced = isinstance(merged, list)
+            new_version = current[0]
+            if replaced:
+                if current[0] != version:
+                    # houve gravacao local durante a exportacao: ela e combinada com o que veio do
+                    # GitHub (base: a lista exportada), senao o proximo envio apagaria essas alteracoes
+                    merged = record_merge.three_way_merge(exported, merged, _read_locked(conn, dataset))
+                # conteudo novo: a versao sobe, para quem leu antes fazer merge ao gravar
+                _replace_locked(conn, dataset, merged)
+                new_version = current[0] + 1
+            remaining = json.loads(current[3]) if current[3] else []
+            conn.execute(
+                "UPDATE replicas SET version = ?, replicated_version = ?, sha = ?, messages = ?, "
+                "replicated_at = ? WHERE dataset = ?",
+                (
+                    new_version,
+                    new_version if current[0] == version else version,
+                    sha,
+                    json.dumps(remaining[len(messages):], ensure_ascii=False),
+                    datetime.utcnow().isoformat() + "Z",
+                    dataset,
+                ),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        STATS["replications"] += 1
+        STATS["last_replication_at"] = datetime.utcnow().isoformat() + "Z"
+    return True
+
+
+def _dirty_datasets() -> List[str]:
+    with _LOCK:
+        conn = _connection()
+        rows = conn.execute("SELECT dataset FROM replicas WHERE version > replicated_version").fetchall()
+    return [name for (name,) in rows if name in DATASETS and DATASETS[name].get("path")]
+
+
+def _worker_loop() -> None:
+    attempts: Dict[str, int] = {}
+    retry_at: Dict[str, float] = {}
+    while True:
+        _WAKE.wait(timeout=REPLICA_RETRY_SECONDS)
+        _WAKE.clear()
+        time.sleep(REPLICA_DEBOUNCE_SECONDS)
+        if not GITHUB_TOKEN:
+            continue
+        now = time.time()
+        for dataset in _dirty_datasets():
+            if retry_at.get(dataset, 0.0) > now:
+                continue
+            if _replicate(dataset):
+                attempts.pop(dataset, None)
+                retry_at.pop(dataset, None)
+            else:
+                attempts[dataset] = attempts.get(dataset, 0) + 1
+                retry_at[dataset] = now + min(REPLICA_RETRY_SECONDS * (2 ** (attempts[dataset] - 1)), MAX_RETRY_SECONDS)
+                print(f"Replica local: falha ao exportar {dataset}: {STATS['last_error']}")
+
+
+def _schedule() -> None:
+    global _WORKER
+    with _LOCK:
+        if not (_WORKER and _WORKER.is_alive()):
+            _WORKER = threading.Thread(target=github_client.background(_worker_loop), name="local-store-replica", daemon=True)
+            _WORKER.start()
+    _WAKE.set()
+
+
+def start() -> None:
+    """Abre o banco e retoma a exportacao de alteracoes que ficaram pendentes."""
+    if not ENABLED:
+        return
+    pending = _dirty_datasets()
+    if pending:
+        print(f"Replica local: {len(pending)} conjunto(s) com alteracoes a exportar")
+        _schedule()
+
+
+def flush_all() -> bool:
+    """Exporta imediatamente tudo o que estiver pendente (usado no desligamento)."""
+    if not ENABLED or not GITHUB_TOKEN:
+        return True
+    return all([_replicate(dataset) for dataset in _dirty_datasets()])
+
+
+def stats() -> Dict[str, Any]:
+    if not ENABLED:
+        return {"enabled": False}
+    with _LOCK:
+        conn = _connection()
+        rows = conn.execute(
+            "SELECT dataset, version - replicated_version, replicated_at FROM replicas"
+        ).fetchall()
+        counts = {name: conn.execute(f'SELECT COUNT(*) FROM "{name}"').fetchone()[0] for (name, _, _) in rows}
+        snapshot = dict(STATS)
+    return {
+        "enabled": True,
+        "datasets": {
+            name: {
+                "records": counts[name],
+                "pending_versions": pending if DATASETS[name].get("path") else 0,
+                "replicated_at": replicated_at,
+            }
+            for name, pending, replicated_at in rows
+        },
+        **snapshot,
+    }
@@ -24,7 +24,7 @@ def hash_password(value: str) -> str:
 
 
 @router.get("/api/profile")
-async def get_profile(email: str):
+def get_profile(email: str):
     if not email:
         raise HTTPException(status_code=400, detail="Email obrigatorio.")
     user, _ = find_user(email)
@@ -34,7 +34,7 @@ async def get_profile(email: str):
 
 
 @router.put("/api/profile")
-async def update_profile(payload: dict):
+def update_profile(payload: dict):
     email = (payload.get("email") or "").strip().lower()
     nome = (payload.get("nome") or "").strip()
     novo_email = (payload.get("novo_email") or payload.get("email_novo") or "").strip().lower()
@@ -79,7 +79,7 @@ async def update_profile(payload: dict):
 
 
 @router.post("/api/profile/photo")
-async def upload_profile_photo(email: str = Form(...), photo: UploadFile = File(...)):
+def upload_profile_photo(email: str = Form(...), photo: UploadFile = File(...)):
     email_norm = (email or "").strip().lower()
     if not email_norm:
         raise HTTPException(status_code=400, detail="Email obrigatorio.")
@@ -89,7 +89,7 @@ async def upload_profile_photo(email: str = Form(...), photo: UploadFile = File(
     if photo.content_type and not photo.content_type.startswith("image/"):
         raise HTTPException(status_code=400, detail="Arquivo invalido. Envie uma imagem.")
 
-    content = await photo.read()
+    content = photo.file.read()
     if len(content) > MAX_PHOTO_SIZE:
         raise HTTPException(status_code=413, detail="Arquivo maior que 2MB.")
 
@@ -112,7 +112,7 @@ async def upload_profile_photo(email: str = Form(...), photo: UploadFile = File(
 
 
 @router.delete("/api/profile/photo")
-async def delete_profile_photo(email: str):
+def delete_profile_photo(email: str):
     email_norm = (email or "").strip().lower()
     if not email_norm:
         raise HTTPException(status_code=400, detail="Email obrigatorio.")
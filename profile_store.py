@@ -6,9 +6,10 @@ from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
-import requests
 from dotenv import load_dotenv
 
+import github_client
+
 load_dotenv()
 
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
@@ -24,9 +25,9 @@ if GITHUB_TOKEN:
 
 
 def _get_repo_default_branch() -> str:
-    url = f"https://api.github.com/repos/{GITHUB_OWNER}/{GITHUB_REPO}"
+    url = f"{github_client.API_URL}/repos/{GITHUB_OWNER}/{GITHUB_REPO}"
     try:
-        response = requests.get(url, headers=HEADERS, timeout=10)
+        response = github_client.get(url, headers=HEADERS, timeout=10)
         if response.status_code == 200:
             data = response.json()
             return data.get("default_branch", "main")
@@ -36,7 +37,7 @@ def _get_repo_default_branch() -> str:
 
 
 BRANCH = os.getenv("GITHUB_BRANCH") or _get_repo_default_branch()
-RAW_BASE = f"https://raw.githubusercontent.com/{GITHUB_OWNER}/{GITHUB_REPO}/{BRANCH}"
+RAW_BASE = f"{github_client.RAW_URL}/{GITHUB_OWNER}/{GITHUB_REPO}/{BRANCH}"
 
 ALLOWED_EXTENSIONS = {".png", ".jpg", ".jpeg", ".webp", ".gif"}
 
@@ -55,14 +56,11 @@ def _decode_github_content(payload: Dict[str, Any]) -> Any:
 
 
 def fetch_github_file(path: str) -> Optional[dict]:
-    url = f"https://api.github.com/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{path}"
+    url = f"{github_client.API_URL}/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{path}"
     try:
-        response = requests.get(url, headers=HEADERS, timeout=10)
-        if response.status_code == 200:
-            return response.json()
+        return github_client.read_file(url, headers=HEADERS)
     except Exception:
         return None
-    return None
 
 
 def load_auth_users() -> List[dict]:
@@ -76,50 +74,38 @@ def load_auth_users() -> List[dict]:
 
 
 def save_auth_users(users: List[dict], message: str) -> bool:
-    url = f"https://api.github.com/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{AUTH_FILE_PATH}"
+    url = f"{github_client.API_URL}/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{AUTH_FILE_PATH}"
     content = json.dumps(users, indent=2, ensure_ascii=False)
     content_b64 = base64.b64encode(content.encode("utf-8")).decode("utf-8")
-    current = fetch_github_file(AUTH_FILE_PATH)
-    sha = current.get("sha") if current else None
     data = {
         "message": message,
         "content": content_b64,
         "branch": BRANCH,
     }
-    if sha:
-        data["sha"] = sha
     try:
-        response = requests.put(url, headers=HEADERS, json=data, timeout=30)
+        response = github_client.put_file(url, HEADERS, data, timeout=30)
         return response.status_code in [200, 201]
     except Exception:
         return False
 
 
 def _upload_github_file(path: str, content_bytes: bytes, message: str) -> bool:
-    url = f"https://api.github.com/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{path}"
+    url = f"{github_client.API_URL}/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{path}"
     content_b64 = base64.b64encode(content_bytes).decode("utf-8")
-    current = fetch_github_file(path)
-    sha = current.get("sha") if current else None
     data = {"message": message, "content": content_b64, "branch": BRANCH}
-    if sha:
-        data["sha"] = sha
     try:
-        response = requests.put(url, headers=HEADERS, json=data, timeout=30)
+        response = github_client.put_file(url, HEADERS, data, timeout=30)
         return response.status_code in [200, 201]
     except Exception:
         return False
 
 
 def _delete_github_file(path: str, message: str) -> bool:
-    url = f"https://api.github.com/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{path}"
-    current = fetch_github_file(path)
-    if not current:
-        return False
-    sha = current.get("sha")
-    data = {"message": message, "sha": sha, "branch": BRANCH}
+    url = f"{github_client.API_URL}/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{path}"
+    data = {"message": message, "branch": BRANCH}
     try:
-        response = requests.delete(url, headers=HEADERS, json=data, timeout=30)
-        return response.status_code in [200, 204]
+        response = github_client.delete_file(url, HEADERS, data, timeout=30)
+        return response is not None and response.status_code in [200, 204]
     except Exception:
         return False
 
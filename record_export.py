@@ -0,0 +1,106 @@
+"""Exportacao em streaming de listas de registros, em NDJSON ou CSV.
+
+As rotas de exportacao passam um iterador de registros (lido em lotes do armazenamento);
+cada registro e serializado e enviado em blocos de ate CHUNK_BYTES, sem montar a lista
+nem o arquivo inteiro em memoria. O primeiro bloco (cabecalho do CSV ou primeira linha do
+NDJSON) sai assim que fica pronto.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, Iterable, Iterator, List, Optional, Sequence
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+
+CHUNK_BYTES = 64 * 1024
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+# celulas que o Excel interpretaria como formula
+FORMULA_PREFIXES = ("=", "+", "-", "@")
+
+
+def parse_columns(value: Optional[str]) -> Optional[List[str]]:
+    """Lista de colunas a partir de "nome,cpf,vaga" (None se nao informada)."""
+    columns = [column.strip() for column in (value or "").split(",") if column.strip()]
+    return columns or None
+
+
+def _cell(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    text = str(value)
+    return "'" + text if text.startswith(FORMULA_PREFIXES) else text
+
+
+def _chunked(lines: Iterable[str]) -> Iterator[bytes]:
+    buffer: List[str] = []
+    size = 0
+    first = True
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if first or size >= CHUNK_BYTES:
+            yield "".join(buffer).encode("utf-8")
+            buffer, size, first = [], 0, False
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
+
+
+def iter_ndjson(records: Iterable[dict], columns: Optional[Sequence[str]] = None) -> Iterator[bytes]:
+    """Uma linha JSON por registro (so com `columns`, se informadas)."""
+    def lines() -> Iterator[str]:
+        for record in records:
+            if columns:
+                record = {column: record.get(column) for column in columns}
+            yield json.dumps(record, ensure_ascii=False) + "\n"
+    return _chunked(lines())
+
+
+def iter_csv(records: Iterable[dict], columns: Sequence[str], delimiter: str = ";") -> Iterator[bytes]:
+    """CSV com cabecalho; o BOM faz o Excel reconhecer o UTF-8 (acentos)."""
+    def lines() -> Iterator[str]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, delimiter=delimiter, lineterminator="\r\n")
+        writer.writerow(columns)
+        yield "\ufeff" + buffer.getvalue()
+        for record in records:
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerow([_cell(record.get(column)) for column in columns])
+            yield buffer.getvalue()
+    return _chunked(lines())
+
+
+def streaming_response(
+    records: Iterable[dict],
+    formato: str,
+    columns: Optional[List[str]],
+    default_columns: Sequence[str],
+    name: str,
+    delimiter: str = ";",
+) -> StreamingResponse:
+    """Resposta com os registros em `formato` ("csv" ou "ndjson"), baixada como <name>_<data>.<formato>.
+
+    O CSV usa `columns` ou, sem elas, `default_columns`; o NDJSON sem `columns` leva o registro inteiro.
+    """
+    formato = (formato or "").strip().lower()
+    if formato not in MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail="Formato inválido. Use csv ou ndjson.")
+    if formato == "csv":
+        if len(delimiter) != 1:
+            raise HTTPException(status_code=400, detail="O separador do CSV deve ter um caractere.")
+        body = iter_csv(records, columns or list(default_columns), delimiter)
+    else:
+        body = iter_ndjson(records, columns)
+    filename = f"{name}_{datetime.now():%Y-%m-%d}.{formato}"
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[formato],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
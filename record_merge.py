@@ -0,0 +1,90 @@
+"""Merge de tres vias para listas de registros JSON (ex.: candidatos.json).
+
+Usado quando uma gravacao no GitHub falha por sha desatualizado: `base` e a versao
+que foi lida, `theirs` a versao atual do GitHub e `mine` a versao que se tentou
+gravar. Os registros sao casados pela chave (normalmente o campo `id`); registros
+sem chave sao casados pelo proprio conteudo.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+KeyFn = Callable[[Any], Optional[str]]
+
+
+def record_id(record: Any) -> Optional[str]:
+    if isinstance(record, dict) and record.get("id") not in (None, ""):
+        return str(record["id"])
+    return None
+
+
+def _keyed(records: List[Any], key_fn: KeyFn) -> List[Tuple[str, Any]]:
+    seen: Dict[str, int] = {}
+    keyed = []
+    for record in records or []:
+        key = key_fn(record)
+        if key is None:
+            key = "valor:" + json.dumps(record, sort_keys=True, ensure_ascii=False, default=str)
+        count = seen.get(key, 0)
+        seen[key] = count + 1
+        keyed.append((f"{key}#{count}" if count else key, record))
+    return keyed
+
+
+def _merge_record(base: Any, theirs: Any, mine: Any) -> Any:
+    if mine == base:
+        return theirs
+    if theirs == base or theirs == mine:
+        return mine
+    if not (isinstance(base, dict) and isinstance(theirs, dict) and isinstance(mine, dict)):
+        return mine
+    merged = dict(theirs)
+    for field in set(base) | set(mine):
+        if field not in mine:
+            if theirs.get(field) == base.get(field):
+                merged.pop(field, None)
+        elif mine[field] != base.get(field, object()):
+            merged[field] = mine[field]
+    return merged
+
+
+def three_way_merge(
+    base: Optional[List[Any]],
+    theirs: List[Any],
+    mine: List[Any],
+    key_fn: Optional[KeyFn] = None,
+) -> List[Any]:
+    """Combina as alteracoes de `mine` e `theirs` feitas a partir de `base`.
+
+    Alteracoes de apenas um dos lados sao preservadas; quando os dois lados alteram o
+    mesmo registro, os campos sao combinados e `mine` prevalece nos campos em conflito.
+    Uma remocao so vale se o outro lado nao alterou o registro.
+    """
+    key_fn = key_fn or record_id
+    base_map = dict(_keyed(base or [], key_fn))
+    theirs_items = _keyed(theirs, key_fn)
+    mine_items = _keyed(mine, key_fn)
+    theirs_map = dict(theirs_items)
+    mine_map = dict(mine_items)
+
+    merged = []
+    for key, their_record in theirs_items:
+        if key in mine_map:
+            if key in base_map:
+                merged.append(_merge_record(base_map[key], their_record, mine_map[key]))
+            else:
+                merged.append(mine_map[key])
+        elif key in base_map and their_record == base_map[key]:
+            continue  # removido em `mine` e intocado em `theirs`
+        else:
+            merged.append(their_record)
+
+    for key, my_record in mine_items:
+        if key in theirs_map:
+            continue
+        if key in base_map and my_record == base_map[key]:
+            continue  # removido em `theirs` e intocado em `mine`
+        merged.append(my_record)
+    return merged
@@ -0,0 +1,87 @@
+"""Estado de acesso ao repositorio do GitHub, verificado em segundo plano.
+
+Uma thread consulta o repositorio a cada REPO_HEALTH_SECONDS e guarda o resultado
+com a hora da verificacao; `/health`, `/status` e o envio de candidaturas leem so
+esse resultado, sem nenhuma chamada ao GitHub dentro da requisicao. A funcao de
+consulta e registrada em `start` e devolve o status HTTP da resposta.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+import github_client
+
+INTERVAL_SECONDS = float(os.getenv("REPO_HEALTH_SECONDS", "60"))
+# depois disso sem uma verificacao nova o resultado deixa de valer para bloquear envios
+STALE_AFTER = float(os.getenv("REPO_HEALTH_STALE_SECONDS", str(INTERVAL_SECONDS * 3)))
+# respostas que indicam falta de acesso (e nao uma falha passageira)
+DENIED_STATUS = (401, 403, 404)
+
+_LOCK = threading.Lock()
+_THREAD: Optional[threading.Thread] = None
+_PROBE: Optional[Callable[[], int]] = None
+_RESULT: Dict[str, Any] = {}
+_CHECKED_AT = 0.0
+
+
+def refresh() -> Dict[str, Any]:
+    """Consulta o repositorio agora, atualiza o resultado guardado e o devolve."""
+    global _CHECKED_AT
+    if _PROBE is None:
+        raise RuntimeError("repo_health.start() ainda nao foi chamado")
+    started = time.perf_counter()
+    result: Dict[str, Any] = {"acessivel": False, "status_code": None, "erro": None}
+    try:
+        result["status_code"] = _PROBE()
+        result["acessivel"] = result["status_code"] == 200
+    except Exception as exc:
+        result["erro"] = str(exc)
+    result["latencia_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    result["verificado_em"] = datetime.now().isoformat()
+    with _LOCK:
+        _RESULT.clear()
+        _RESULT.update(result)
+        _CHECKED_AT = time.time()
+    return status()
+
+
+def _loop() -> None:
+    while True:
+        with _LOCK:
+            wait = _CHECKED_AT + INTERVAL_SECONDS - time.time()
+        if wait > 0:
+            time.sleep(wait)
+            continue
+        refresh()
+
+
+def start(probe: Callable[[], int]) -> None:
+    """Registra a funcao de consulta e inicia as verificacoes periodicas."""
+    global _PROBE, _THREAD
+    _PROBE = probe
+    if _THREAD is not None:
+        return
+    _THREAD = threading.Thread(target=github_client.background(_loop), name="repo-health", daemon=True)
+    _THREAD.start()
+
+
+def status() -> Dict[str, Any]:
+    """Ultimo resultado guardado, com a idade em segundos ({"acessivel": None} se nunca verificado)."""
+    with _LOCK:
+        if not _CHECKED_AT:
+            return {"acessivel": None, "verificado_em": None}
+        age = time.time() - _CHECKED_AT
+        return {**_RESULT, "idade_s": round(age, 1), "desatualizado": age > STALE_AFTER}
+
+
+def is_unavailable() -> bool:
+    """True quando a ultima verificacao, ainda recente, mostrou que nao ha acesso ao repositorio."""
+    with _LOCK:
+        if not _CHECKED_AT or time.time() - _CHECKED_AT > STALE_AFTER:
+            return False
+        return _RESULT.get("status_code") in DENIED_STATUS
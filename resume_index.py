@@ -0,0 +1,297 @@
+"""Extracao do texto dos curriculos e indice invertido para busca por conteudo.
+
+Quando uma candidatura e processada, o curriculo salvo localmente entra numa fila
+atendida por threads em segundo plano, que extraem o texto (PDF/DOCX), normalizam
+os termos (minusculas, sem acentos) e gravam o indice em
+DATA_DIR/data/curriculos_texto.db:
+
+- `documentos`: um registro por conteudo (sha256), extraido uma unica vez mesmo
+  que o mesmo arquivo seja usado em varias candidaturas;
+- `termos`: termo -> documentos em que aparece (com frequencia);
+- `candidatos`: candidatura -> documento, com a data de envio para filtrar as ativas.
+
+A busca consulta apenas o indice; os arquivos nao sao relidos.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import queue
+import re
+import sqlite3
+import threading
+import unicodedata
+import xml.etree.ElementTree as ET
+import zipfile
+import zlib
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app_paths import DATA_DIR
+import github_client
+
+DB_PATH = DATA_DIR / "data" / "curriculos_texto.db"
+WORKERS = int(os.getenv("RESUME_INDEX_WORKERS", "2"))
+MIN_TERM_LENGTH = 2
+STOPWORDS = {
+    "a", "o", "as", "os", "de", "da", "do", "das", "dos", "e", "em", "no", "na", "nos", "nas",
+    "um", "uma", "com", "por", "para", "ao", "aos", "que", "se", "ou",
+}
+
+_LOCK = threading.Lock()
+_CONN: Optional[sqlite3.Connection] = None
+_QUEUE: "queue.Queue[Tuple[str, str, Optional[str], Optional[str]]]" = queue.Queue()
+_WORKERS: List[threading.Thread] = []
+
+_DOCX_TEXT = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}t"
+_DOCX_PARAGRAPH = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}p"
+_PDF_STREAM = re.compile(rb"stream\r?\n(.*?)\r?\nendstream", re.S)
+_PDF_TEXT = re.compile(rb"\((.*?)(?<!\\)\)\s*Tj|\[(.*?)\]\s*TJ", re.S)
+_PDF_STRING = re.compile(rb"\((.*?)(?<!\\)\)", re.S)
+
+
+def _connection() -> sqlite3.Connection:
+    global _CONN
+    if _CONN is None:
+        DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(DB_PATH), check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS documentos ("
+            "sha256 TEXT PRIMARY KEY, caracteres INTEGER NOT NULL, erro TEXT, extraido_em TEXT NOT NULL)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS termos ("
+            "termo TEXT NOT NULL, sha256 TEXT NOT NULL, frequencia INTEGER NOT NULL, "
+            "PRIMARY KEY (termo, sha256)) WITHOUT ROWID"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS termos_documento ON termos (sha256)")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS candidatos ("
+            "candidate_id TEXT PRIMARY KEY, sha256 TEXT NOT NULL, enviado_em TEXT)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS candidatos_documento ON candidatos (sha256)")
+        _CONN = conn
+    return _CONN
+
+
+def normalize(text: str) -> str:
+    """Minusculas e sem acentos (\"Experiência\" -> \"experiencia\")."""
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).lower()
+
+
+def tokenize(text: str) -> List[str]:
+    return [
+        term
+        for term in re.findall(r"[a-z0-9]+", normalize(text))
+        if len(term) >= MIN_TERM_LENGTH and term not in STOPWORDS
+    ]
+
+
+def _docx_text(path: str) -> str:
+    with zipfile.ZipFile(path) as archive:
+        root = ET.fromstring(archive.read("word/document.xml"))
+    paragraphs = []
+    for paragraph in root.iter(_DOCX_PARAGRAPH):
+        paragraphs.append("".join(node.text or "" for node in paragraph.iter(_DOCX_TEXT)))
+    return "\n".join(paragraphs)
+
+
+def _pdf_literal(raw: bytes) -> str:
+    raw = re.sub(rb"\\([()\\])", rb"\1", raw)
+    return raw.decode("latin-1", errors="ignore")
+
+
+def _pdf_text_fallback(path: str) -> str:
+    # Sem pypdf: le os operadores de texto (Tj/TJ) dos streams, descomprimindo os FlateDecode
+    with open(path, "rb") as handle:
+        data = handle.read()
+    parts = []
+    for match in _PDF_STREAM.finditer(data):
+        stream = match.group(1)
+        try:
+            stream = zlib.decompress(stream)
+        except zlib.error:
+            pass
+        for text in _PDF_TEXT.finditer(stream):
+            if text.group(1) is not None:
+                parts.append(_pdf_literal(text.group(1)))
+            else:
+                parts.append("".join(_pdf_literal(item) for item in _PDF_STRING.findall(text.group(2))))
+    return " ".join(parts)
+
+
+def _pdf_text(path: str) -> str:
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        return _pdf_text_fallback(path)
+    reader = PdfReader(path)
+    return "\n".join(page.extract_text() or "" for page in reader.pages)
+
+
+def extract_text(path: str) -> str:
+    """Texto do curriculo em `path` (PDF ou DOCX, identificados pelo conteudo)."""
+    with open(path, "rb") as handle:
+        head = handle.read(8)
+    if head.startswith(b"%PDF-"):
+        return _pdf_text(path)
+    if head.startswith(b"PK\x03\x04"):
+        return _docx_text(path)
+    raise ValueError("Formato sem extracao de texto (apenas PDF e DOCX)")
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(64 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _index_document(sha256: str, path: str) -> None:
+    with _LOCK:
+        if _connection().execute("SELECT 1 FROM documentos WHERE sha256 = ?", (sha256,)).fetchone():
+            return
+    error = None
+    try:
+        text = extract_text(path)
+    except Exception as exc:
+        text, error = "", str(exc)
+    frequencies: Dict[str, int] = {}
+    for term in tokenize(text):
+        frequencies[term] = frequencies.get(term, 0) + 1
+    with _LOCK:
+        conn = _connection()
+        conn.execute("BEGIN")
+        try:
+            conn.executemany(
+                "INSERT OR REPLACE INTO termos (termo, sha256, frequencia) VALUES (?, ?, ?)",
+                [(term, sha256, count) for term, count in frequencies.items()],
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO documentos (sha256, caracteres, erro, extraido_em) VALUES (?, ?, ?, ?)",
+                (sha256, len(text), error, datetime.utcnow().isoformat() + "Z"),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+
+def _worker_loop() -> None:
+    while True:
+        candidate_id, path, sha256, enviado_em = _QUEUE.get()
+        try:
+            if not os.path.exists(path):
+                continue
+            sha256 = sha256 or _file_sha256(path)
+            _index_document(sha256, path)
+            with _LOCK:
+                _connection().execute(
+                    "INSERT OR REPLACE INTO candidatos (candidate_id, sha256, enviado_em) VALUES (?, ?, ?)",
+                    (candidate_id, sha256, enviado_em),
+                )
+        except Exception as exc:
+            print(f"Erro ao indexar curriculo de {candidate_id}: {exc}")
+        finally:
+            _QUEUE.task_done()
+
+
+def submit(candidate_id: str, path: str, sha256: Optional[str] = None, enviado_em: Optional[str] = None) -> None:
+    """Agenda a extracao do curriculo `path` da candidatura `candidate_id`."""
+    if candidate_id and path:
+        _QUEUE.put((str(candidate_id), str(path), sha256, enviado_em))
+
+
+def is_indexed(candidate_id: str) -> bool:
+    with _LOCK:
+        row = _connection().execute(
+            "SELECT 1 FROM candidatos WHERE candidate_id = ?", (str(candidate_id),)
+        ).fetchone()
+    return row is not None
+
+
+def forget(candidate_ids: Iterable[str]) -> None:
+    """Remove candidaturas do indice e os documentos que ficaram sem referencia."""
+    ids = [(str(candidate_id),) for candidate_id in candidate_ids]
+    if not ids:
+        return
+    with _LOCK:
+        conn = _connection()
+        conn.execute("BEGIN")
+        try:
+            conn.executemany("DELETE FROM candidatos WHERE candidate_id = ?", ids)
+            orphans = "SELECT sha256 FROM documentos WHERE sha256 NOT IN (SELECT sha256 FROM candidatos)"
+            conn.execute(f"DELETE FROM termos WHERE sha256 IN ({orphans})")
+            conn.execute(f"DELETE FROM documentos WHERE sha256 IN ({orphans})")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+
+def search(query: str, since: Optional[datetime] = None, limit: int = 50) -> List[Tuple[str, int]]:
+    """Candidaturas cujo curriculo contem todos os termos da consulta, por relevancia.
+
+    Cada termo casa por prefixo (\"experi\" encontra \"experiencia\"); a relevancia e a
+    soma das frequencias dos termos encontrados.
+    """
+    terms = list(dict.fromkeys(tokenize(query)))
+    if not terms:
+        return []
+    scores: Optional[Dict[str, int]] = None
+    with _LOCK:
+        conn = _connection()
+        for term in terms:
+            rows = conn.execute(
+                "SELECT sha256, SUM(frequencia) FROM termos WHERE termo >= ? AND termo < ? GROUP BY sha256",
+                (term, term + "\x7f"),
+            ).fetchall()
+            found = {sha256: count for sha256, count in rows}
+            if scores is None:
+                scores = found
+            else:
+                scores = {sha256: scores[sha256] + count for sha256, count in found.items() if sha256 in scores}
+            if not scores:
+                return []
+        placeholders = ",".join("?" * len(scores))
+        params: List[Any] = list(scores)
+        sql = f"SELECT candidate_id, sha256, enviado_em FROM candidatos WHERE sha256 IN ({placeholders})"
+        if since:
+            sql += " AND enviado_em >= ?"
+            params.append(since.isoformat())
+        rows = conn.execute(sql, params).fetchall()
+    # mais relevantes primeiro; no empate, as mais recentes
+    ranked = sorted(((row[0], scores[row[1]], row[2] or "") for row in rows), key=lambda item: item[2], reverse=True)
+    ranked.sort(key=lambda item: -item[1])
+    return [(candidate_id, score) for candidate_id, score, _ in ranked[:limit]]
+
+
+def start() -> None:
+    """Inicia as threads de extracao."""
+    if _WORKERS:
+        return
+    for index in range(max(1, WORKERS)):
+        worker = threading.Thread(
+            target=github_client.background(_worker_loop), name=f"curriculos-texto-{index}", daemon=True
+        )
+        worker.start()
+        _WORKERS.append(worker)
+
+
+def stats() -> Dict[str, Any]:
+    with _LOCK:
+        conn = _connection()
+        documents = conn.execute("SELECT COUNT(*) FROM documentos").fetchone()[0]
+        failures = conn.execute("SELECT COUNT(*) FROM documentos WHERE erro IS NOT NULL").fetchone()[0]
+        candidates = conn.execute("SELECT COUNT(*) FROM candidatos").fetchone()[0]
+    return {
+        "workers": len(_WORKERS),
+        "pendentes": _QUEUE.qsize(),
+        "documentos": documents,
+        "documentos_sem_texto": failures,
+        "candidatos": candidates,
+    }
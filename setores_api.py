@@ -5,11 +5,12 @@ import uuid
 from datetime import datetime
 from typing import List, Optional
 
-import requests
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
 from dotenv import load_dotenv
 from app_paths import APP_DIR, DATA_DIR
+import github_client
+import local_store
 from sync_service import enqueue_pending
 
 load_dotenv(APP_DIR / ".env")
@@ -43,9 +44,9 @@ class SetorUpdate(BaseModel):
 
 
 def get_setores_file() -> tuple[Optional[str], Optional[str]]:
-    url = f'https://api.github.com/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{FILE_PATH}'
+    url = f'{github_client.API_URL}/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{FILE_PATH}'
 
-    response = requests.get(url, headers=headers, timeout=15)
+    response = github_client.get(url, headers=headers, timeout=15)
     if response.status_code == 200:
         payload = response.json()
         content = base64.b64decode(payload['content']).decode('utf-8')
@@ -66,8 +67,11 @@ def persist_setores(setores: List[dict], sha: Optional[str], message: str) -> No
         )
     except Exception:
         pass
+    if local_store.handles('setores'):
+        local_store.save('setores', setores, message, expected_version=sha)
+        return
     payload = json.dumps(setores, indent=2, ensure_ascii=False)
-    url = f'https://api.github.com/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{FILE_PATH}'
+    url = f'{github_client.API_URL}/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{FILE_PATH}'
     data = {
         'message': message,
         'branch': BRANCH,
@@ -76,20 +80,25 @@ def persist_setores(setores: List[dict], sha: Optional[str], message: str) -> No
     if sha:
         data['sha'] = sha
 
-    response = requests.put(url, headers=headers, json=data, timeout=30)
+    response = github_client.put(url, headers=headers, json=data, timeout=30)
     if response.status_code not in (200, 201):
         enqueue_pending(FILE_PATH, setores, message)
         raise RuntimeError('Não foi possível salvar os setores no GitHub')
 
 
 def load_setores() -> tuple[List[dict], Optional[str]]:
+    if local_store.handles('setores'):
+        # no banco local o "sha" e a versao lida, usada no merge ao gravar
+        stored, version = local_store.load_versioned('setores')
+        if stored is not None:
+            return stored, version
     content, sha = get_setores_file()
     if not content:
-        return [], sha
+        return [], None if local_store.handles('setores') else sha
     parsed = json.loads(content)
     if not isinstance(parsed, list):
         raise RuntimeError('O arquivo de setores está corrompido')
-    return parsed, sha
+    return local_store.seeded('setores', parsed, sha)
 
 
 def sort_setores(setores: List[dict]) -> List[dict]:
@@ -104,7 +113,7 @@ def find_setor_index(setores: List[dict], setor_id: str) -> Optional[int]:
 
 
 @router.get('/')
-async def list_setores():
+def list_setores():
     try:
         setores, _ = load_setores()
         return {'ok': True, 'count': len(setores), 'setores': sort_setores(setores)}
@@ -115,7 +124,7 @@ async def list_setores():
 
 
 @router.post('/')
-async def create_setor(payload: SetorBase):
+def create_setor(payload: SetorBase):
 
     try:
         setores, sha = load_setores()
@@ -132,7 +141,7 @@ async def create_setor(payload: SetorBase):
 
 
 @router.put('/{setor_id}')
-async def update_setor(setor_id: str, payload: SetorUpdate):
+def update_setor(setor_id: str, payload: SetorUpdate):
 
     try:
         setores, sha = load_setores()
@@ -169,7 +178,7 @@ async def update_setor(setor_id: str, payload: SetorUpdate):
 
 
 @router.delete('/{setor_id}')
-async def delete_setor(setor_id: str):
+def delete_setor(setor_id: str):
 
     try:
         setores, sha = load_setores()
@@ -0,0 +1,233 @@
+"""Fila local duravel para as candidaturas recebidas em /api/enviar.
+
+O endpoint valida o formulario, grava os campos e o arquivo aqui (SQLite em
+DATA_DIR/data/envios.db e o arquivo em DATA_DIR/data/envios/) e responde 202 com o
+id de acompanhamento. Threads proprias (com prioridade interativa no GitHub) chamam o
+`handler` registrado em `start` para cada envio, com novas tentativas e espera exponencial quando o GitHub
+falha. Um envio so sai da fila como `concluido`, `duplicado` ou `falhou`; envios que
+estavam em processamento quando o servidor parou voltam para a fila no proximo start.
+O arquivo de um envio `falhou` nunca e apagado (nem o registro), para reprocessamento.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Union
+
+from app_paths import DATA_DIR
+
+DB_PATH = DATA_DIR / "data" / "envios.db"
+FILES_DIR = DATA_DIR / "data" / "envios"
+WORKERS = int(os.getenv("SUBMISSION_WORKERS", "2"))
+MAX_ATTEMPTS = int(os.getenv("SUBMISSION_MAX_ATTEMPTS", "10"))
+RETRY_SECONDS = float(os.getenv("SUBMISSION_RETRY_SECONDS", "10"))
+MAX_RETRY_SECONDS = 900
+KEEP_DAYS = 30
+
+RECEBIDO = "recebido"
+PROCESSANDO = "processando"
+AGUARDANDO = "aguardando_nova_tentativa"
+CONCLUIDO = "concluido"
+DUPLICADO = "duplicado"
+FALHOU = "falhou"
+FINAL_STATUSES = (CONCLUIDO, DUPLICADO, FALHOU)
+# so estes liberam o arquivo e o registro; um envio que falhou guarda os dois
+DISCARDABLE_STATUSES = (CONCLUIDO, DUPLICADO)
+
+
+class PermanentError(Exception):
+    """Falha que nao adianta repetir (ex.: candidatura duplicada)."""
+
+    def __init__(self, message: str, status: str = FALHOU):
+        super().__init__(message)
+        self.status = status
+
+
+_LOCK = threading.Lock()
+_WAKE = threading.Event()
+_CONN: Optional[sqlite3.Connection] = None
+_WORKERS: List[threading.Thread] = []
+_HANDLER: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None
+
+
+def _now() -> str:
+    return datetime.utcnow().isoformat() + "Z"
+
+
+def _connection() -> sqlite3.Connection:
+    global _CONN
+    if _CONN is None:
+        DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(DB_PATH), check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS envios ("
+            "id TEXT PRIMARY KEY, status TEXT NOT NULL, dados TEXT NOT NULL, estado TEXT NOT NULL, "
+            "arquivo TEXT, arquivo_nome TEXT, tentativas INTEGER NOT NULL DEFAULT 0, "
+            "proxima_tentativa REAL NOT NULL DEFAULT 0, erro TEXT, resultado TEXT, "
+            "criado_em TEXT NOT NULL, atualizado_em TEXT NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS envios_fila ON envios (status, proxima_tentativa)")
+        _CONN = conn
+    return _CONN
+
+
+def enqueue(data: Dict[str, Any], filename: str, content: Union[bytes, BinaryIO]) -> str:
+    """Grava o envio (campos + arquivo) em disco e devolve o id de acompanhamento.
+
+    `content` pode ser um arquivo aberto; nesse caso e copiado em blocos a partir da posicao atual.
+    """
+    job_id = uuid.uuid4().hex
+    FILES_DIR.mkdir(parents=True, exist_ok=True)
+    file_path = FILES_DIR / job_id
+    with open(file_path, "wb") as handle:
+        if isinstance(content, bytes):
+            handle.write(content)
+        else:
+            shutil.copyfileobj(content, handle, 64 * 1024)
+        handle.flush()
+        os.fsync(handle.fileno())
+    now = _now()
+    with _LOCK:
+        _connection().execute(
+            "INSERT INTO envios (id, status, dados, estado, arquivo, arquivo_nome, criado_em, atualizado_em) "
+            "VALUES (?, ?, ?, '{}', ?, ?, ?, ?)",
+            (job_id, RECEBIDO, json.dumps(data, ensure_ascii=False), str(file_path), filename, now, now),
+        )
+    _WAKE.set()
+    return job_id
+
+
+def get(job_id: str) -> Optional[Dict[str, Any]]:
+    """Situacao publica de um envio (sem os dados do formulario)."""
+    with _LOCK:
+        row = _connection().execute(
+            "SELECT id, status, tentativas, erro, resultado, criado_em, atualizado_em FROM envios WHERE id = ?",
+            (job_id,),
+        ).fetchone()
+    if row is None:
+        return None
+    return {
+        "id": row[0],
+        "status": row[1],
+        "tentativas": row[2],
+        "erro": row[3],
+        "resultado": json.loads(row[4]) if row[4] else None,
+        "criado_em": row[5],
+        "atualizado_em": row[6],
+    }
+
+
+def save_state(job_id: str, state: Dict[str, Any]) -> None:
+    """Guarda o progresso do handler para que uma nova tentativa nao repita etapas ja feitas."""
+    with _LOCK:
+        _connection().execute(
+            "UPDATE envios SET estado = ?, atualizado_em = ? WHERE id = ?",
+            (json.dumps(state, ensure_ascii=False), _now(), job_id),
+        )
+
+
+def _claim() -> tuple[Optional[Dict[str, Any]], Optional[float]]:
+    now = time.time()
+    with _LOCK:
+        conn = _connection()
+        row = conn.execute(
+            "SELECT id, dados, estado, arquivo, arquivo_nome, tentativas FROM envios "
+            "WHERE status IN (?, ?) AND proxima_tentativa <= ? ORDER BY criado_em LIMIT 1",
+            (RECEBIDO, AGUARDANDO, now),
+        ).fetchone()
+        if row is None:
+            next_due = conn.execute(
+                "SELECT MIN(proxima_tentativa) FROM envios WHERE status = ?", (AGUARDANDO,)
+            ).fetchone()[0]
+            return None, (next_due - now if next_due else None)
+        conn.execute(
+            "UPDATE envios SET status = ?, tentativas = tentativas + 1, atualizado_em = ? WHERE id = ?",
+            (PROCESSANDO, _now(), row[0]),
+        )
+    return {
+        "id": row[0],
+        "data": json.loads(row[1]),
+        "state": json.loads(row[2] or "{}"),
+        "file_path": row[3],
+        "filename": row[4],
+        "attempts": row[5] + 1,
+    }, None
+
+
+def _finish(job: Dict[str, Any], status: str, error: Optional[str] = None, result: Optional[dict] = None) -> None:
+    retry_at = 0.0
+    if status == AGUARDANDO:
+        retry_at = time.time() + min(RETRY_SECONDS * (2 ** (job["attempts"] - 1)), MAX_RETRY_SECONDS)
+    with _LOCK:
+        _connection().execute(
+            "UPDATE envios SET status = ?, erro = ?, resultado = ?, proxima_tentativa = ?, atualizado_em = ? WHERE id = ?",
+            (
+                status,
+                error,
+                json.dumps(result, ensure_ascii=False) if result is not None else None,
+                retry_at,
+                _now(),
+                job["id"],
+            ),
+        )
+    if status in DISCARDABLE_STATUSES and job.get("file_path"):
+        try:
+            os.remove(job["file_path"])
+        except OSError:
+            pass
+
+
+def _worker_loop() -> None:
+    while True:
+        _WAKE.clear()
+        job, wait = _claim()
+        if job is None:
+            _WAKE.wait(timeout=wait if wait is not None else 30)
+            continue
+        try:
+            result = _HANDLER(job)
+        except PermanentError as exc:
+            _finish(job, exc.status, str(exc))
+        except Exception as exc:
+            final = job["attempts"] >= MAX_ATTEMPTS
+            print(f"Envio {job['id']}: tentativa {job['attempts']} falhou: {exc}")
+            _finish(job, FALHOU if final else AGUARDANDO, str(exc))
+        else:
+            _finish(job, CONCLUIDO, result=result)
+
+
+def start(handler: Callable[[Dict[str, Any]], Dict[str, Any]]) -> None:
+    """Registra o processamento dos envios e inicia as threads da fila."""
+    global _HANDLER
+    _HANDLER = handler
+    cutoff = datetime.utcfromtimestamp(time.time() - KEEP_DAYS * 86400).isoformat() + "Z"
+    with _LOCK:
+        conn = _connection()
+        conn.execute("UPDATE envios SET status = ? WHERE status = ?", (RECEBIDO, PROCESSANDO))
+        conn.execute(
+            f"DELETE FROM envios WHERE status IN ({','.join('?' * len(DISCARDABLE_STATUSES))}) AND atualizado_em < ?",
+            (*DISCARDABLE_STATUSES, cutoff),
+        )
+        if _WORKERS:
+            return
+        for index in range(max(1, WORKERS)):
+            # prioridade interativa (padrao da thread): cada envio e um candidato aguardando o
+            # protocolo, e nao pode esperar a reserva de cota do segundo plano
+            worker = threading.Thread(target=_worker_loop, name=f"envios-{index}", daemon=True)
+            worker.start()
+            _WORKERS.append(worker)
+    _WAKE.set()
+
+
+def stats() -> Dict[str, Any]:
+    with _LOCK:
+        rows = _connection().execute("SELECT status, COUNT(*) FROM envios GROUP BY status").fetchall()
+    return {"workers": len(_WORKERS), **{status: count for status, count in rows}}
@@ -1,6 +1,5 @@
 ﻿from __future__ import annotations
 
-import base64
 import json
 import os
 import threading
@@ -9,9 +8,9 @@ from pathlib import Path
 from typing import Callable, Dict, List, Optional, Tuple
 from datetime import datetime
 
-import requests
 from dotenv import load_dotenv
 from app_paths import APP_DIR, DATA_DIR
+import github_client
 
 load_dotenv(APP_DIR / ".env")
 load_dotenv()
@@ -90,18 +89,14 @@ def _write_local(path: Path, payload: List[dict]) -> None:
 
 
 def _read_remote(path: str) -> Tuple[List[dict], Optional[str]]:
-    url = f"https://api.github.com/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{path}"
-    response = requests.get(url, headers=_headers(), timeout=15, params={"ref": GITHUB_BRANCH})
+    url = f"{github_client.API_URL}/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{path}"
+    response = github_client.get(url, headers=_headers(), timeout=15, params={"ref": GITHUB_BRANCH})
     if response.status_code == 404:
         return [], None
     if response.status_code != 200:
         raise RuntimeError(f"Erro ao acessar {path}: {response.status_code}")
-    payload = response.json()
-    content = payload.get("content") or ""
-    if not content:
-        return [], payload.get("sha")
-    decoded = base64.b64decode(content).decode("utf-8")
-    data = json.loads(decoded)
+    payload = github_client.payload_from_response(url, response)
+    data = github_client.load_json(url, payload, headers=_headers(), params={"ref": GITHUB_BRANCH})
     if isinstance(data, list):
         return data, payload.get("sha")
     if isinstance(data, dict):
@@ -109,19 +104,26 @@ def _read_remote(path: str) -> Tuple[List[dict], Optional[str]]:
     return [], payload.get("sha")
 
 
-def _write_remote(path: str, payload: List[dict], sha: Optional[str], message: str) -> None:
+def _write_remote(
+    path: str,
+    payload: List[dict],
+    sha: Optional[str],
+    message: str,
+    key_fn: Optional[Callable[[dict], str]] = None,
+) -> None:
     if not GITHUB_TOKEN:
         raise RuntimeError("Token do GitHub não configurado")
-    url = f"https://api.github.com/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{path}"
-    content = json.dumps(payload, ensure_ascii=False, indent=2)
-    data = {
-        "message": message,
-        "branch": GITHUB_BRANCH,
-        "content": base64.b64encode(content.encode("utf-8")).decode("utf-8"),
-    }
-    if sha:
-        data["sha"] = sha
-    response = requests.put(url, headers=_headers(), json=data, timeout=20)
+    url = f"{github_client.API_URL}/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{path}"
+    response = github_client.put_records(
+        url,
+        _headers(),
+        payload,
+        message,
+        GITHUB_BRANCH,
+        sha=sha,
+        key_fn=(lambda item: key_fn(item) or None) if key_fn else None,
+        timeout=20,
+    )
     if response.status_code not in (200, 201):
         raise RuntimeError(f"Falha ao salvar {path} no GitHub")
 
@@ -211,7 +213,7 @@ def run_startup_sync() -> None:
                 remote_items, sha = _read_remote(target.remote_path)
                 merged = _merge_missing(remote_items, payload, target.key_fn)
                 if merged != remote_items:
-                    _write_remote(target.remote_path, merged, sha, message)
+                    _write_remote(target.remote_path, merged, sha, message, target.key_fn)
                     remote_items = merged
                 _write_local(target.local_path, remote_items)
             except Exception as exc:
@@ -232,7 +234,7 @@ def run_startup_sync() -> None:
         # Push missing local items to GitHub if any
         if merged != remote_items:
             try:
-                _write_remote(target.remote_path, merged, sha, f"Sync local -> remoto ({target.name})")
+                _write_remote(target.remote_path, merged, sha, f"Sync local -> remoto ({target.name})", target.key_fn)
                 remote_items = merged
             except Exception as exc:
                 print(f"[sync] falha ao salvar remoto {target.name}: {exc}")
@@ -243,6 +245,6 @@ def run_startup_sync() -> None:
 
 
 def start_startup_sync_thread() -> None:
-    thread = threading.Thread(target=run_startup_sync, daemon=True)
+    thread = threading.Thread(target=github_client.background(run_startup_sync), daemon=True)
     thread.start()
 
@@ -0,0 +1,361 @@
+"""Fila write-behind opcional para os arquivos JSON administrativos no GitHub.
+
+Com GITHUB_WRITE_BEHIND=1, as gravacoes dos caminhos em GITHUB_WRITE_BEHIND_PATHS
+nao fazem mais um PUT por requisicao: o conteudo fica pendente em memoria (e num
+journal em disco, ao lado da copia local), e uma thread em segundo plano grava a
+ultima versao de cada caminho num unico commit depois de uma janela de debounce.
+Enquanto a gravacao nao acontece, `pending_payload` devolve a versao pendente
+para que as leituras seguintes vejam as proprias alteracoes.
+
+O commit leva o sha da versao do GitHub de onde a pendencia partiu; se o arquivo mudou
+nesse meio tempo (outra instancia, outra ferramenta), a versao pendente e combinada com
+a atual por merge de tres vias e o commit e refeito, como em `github_client.put_records`.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import requests
+from dotenv import load_dotenv
+
+from app_paths import APP_DIR, DATA_DIR
+import github_client
+import record_merge
+
+load_dotenv(APP_DIR / ".env")
+load_dotenv()
+
+GITHUB_OWNER = os.getenv("GITHUB_OWNER", "PopularAtacarejo")
+GITHUB_REPO = os.getenv("GITHUB_REPO", "Candidatos")
+GITHUB_BRANCH = os.getenv("GITHUB_BRANCH", "main")
+GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
+
+ENABLED = os.getenv("GITHUB_WRITE_BEHIND", "").strip().lower() in ("1", "true", "yes", "sim")
+PATHS = {
+    item.strip()
+    for item in os.getenv(
+        "GITHUB_WRITE_BEHIND_PATHS",
+        "empresas.json,lideres.json,vagas.json,configuracoes.json",
+    ).split(",")
+    if item.strip()
+}
+DEBOUNCE_SECONDS = float(os.getenv("GITHUB_WRITE_BEHIND_DEBOUNCE", "3"))
+MAX_DELAY_SECONDS = float(os.getenv("GITHUB_WRITE_BEHIND_MAX_DELAY", "30"))
+RETRY_SECONDS = float(os.getenv("GITHUB_WRITE_BEHIND_RETRY", "15"))
+MAX_RETRY_SECONDS = 600
+JOURNAL_PATH = DATA_DIR / "data" / "write_behind.json"
+
+_PENDING: Dict[str, Dict[str, Any]] = {}
+_LOCK = threading.Lock()
+_WAKE = threading.Event()
+_WORKER: Optional[threading.Thread] = None
+
+STATS: Dict[str, Any] = {
+    "submitted": 0,
+    "coalesced": 0,
+    "flushes": 0,
+    "flushed_paths": 0,
+    "failures": 0,
+    "total_flush_latency": 0.0,
+    "last_flush_latency": None,
+    "max_flush_latency": None,
+    "last_flush_at": None,
+    "last_error": None,
+}
+
+
+def _headers() -> dict:
+    headers = {"Accept": "application/vnd.github.v3+json"}
+    if GITHUB_TOKEN:
+        headers["Authorization"] = f"token {GITHUB_TOKEN}"
+    return headers
+
+
+def _contents_url(path: str) -> str:
+    return f"{github_client.API_URL}/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{path}"
+
+
+def _single_record(_record: Any) -> str:
+    # arquivo com um unico objeto (ex.: configuracoes.json): merge campo a campo
+    return "objeto"
+
+
+def _merge_payloads(base: Any, theirs: Any, mine: Any) -> Any:
+    """Merge de tres vias de uma lista de registros ou de um objeto unico."""
+    if isinstance(mine, list):
+        return record_merge.three_way_merge(
+            base if isinstance(base, list) else None, theirs if isinstance(theirs, list) else [], mine
+        )
+    merged = record_merge.three_way_merge([base], [theirs], [mine], key_fn=_single_record)
+    return merged[0] if merged else mine
+
+
+def handles(path: str) -> bool:
+    """Indica se as gravacoes deste caminho passam pela fila write-behind."""
+    return ENABLED and bool(GITHUB_TOKEN) and path in PATHS
+
+
+def _write_journal_locked() -> None:
+    journal = {
+        path: {
+            "content": entry["content"],
+            "messages": entry["messages"],
+            "queued_at": entry["queued_at"],
+            "base_sha": entry["base_sha"],
+        }
+        for path, entry in _PENDING.items()
+    }
+    try:
+        JOURNAL_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = JOURNAL_PATH.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(journal, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, JOURNAL_PATH)
+    except OSError as exc:
+        print(f"Aviso: nao foi possivel gravar o journal write-behind: {exc}")
+
+
+def submit(path: str, payload: Any, message: str) -> None:
+    """Registra a nova versao de `path`; versoes anteriores ainda pendentes sao substituidas."""
+    content = json.dumps(payload, indent=2, ensure_ascii=False)
+    now = time.time()
+    with _LOCK:
+        entry = _PENDING.get(path)
+        if entry:
+            STATS["coalesced"] += 1
+            entry["messages"].append(message)
+        else:
+            entry = {
+                "messages": [message],
+                "first_at": now,
+                "queued_at": datetime.utcnow().isoformat() + "Z",
+                "version": 0,
+                "attempts": 0,
+                "retry_at": 0.0,
+                # versao do GitHub lida pelo chamador (o cache de sha acompanha as leituras)
+                "base_sha": github_client.known_sha(_contents_url(path)),
+            }
+            _PENDING[path] = entry
+        entry["content"] = content
+        entry["last_at"] = now
+        entry["version"] += 1
+        STATS["submitted"] += 1
+        _write_journal_locked()
+    _ensure_worker()
+    _WAKE.set()
+
+
+def pending_payload(path: str) -> Optional[Any]:
+    """Retorna a versao ainda nao gravada de `path`, ou None se nao houver pendencia."""
+    with _LOCK:
+        entry = _PENDING.get(path)
+        content = entry["content"] if entry else None
+    if content is None:
+        return None
+    return json.loads(content)
+
+
+def _commit_message(messages: List[str]) -> str:
+    if len(messages) == 1:
+        return messages[0]
+    return f"{messages[-1]} (+{len(messages) - 1} alteracoes agrupadas)"
+
+
+def _flush(paths: List[str]) -> bool:
+    with _LOCK:
+        batch = {
+            path: {
+                "content": _PENDING[path]["content"],
+                "version": _PENDING[path]["version"],
+                "messages": list(_PENDING[path]["messages"]),
+                "first_at": _PENDING[path]["first_at"],
+                "base_sha": _PENDING[path]["base_sha"],
+            }
+            for path in paths
+            if path in _PENDING
+        }
+    if not batch:
+        return True
+
+    messages = [message for entry in batch.values() for message in entry["messages"]]
+    files = {path: entry["content"] for path, entry in batch.items()}
+    expected = {
+        path: entry["base_sha"] or github_client.known_sha(_contents_url(path)) for path, entry in batch.items()
+    }
+    merged: Dict[str, Any] = {}  # caminho -> versao gravada depois de um merge
+    started = time.time()
+    error = None
+    try:
+        for attempt in range(github_client.CONFLICT_RETRIES + 1):
+            response = github_client.commit_files(
+                f"{github_client.API_URL}/repos/{GITHUB_OWNER}/{GITHUB_REPO}",
+                _headers(),
+                GITHUB_BRANCH,
+                files,
+                _commit_message(messages),
+                expected_shas=expected,
+            )
+            if response or response.status_code not in github_client.CONFLICT_STATUS:
+                break
+            if attempt == github_client.CONFLICT_RETRIES:
+                break
+            # o arquivo mudou no GitHub desde a leitura: merge com a versao atual e nova tentativa
+            for path in batch:
+                mine = json.loads(files[path])
+                base_sha = expected[path] if expected[path] != github_client.ABSENT else None
+                records, current_sha = github_client.rebase_records(
+                    _contents_url(path),
+                    _headers(),
+                    GITHUB_BRANCH,
+                    base_sha,
+                    mine if isinstance(mine, list) else [mine],
+                    key_fn=None if isinstance(mine, list) else _single_record,
+                )
+                merged[path] = records if isinstance(mine, list) else (records[0] if records else mine)
+                files[path] = json.dumps(merged[path], indent=2, ensure_ascii=False)
+                expected[path] = current_sha or github_client.ABSENT
+            print(f"Write-behind: conflito em {', '.join(batch)}; refazendo merge (tentativa {attempt + 1})")
+            time.sleep(min(github_client.CONFLICT_BACKOFF * (2 ** attempt), 4.0))
+        ok = bool(response)
+        if not ok:
+            error = f"{response.status_code} - {response.text}"
+    except (requests.RequestException, RuntimeError) as exc:
+        ok = False
+        error = str(exc)
+    finished = time.time()
+
+    with _LOCK:
+        for path, snapshot in batch.items():
+            current = _PENDING.get(path)
+            if current is None:
+                continue
+            if ok:
+                latency = finished - snapshot["first_at"]
+                STATS["flushed_paths"] += 1
+                STATS["total_flush_latency"] += latency
+                STATS["last_flush_latency"] = round(latency, 3)
+                STATS["max_flush_latency"] = round(max(latency, STATS["max_flush_latency"] or 0), 3)
+                if current["version"] == snapshot["version"]:
+                    _PENDING.pop(path, None)
+                else:
+                    # chegou uma versao nova durante a gravacao; ela segue pendente
+                    current["messages"] = current["messages"][len(snapshot["messages"]):]
+                    current["base_sha"] = github_client.known_sha(_contents_url(path))
+                    if path in merged:
+                        # ela partiu da versao anterior ao merge: as alteracoes do GitHub entram nela tambem
+                        current["content"] = json.dumps(
+                            _merge_payloads(json.loads(snapshot["content"]), merged[path], json.loads(current["content"])),
+                            indent=2,
+                            ensure_ascii=False,
+                        )
+                    current["first_at"] = started
+                    current["attempts"] = 0
+                    current["retry_at"] = 0.0
+            else:
+                current["attempts"] += 1
+                delay = min(RETRY_SECONDS * (2 ** (current["attempts"] - 1)), MAX_RETRY_SECONDS)
+                current["retry_at"] = finished + delay
+        if ok:
+            STATS["flushes"] += 1
+            STATS["last_flush_at"] = datetime.utcnow().isoformat() + "Z"
+        else:
+            STATS["failures"] += 1
+            STATS["last_error"] = error
+            print(f"Write-behind: falha ao gravar {', '.join(batch)}: {error}")
+        _write_journal_locked()
+    return ok
+
+
+def _due_paths(now: float) -> tuple[List[str], Optional[float]]:
+    due = []
+    wait = None
+    for path, entry in _PENDING.items():
+        ready_at = min(entry["last_at"] + DEBOUNCE_SECONDS, entry["first_at"] + MAX_DELAY_SECONDS)
+        ready_at = max(ready_at, entry["retry_at"])
+        if ready_at <= now:
+            due.append(path)
+        else:
+            wait = ready_at - now if wait is None else min(wait, ready_at - now)
+    return due, wait
+
+
+def _worker_loop() -> None:
+    while True:
+        with _LOCK:
+            due, wait = _due_paths(time.time())
+        if due:
+            _flush(due)
+            continue
+        _WAKE.wait(timeout=wait)
+        _WAKE.clear()
+
+
+def _ensure_worker() -> None:
+    global _WORKER
+    with _LOCK:
+        if _WORKER and _WORKER.is_alive():
+            return
+        _WORKER = threading.Thread(target=github_client.background(_worker_loop), name="write-behind", daemon=True)
+        _WORKER.start()
+
+
+def start() -> None:
+    """Recarrega o journal de gravacoes pendentes (ex.: apos um reinicio) e inicia o flusher."""
+    if not JOURNAL_PATH.exists():
+        return
+    try:
+        journal = json.loads(JOURNAL_PATH.read_text(encoding="utf-8")) or {}
+    except (OSError, ValueError) as exc:
+        print(f"Aviso: journal write-behind ilegivel: {exc}")
+        return
+    now = time.time()
+    with _LOCK:
+        for path, item in journal.items():
+            if path in _PENDING or not isinstance(item, dict) or "content" not in item:
+                continue
+            _PENDING[path] = {
+                "content": item["content"],
+                "messages": list(item.get("messages") or ["Sincroniza alteracoes pendentes"]),
+                "queued_at": item.get("queued_at"),
+                "first_at": now,
+                "last_at": now - DEBOUNCE_SECONDS,
+                "version": 1,
+                "attempts": 0,
+                "retry_at": 0.0,
+                "base_sha": item.get("base_sha"),
+            }
+    if _PENDING:
+        print(f"Write-behind: {len(_PENDING)} arquivo(s) pendente(s) recuperado(s) do journal")
+        _ensure_worker()
+        _WAKE.set()
+
+
+def flush_all() -> bool:
+    """Grava imediatamente tudo o que estiver pendente (usado no desligamento)."""
+    with _LOCK:
+        paths = list(_PENDING)
+    return _flush(paths) if paths else True
+
+
+def stats() -> Dict[str, Any]:
+    now = time.time()
+    with _LOCK:
+        depth = len(_PENDING)
+        pending_writes = sum(len(entry["messages"]) for entry in _PENDING.values())
+        oldest = max((now - entry["first_at"] for entry in _PENDING.values()), default=0.0)
+        snapshot = dict(STATS)
+    flushed_paths = snapshot["flushed_paths"]
+    total_latency = snapshot.pop("total_flush_latency")
+    return {
+        "enabled": ENABLED,
+        "queue_depth": depth,
+        "pending_writes": pending_writes,
+        "oldest_pending_seconds": round(oldest, 3),
+        "avg_flush_latency": round(total_latency / flushed_paths, 3) if flushed_paths else None,
+        **snapshot,
+    }